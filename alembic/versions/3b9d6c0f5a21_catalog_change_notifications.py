@@ -0,0 +1,67 @@
+"""catalog change notifications
+
+Revision ID: 3b9d6c0f5a21
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d6c0f5a21'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('products', 'cities')
+
+
+def upgrade() -> None:
+    # Payload: {"table": ..., "ids": [...]}; ids is null after TRUNCATE.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+        DECLARE
+            ids integer[];
+        BEGIN
+            IF TG_LEVEL = 'STATEMENT' THEN
+                ids := NULL;
+            ELSIF TG_OP = 'INSERT' THEN
+                ids := ARRAY[NEW.id];
+            ELSIF TG_OP = 'DELETE' THEN
+                ids := ARRAY[OLD.id];
+            ELSIF NEW.id = OLD.id THEN
+                ids := ARRAY[NEW.id];
+            ELSE
+                ids := ARRAY[NEW.id, OLD.id];
+            END IF;
+
+            PERFORM pg_notify(
+                'catalog_changes',
+                json_build_object('table', TG_TABLE_NAME, 'ids', ids)::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table in TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change()
+        """)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_notify_truncate ON {table}')
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_notify_change ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS notify_catalog_change()')
@@ -0,0 +1,130 @@
+"""Catalog cache invalidation driven by Postgres NOTIFY."""
+import json
+import asyncio
+from typing import List, Optional
+
+import asyncpg
+from redis.asyncio import Redis
+
+from app.cache.invalidation import invalidate
+from app.db.database import DATABASE_URL
+from app.services.catalog_service import PRODUCTS_KEY, TO_DISPLAY_KEY, CITIES_KEY, product_key
+from app.core.logger import get_logger
+
+logger = get_logger()
+
+# Channel notified by the notify_catalog_change() trigger (see alembic/versions).
+CATALOG_CHANNEL = 'catalog_changes'
+# Set while at least one worker is listening. If it is missing on connect,
+# notifications may have been lost and the whole catalog is evicted.
+LISTENING_KEY = 'catalog:listening'
+LISTENING_TTL = 15
+HEARTBEAT_INTERVAL = 5
+# Notifications arriving within this window are evicted together.
+BATCH_WINDOW = 0.2
+RECONNECT_DELAY = 5
+
+
+def keys_for_change(table: str, ids: Optional[List[int]]) -> Optional[set[str]]:
+    """
+    Map a change notification to the cache keys it affects.
+
+    Args:
+        table (str): Changed table.
+        ids (Optional[List[int]]): Changed row ids, None after TRUNCATE.
+
+    Returns:
+        Optional[set[str]]: Keys to evict, or None if every key of the
+            table has to go.
+    """
+    if table == 'cities':
+        return {CITIES_KEY}
+    if table == 'products':
+        if ids is None:
+            return None
+        return {PRODUCTS_KEY, TO_DISPLAY_KEY, *(product_key(product_id) for product_id in ids)}
+    return set()
+
+
+async def all_catalog_keys(redis: Redis) -> List[str]:
+    """Get every catalog key currently in Redis."""
+    keys = [PRODUCTS_KEY, TO_DISPLAY_KEY, CITIES_KEY]
+    async for key in redis.scan_iter(match=product_key('*')):
+        key = key.decode()
+        if key.count(':') == 1:
+            keys.append(key)
+    return keys
+
+
+async def listen_for_catalog_changes(redis: Redis, ready: Optional[asyncio.Event] = None) -> None:
+    """
+    Evict catalog cache keys on product and city changes until cancelled.
+
+    Uses a dedicated asyncpg connection (LISTEN needs one that outlives
+    any pooled session). Reconnects after a connection loss.
+
+    Args:
+        redis (Redis): Redis client.
+        ready (Optional[asyncio.Event]): Set once listening, after any
+            eviction of the whole catalog, so warm-up can run after it.
+    """
+    dsn = DATABASE_URL.replace('postgresql+asyncpg://', 'postgresql://')
+
+    while True:
+        connection = None
+        try:
+            queue: asyncio.Queue[str] = asyncio.Queue()
+            connection = await asyncpg.connect(dsn)
+            await connection.add_listener(
+                CATALOG_CHANNEL,
+                lambda _conn, _pid, _channel, payload: queue.put_nowait(payload)
+            )
+            logger.info('Listening on %s', CATALOG_CHANNEL)
+
+            if not await redis.set(LISTENING_KEY, 1, ex=LISTENING_TTL, nx=True):
+                await redis.expire(LISTENING_KEY, LISTENING_TTL)
+            else:
+                await invalidate(redis, *await all_catalog_keys(redis))
+
+            if ready is not None:
+                ready.set()
+            await _process(connection, queue, redis)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # pylint: disable=W0718
+            logger.error('listen_for_catalog_changes: %s', exc)
+        finally:
+            if connection is not None:
+                connection.terminate()
+
+        await asyncio.sleep(RECONNECT_DELAY)
+
+
+async def _process(connection: asyncpg.Connection, queue: asyncio.Queue, redis: Redis) -> None:
+    """Evict keys for queued notifications; raises once the connection dies."""
+    while True:
+        try:
+            payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+        except asyncio.TimeoutError:
+            # Idle: make sure the connection is still alive.
+            await connection.execute('SELECT 1')
+            await redis.set(LISTENING_KEY, 1, ex=LISTENING_TTL)
+            continue
+
+        await asyncio.sleep(BATCH_WINDOW)
+        payloads = [payload]
+        while not queue.empty():
+            payloads.append(queue.get_nowait())
+
+        keys: set[str] = set()
+        for payload in payloads:
+            change = json.loads(payload)
+            change_keys = keys_for_change(change['table'], change['ids'])
+            if change_keys is None:
+                keys.update(await all_catalog_keys(redis))
+            else:
+                keys.update(change_keys)
+
+        await invalidate(redis, *keys)
+        await redis.set(LISTENING_KEY, 1, ex=LISTENING_TTL)
+        logger.info('Catalog change: evicted %s', sorted(keys))
@@ -0,0 +1,100 @@
+"""Cross-worker cache invalidation over Redis pub/sub."""
+import json
+import asyncio
+from typing import Optional
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.cache.local import LocalCache, local_cache, fallback_cache
+from app.cache.keys import etag_key, lock_key
+from app.core.logger import get_logger
+
+logger = get_logger()
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+RECONNECT_DELAY = 1
+# Bounds each read, so the pool's socket timeout never fires while idle.
+POLL_TIMEOUT = 1
+
+
+async def invalidate(redis: Redis, *keys: str) -> None:
+    """
+    Evict keys from Redis and from the local cache of every worker.
+
+    Redis keys (and the ETags stored next to them) are deleted before the
+    message is published, so a worker that refills its local cache after
+    receiving it reads the new value. Their rebuild locks are deleted too,
+    so a rebuild already running does not store what it read before the
+    change (see TieredCache._regenerate).
+
+    If Redis is unavailable, only this worker's caches are evicted and the
+    error is logged: other workers serve Redis-less from their fallback
+    cache, whose TTL bounds the staleness.
+
+    Args:
+        redis (Redis): Redis client.
+        *keys (str): Cache keys to evict.
+    """
+    if not keys:
+        return
+    try:
+        await redis.delete(
+            *keys,
+            *(etag_key(key) for key in keys),
+            *(lock_key(key) for key in keys)
+        )
+        await redis.publish(INVALIDATION_CHANNEL, json.dumps(list(keys)))
+    except RedisError as exc:
+        logger.error('invalidate %s: %s', keys, exc)
+        local_cache.invalidate(*keys)
+        fallback_cache.invalidate(*keys)
+
+
+async def listen_for_invalidations(
+    redis: Redis,
+    local: LocalCache = local_cache,
+    fallback: Optional[LocalCache] = fallback_cache
+) -> None:
+    """
+    Apply invalidation messages to the local caches until cancelled.
+
+    The local cache is enabled only while subscribed. On connection loss it
+    is cleared and disabled, then the subscription is retried.
+
+    Args:
+        redis (Redis): Redis client.
+        local (LocalCache): Local cache to keep in sync.
+        fallback (Optional[LocalCache]): Fallback cache to keep in sync
+            while subscribed.
+    """
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            local.clear()
+            local.enabled = True
+            logger.info('Subscribed to %s', INVALIDATION_CHANNEL)
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=POLL_TIMEOUT
+                )
+                if message is None or message['type'] != 'message':
+                    continue
+                keys = json.loads(message['data'])
+                local.invalidate(*keys)
+                if fallback is not None:
+                    fallback.invalidate(*keys)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # pylint: disable=W0718
+            logger.error('listen_for_invalidations: %s', exc)
+        finally:
+            local.enabled = False
+            local.clear()
+            try:
+                await pubsub.aclose()
+            except Exception:  # pylint: disable=W0718
+                pass
+
+        await asyncio.sleep(RECONNECT_DELAY)
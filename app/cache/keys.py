@@ -0,0 +1,21 @@
+"""Names of the Redis keys stored alongside a cached payload."""
+
+
+def etag_key(key: str) -> str:
+    """Key holding the ETag of the payload at `key`."""
+    return f'{key}:etag'
+
+
+def fresh_key(key: str) -> str:
+    """Key of the marker that expires when the payload at `key` turns stale."""
+    return f'{key}:fresh'
+
+
+def lock_key(key: str) -> str:
+    """Key of the lock held while the payload at `key` is rebuilt."""
+    return f'lock:{key}'
+
+
+def key_family(key: str) -> str:
+    """Prefix of a key before its first `:`, a bounded metric label."""
+    return key.split(':', 1)[0]
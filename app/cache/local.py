@@ -0,0 +1,116 @@
+"""In-process (L1) cache."""
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+class LocalCache:
+    """
+    Bounded per-worker cache with TTL and version-checked fills.
+
+    Entries are evicted in LRU order once `maxsize` is reached and expire
+    after `ttl` seconds, or sooner if stored with a shorter TTL. Every
+    invalidation bumps `version`; a fill that started before an
+    invalidation carries the old version and is dropped, so a slow reader
+    can not put a stale value back after an eviction.
+
+    The cache only serves values while `enabled` is set. The invalidation
+    listener enables it once it is subscribed and disables it whenever the
+    subscription is lost, because invalidations could be missed meanwhile.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept.
+            ttl (float): Entry lifetime in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self.enabled = False
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value by key.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None on miss or expiry.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        version: Optional[int] = None,
+        ttl: Optional[float] = None
+    ) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (str): Cache key.
+            value (Any): Value to store.
+            version (Optional[int]): Version observed before the value was
+                read from its source. The value is dropped if an
+                invalidation happened since.
+            ttl (Optional[float]): Lifetime of this entry in seconds,
+                capped at the cache's own TTL.
+        """
+        if not self.enabled:
+            return
+        if version is not None and version != self.version:
+            return
+
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + lifetime, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given keys and reject in-flight fills."""
+        self.version += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reject in-flight fills."""
+        self.version += 1
+        self._entries.clear()
+
+
+local_cache = LocalCache(
+    maxsize=settings.l1_cache_maxsize,
+    ttl=settings.l1_cache_ttl
+)
+
+# Always enabled and never cleared on subscription loss: it is served only
+# while Redis is unavailable, when a possibly stale value beats none.
+fallback_cache = LocalCache(
+    maxsize=settings.fallback_cache_maxsize,
+    ttl=settings.fallback_cache_ttl
+)
+fallback_cache.enabled = True
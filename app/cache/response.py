@@ -0,0 +1,144 @@
+"""Helpers for serving pre-serialized JSON payloads."""
+import hashlib
+from typing import Any, NamedTuple, Optional
+import orjson
+from fastapi import Request, Response, status
+
+
+# Cached for ids that do not exist. Entities are cached as JSON objects,
+# so this can not be mistaken for a real value.
+NEGATIVE_BODY = b'null'
+
+
+class CachedPayload(NamedTuple):
+    """Encoded JSON payload and its ETag."""
+
+    body: bytes
+    etag: str
+
+    @property
+    def is_negative(self) -> bool:
+        """Whether this records that the entity does not exist."""
+        return self.body == NEGATIVE_BODY
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value to JSON bytes.
+
+    Args:
+        value (Any): JSON-serializable value (datetimes are supported).
+
+    Returns:
+        bytes: The encoded payload.
+    """
+    return orjson.dumps(value)
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Compute a strong ETag from the payload content.
+
+    Args:
+        body (bytes): Encoded payload.
+
+    Returns:
+        str: Quoted content hash.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def make_payload(body: bytes, etag: Optional[str] = None) -> CachedPayload:
+    """Pair a body with its ETag, computing it if not known."""
+    return CachedPayload(body, etag or make_etag(body))
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag.
+
+    Args:
+        request (Request): Incoming request.
+        etag (Optional[str]): Current ETag, None if unknown.
+
+    Returns:
+        bool: True if the client already has this version.
+    """
+    if etag is None:
+        return False
+
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+async def not_modified_response(
+    request: Request,
+    cache,
+    key: str,
+    cache_control: Optional[str] = None,
+    **build
+) -> Optional[Response]:
+    """
+    Answer a conditional GET from the cached ETag alone.
+
+    Only the ETag is read (from the local cache or its own Redis key), never
+    the payload. Passing the `get_or_build` arguments of the payload lets a
+    stale value be refreshed in the background, as a full read would.
+
+    Args:
+        request (Request): Incoming request.
+        cache (TieredCache): Cache holding the payload.
+        key (str): Cache key of the payload.
+        cache_control (Optional[str]): Cache-Control header value.
+        **build: `loader`, `ttl` and `stale_ttl` of the payload.
+
+    Returns:
+        Optional[Response]: A 304 response, or None if the payload is needed.
+    """
+    if 'if-none-match' not in request.headers:
+        return None
+
+    etag = await cache.get_etag(key, **build)
+    if not etag_matches(request, etag):
+        return None
+
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=_cache_headers(etag, cache_control)
+    )
+
+
+def json_response(payload: CachedPayload, cache_control: Optional[str] = None) -> Response:
+    """
+    Wrap an already encoded JSON payload into a response.
+
+    The payload is sent as is, skipping FastAPI's validation and
+    serialization of the route's response model.
+
+    Args:
+        payload (CachedPayload): Encoded JSON and its ETag.
+        cache_control (Optional[str]): Cache-Control header value.
+
+    Returns:
+        Response: Response with the JSON content type.
+    """
+    return Response(
+        content=payload.body,
+        media_type='application/json',
+        headers=_cache_headers(payload.etag, cache_control)
+    )
+
+
+def _cache_headers(etag: str, cache_control: Optional[str]) -> dict:
+    """Build the ETag and Cache-Control headers."""
+    headers = {'ETag': etag}
+    if cache_control:
+        headers['Cache-Control'] = cache_control
+    return headers
@@ -0,0 +1,505 @@
+"""Two-tier cache: per-worker LocalCache in front of Redis."""
+import json
+import time
+import uuid
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache.local import LocalCache, local_cache, fallback_cache
+from app.cache.response import CachedPayload, dumps, make_payload
+from app.cache.keys import etag_key, fresh_key, key_family, lock_key
+from app.cache.invalidation import INVALIDATION_CHANNEL
+from app.db.database import AsyncSessionLocal
+from app.redis_client import redis_breaker
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.logger import get_logger
+from app.metrics import cache_regenerations, cache_bypasses
+
+logger = get_logger()
+
+Loader = Callable[[Optional[AsyncSession]], Awaitable[Any]]
+
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+# Deletes the lock only if it is still held by the caller.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Stores a rebuilt payload (and publishes the change, unless the channel is
+# empty) only while the rebuild still holds its lock. invalidate() deletes the lock, so a rebuild
+# that read the database before a change can not write back the old value.
+WRITE_REBUILT_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('set', KEYS[2], ARGV[2], 'EX', ARGV[4])
+redis.call('set', KEYS[3], ARGV[3], 'EX', ARGV[4])
+if tonumber(ARGV[5]) > 0 then
+    redis.call('set', KEYS[4], 1, 'EX', ARGV[5])
+end
+if ARGV[6] ~= '' then
+    redis.call('publish', ARGV[6], ARGV[7])
+end
+return 1
+"""
+
+# Rebuilds running in this worker, by cache key.
+_inflight: dict[str, asyncio.Task] = {}
+
+
+class CacheUnavailable(Exception):
+    """Redis was skipped or failed; the caller degrades."""
+
+
+class TieredCache:
+    """
+    Read-through cache of encoded JSON payloads.
+
+    Values are stored as orjson-encoded bytes in Redis and, unless `local`
+    is None, in the per-worker local cache in front of it, so a hit can be
+    returned to the client without decoding or re-encoding. Each payload's
+    ETag is kept under its own Redis key, so conditional requests can be
+    answered without reading the payload.
+
+    One instance is meant to live for a single request: the local cache
+    version is captured on a miss and used to validate the later fill.
+
+    Redis calls go through a circuit breaker and never raise. While Redis
+    is failing, reads are answered from the in-process `fallback` cache
+    (kept filled with every payload seen) or miss, so the caller falls
+    through to the database; writes only reach the fallback.
+
+    Keys cached without either local tier live in Redis alone, so their
+    rebuilds are not published on the invalidation channel: no worker
+    holds a copy to drop, and every message would bump the version of
+    each worker's local cache.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        local: Optional[LocalCache] = local_cache,
+        session_factory: Optional[async_sessionmaker] = AsyncSessionLocal,
+        fallback: Optional[LocalCache] = fallback_cache,
+        breaker: CircuitBreaker = redis_breaker
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            redis (Redis): Redis client.
+            local (Optional[LocalCache]): Per-worker cache in front of Redis,
+                or None to use Redis only.
+            session_factory (Optional[async_sessionmaker]): Sessions for
+                loaders run by `get_or_build`, or None for loaders that do
+                not use the database (they are passed None).
+            fallback (Optional[LocalCache]): Served while Redis is
+                unavailable, or None to go straight to the database.
+            breaker (CircuitBreaker): Guards the Redis calls.
+        """
+        self.redis = redis
+        self.local = local
+        self.session_factory = session_factory
+        self.fallback = fallback
+        self.breaker = breaker
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[CachedPayload]:
+        """
+        Get an encoded payload, filling the local cache from Redis on a miss.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[CachedPayload]: The cached payload, or None if neither
+                tier has it.
+        """
+        payload = self._get_local(key)
+        if payload is not None:
+            return payload
+
+        try:
+            body, etag = await self._redis(lambda: self.redis.mget(key, etag_key(key)))
+        except CacheUnavailable:
+            return self._get_fallback(key)
+        if body is None:
+            return None
+
+        payload = make_payload(body, etag and etag.decode())
+        self._set_local(key, payload)
+        return payload
+
+    async def get_etag(
+        self,
+        key: str,
+        loader: Optional[Loader] = None,
+        ttl: int = 0,
+        stale_ttl: int = 0
+    ) -> Optional[str]:
+        """
+        Get the ETag of a cached payload without reading the payload.
+
+        Given the loader and TTLs of `get_or_build`, a stale value found in
+        Redis gets the same single background refresh, so a value only ever
+        revalidated by conditional requests does not stay stale.
+
+        Args:
+            key (str): Cache key.
+            loader (Optional[Loader]): Rebuilds a stale value.
+            ttl (int): Seconds the value is fresh.
+            stale_ttl (int): Seconds a stale value may still be served.
+
+        Returns:
+            Optional[str]: The ETag, or None if not cached.
+        """
+        if self.local is not None:
+            payload = self.local.get(key)
+            if payload is not None:
+                return payload.etag
+
+        try:
+            etag, fresh = await self._redis(lambda: self.redis.mget(etag_key(key), fresh_key(key)))
+        except CacheUnavailable:
+            payload = self._get_fallback(key)
+            return payload.etag if payload is not None else None
+        if etag is None:
+            return None
+
+        if loader is not None and stale_ttl and fresh is None:
+            self._rebuild(key, loader, ttl, stale_ttl, wait=False)
+        return etag.decode()
+
+    async def set(self, key: str, value: Any, ex: int) -> CachedPayload:
+        """
+        Encode a value and store it in both tiers.
+
+        Args:
+            key (str): Cache key.
+            value (Any): JSON-serializable value.
+            ex (int): Redis TTL in seconds.
+
+        Returns:
+            CachedPayload: The encoded payload.
+        """
+        payload = make_payload(dumps(value))
+
+        async def write():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, payload.body, ex=ex)
+                pipe.set(etag_key(key), payload.etag, ex=ex)
+                await pipe.execute()
+
+        try:
+            await self._redis(write)
+        except CacheUnavailable:
+            pass
+
+        self._set_local(key, payload, ex)
+        return payload
+
+    async def get_many(self, keys: List[str]) -> List[Optional[CachedPayload]]:
+        """
+        Get several encoded payloads with at most one Redis round-trip.
+
+        Keys found in the local cache are not requested from Redis; the
+        rest are fetched with a single MGET.
+
+        Args:
+            keys (List[str]): Cache keys.
+
+        Returns:
+            List[Optional[CachedPayload]]: Payloads in the order of `keys`,
+                None for misses.
+        """
+        payloads = [self._get_local(key) for key in keys]
+        missing = [key for key, payload in zip(keys, payloads) if payload is None]
+        if not missing:
+            return payloads
+
+        try:
+            values = await self._redis(
+                lambda: self.redis.mget(*missing, *(etag_key(key) for key in missing))
+            )
+        except CacheUnavailable:
+            found = {key: self._get_fallback(key) for key in missing}
+            return [payload or found[key] for key, payload in zip(keys, payloads)]
+
+        found = {}
+        for key, body, etag in zip(missing, values, values[len(missing):]):
+            if body is not None:
+                found[key] = make_payload(body, etag and etag.decode())
+                self._set_local(key, found[key])
+
+        return [payload or found.get(key) for key, payload in zip(keys, payloads)]
+
+    async def set_many(self, values: Dict[str, Any], ex: int) -> Dict[str, CachedPayload]:
+        """
+        Encode several values and store them in both tiers in one pipeline.
+
+        Args:
+            values (Dict[str, Any]): JSON-serializable values by cache key.
+            ex (int): Redis TTL in seconds.
+
+        Returns:
+            Dict[str, CachedPayload]: The encoded payloads by cache key.
+        """
+        payloads = {key: make_payload(dumps(value)) for key, value in values.items()}
+        if not payloads:
+            return payloads
+
+        async def write():
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, payload in payloads.items():
+                    pipe.set(key, payload.body, ex=ex)
+                    pipe.set(etag_key(key), payload.etag, ex=ex)
+                await pipe.execute()
+
+        try:
+            await self._redis(write)
+        except CacheUnavailable:
+            pass
+
+        for key, payload in payloads.items():
+            self._set_local(key, payload, ex)
+        return payloads
+
+    async def get_or_build(
+        self,
+        key: str,
+        loader: Loader,
+        ttl: int,
+        stale_ttl: int = 0
+    ) -> CachedPayload:
+        """
+        Get an encoded payload, rebuilding it at most once per expiry.
+
+        Concurrent misses in a worker share one rebuild, and a short Redis
+        lock lets only one worker run it while the others wait for the
+        result. The loader runs in its own session, so the rebuild is not
+        tied to the request that started it.
+
+        With `stale_ttl`, the value outlives its TTL by that many seconds.
+        A stale value is returned immediately while a single background
+        task refreshes it.
+
+        While Redis is unavailable the fallback cache is served, and a
+        miss is loaded straight from the database (still once per worker).
+
+        Args:
+            key (str): Cache key.
+            loader (Loader): Builds the value from a database session.
+            ttl (int): Seconds the value is fresh.
+            stale_ttl (int): Seconds a stale value may still be served.
+
+        Returns:
+            CachedPayload: The encoded payload.
+        """
+        payload = self._get_local(key)
+        if payload is not None:
+            return payload
+
+        try:
+            body, etag, fresh = await self._redis(
+                lambda: self.redis.mget(key, etag_key(key), fresh_key(key))
+            )
+        except CacheUnavailable:
+            body = None
+            payload = self._get_fallback(key)
+            if payload is not None:
+                return payload
+
+        if body is not None:
+            if stale_ttl and fresh is None:
+                self._rebuild(key, loader, ttl, stale_ttl, wait=False)
+            payload = make_payload(body, etag and etag.decode())
+            if etag is None:
+                # Written before ETags were stored; make it cheap to check.
+                try:
+                    await self._redis(
+                        lambda: self.redis.set(etag_key(key), payload.etag, ex=ttl + stale_ttl)
+                    )
+                except CacheUnavailable:
+                    pass
+            self._set_local(key, payload, ttl + stale_ttl)
+            return payload
+
+        payload = await asyncio.shield(self._rebuild(key, loader, ttl, stale_ttl, wait=True))
+        if payload is None:
+            # Joined a background refresh that yielded to another worker.
+            payload = await self._regenerate(key, loader, ttl, stale_ttl, wait=True)
+        self._set_local(key, payload, ttl + stale_ttl)
+        return payload
+
+    def _rebuild(
+        self,
+        key: str,
+        loader: Loader,
+        ttl: int,
+        stale_ttl: int,
+        wait: bool
+    ) -> asyncio.Task:
+        """Start a rebuild of `key`, or join the one already running here."""
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._regenerate(key, loader, ttl, stale_ttl, wait))
+            _inflight[key] = task
+            task.add_done_callback(lambda _: _inflight.pop(key, None))
+        return task
+
+    async def _regenerate(
+        self,
+        key: str,
+        loader: Loader,
+        ttl: int,
+        stale_ttl: int,
+        wait: bool
+    ) -> Optional[CachedPayload]:
+        """
+        Rebuild a payload under a Redis lock.
+
+        If another worker holds the lock, a caller that needs the value
+        polls Redis until it appears (or the lock times out, then rebuilds
+        itself); a background refresh just gives up. Without Redis, the
+        value is only loaded and kept in the fallback cache.
+
+        The result is written to Redis only if this rebuild holds the lock
+        when the load ends (see WRITE_REBUILT_SCRIPT); otherwise, e.g.
+        after an invalidation, it is returned to the callers but not
+        cached.
+        """
+        lock = lock_key(key)
+        token = uuid.uuid4().hex
+        acquired = False
+
+        async def acquire() -> bool:
+            return await self._redis(
+                lambda: self.redis.set(lock, token, nx=True, ex=LOCK_TIMEOUT)
+            )
+
+        try:
+            try:
+                acquired = await acquire()
+                if not acquired:
+                    if not wait:
+                        return None
+                    payload = await self._wait_for(key)
+                    if payload is not None:
+                        return payload
+                    acquired = await acquire()
+            except CacheUnavailable:
+                return await self._load(key, loader)
+
+            payload = await self._load(key, loader)
+            cache_regenerations.inc({'key': key_family(key)})
+            if not acquired:
+                return payload
+
+            local_tiers = self.local is not None or self.fallback is not None
+            channel = INVALIDATION_CHANNEL if local_tiers else ''
+            try:
+                await self._redis(lambda: self.redis.eval(
+                    WRITE_REBUILT_SCRIPT, 4,
+                    lock, key, etag_key(key), fresh_key(key),
+                    token, payload.body, payload.etag, ttl + stale_ttl,
+                    ttl if stale_ttl else 0, channel, json.dumps([key])
+                ))
+            except CacheUnavailable:
+                pass
+            return payload
+        except Exception as exc:
+            if wait:
+                raise
+            logger.error('Background refresh of %s failed: %s', key, exc)
+            return None
+        finally:
+            if acquired:
+                try:
+                    await self._redis(
+                        lambda: self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock, token)
+                    )
+                except CacheUnavailable:
+                    pass
+
+    async def _load(self, key: str, loader: Loader) -> CachedPayload:
+        """Run the loader in its own session and keep the result in the fallback."""
+        if self.session_factory is None:
+            value = await loader(None)
+        else:
+            async with self.session_factory() as session:
+                value = await loader(session)
+        payload = make_payload(dumps(value))
+        if self.fallback is not None:
+            self.fallback.set(key, payload)
+        return payload
+
+    async def _wait_for(self, key: str) -> Optional[CachedPayload]:
+        """Poll Redis for a value being rebuilt by another worker."""
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            try:
+                body, etag = await self._redis(lambda: self.redis.mget(key, etag_key(key)))
+            except CacheUnavailable:
+                return None
+            if body is not None:
+                return make_payload(body, etag and etag.decode())
+        return None
+
+    async def _redis(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a Redis call through the circuit breaker.
+
+        Raises:
+            CacheUnavailable: If the circuit is open or the call failed.
+        """
+        try:
+            return await self.breaker.call(call)
+        except CircuitOpenError as exc:
+            cache_bypasses.inc({'reason': 'open'})
+            raise CacheUnavailable() from exc
+        except RedisError as exc:
+            cache_bypasses.inc({'reason': 'error'})
+            logger.error('Redis call failed, bypassing the cache: %s', exc)
+            raise CacheUnavailable() from exc
+
+    def _get_fallback(self, key: str) -> Optional[CachedPayload]:
+        """Read the fallback tier, used while Redis is unavailable."""
+        if self.fallback is None:
+            return None
+        return self.fallback.get(key)
+
+    def _get_local(self, key: str) -> Optional[CachedPayload]:
+        """Read the local tier and remember its version for the later fill."""
+        if self.local is None:
+            return None
+        payload = self.local.get(key)
+        if payload is None:
+            self._versions[key] = self.local.version
+        return payload
+
+    def _set_local(self, key: str, payload: CachedPayload, ttl: Optional[int] = None) -> None:
+        """
+        Fill the local tiers unless invalidated since the read.
+
+        Entries live at most `ttl` seconds, the Redis TTL of the payload.
+        A payload read back from Redis comes without its remaining TTL, so
+        a negative one, whose TTL is short, is not kept locally.
+        """
+        if ttl is None and payload.is_negative:
+            self._versions.pop(key, None)
+            return
+        if self.fallback is not None:
+            self.fallback.set(key, payload, ttl=ttl)
+        if self.local is None:
+            return
+        version = self._versions.pop(key, self.local.version)
+        self.local.set(key, payload, version, ttl=ttl)
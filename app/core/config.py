@@ -11,6 +11,14 @@ class Settings(BaseSettings):
     # Redis
     redis_host: str
     redis_port: int
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 1
+    redis_socket_timeout: float = 1
+    redis_socket_connect_timeout: float = 1
+    redis_health_check_interval: int = 15
+    redis_startup_timeout: float = 30
+    redis_breaker_failure_threshold: int = 5
+    redis_breaker_recovery_timeout: float = 30
     mode: str
     # Database
     db_hostname: str
@@ -27,15 +35,71 @@ class Settings(BaseSettings):
     cdek_grant_type: str
     cdek_client_id: str
     cdek_client_secret: str
+    cdek_max_connections: int = 20
+    cdek_max_keepalive_connections: int = 10
+    cdek_timeout: float = 30
+    cdek_connect_timeout: float = 5
+    cdek_http2: bool = False
+    cdek_token_refresh_fraction: float = 0.8
+    cdek_token_expiry_margin: int = 60
+    cdek_quote_budget: float = 3
+    cdek_breaker_failure_threshold: int = 5
+    cdek_breaker_recovery_timeout: float = 30
+    # Outbound CDEK calls, shared by every worker and host
+    cdek_rate_limit: float = 10
+    cdek_rate_limit_burst: int = 20
+    cdek_rate_limit_max_wait: float = 1
+    # Delivery quote cache
+    quote_cache_ttl: int = 21600
+    quote_last_good_ttl: int = 604800
+    multi_quote_concurrency: int = 8
+    # Precomputed quotes for top cities and product parcels
+    quote_matrix_enabled: bool = True
+    quote_matrix_top_cities: int = 30
+    quote_matrix_interval: int = 10800
+    quote_matrix_qps: float = 2
+    quote_weight_bucket: int = 100
+    quote_size_bucket: int = 1
     # Tinkoff
     tinkoff_url: str
     terminal_key: str
     terminal_pwd: str
     terminal_desc: str
+    tinkoff_max_connections: int = 10
+    tinkoff_max_keepalive_connections: int = 5
+    tinkoff_timeout: float = 30
+    tinkoff_connect_timeout: float = 5
+    tinkoff_http2: bool = False
+    # Catalog prices are in roubles, Tinkoff amounts in kopecks
+    receipt_price_multiplier: int = 100
+    payment_notifications_batch_size: int = 100
+    # Payment status lookups and reconciliation of missed notifications
+    payment_status_ttl: int = 30
+    payment_status_stale_ttl: int = 3600
+    payment_reconcile_enabled: bool = True
+    payment_reconcile_interval: int = 600
+    payment_reconcile_age_minutes: int = 30
+    payment_reconcile_max_age_hours: int = 48
+    payment_reconcile_batch_size: int = 200
+    payment_reconcile_concurrency: int = 5
+    # Idempotency-Key handling of checkout
+    idempotency_ttl: int = 86400
+    idempotency_lock_timeout: int = 60
+    idempotency_wait: float = 10
     # Creds
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    # Local (L1) cache
+    l1_cache_maxsize: int = 512
+    l1_cache_ttl: int = 300
+    # In-process fallback served while Redis is unavailable
+    fallback_cache_maxsize: int = 512
+    fallback_cache_ttl: int = 300
+    # Startup warm-up
+    warmup_enabled: bool = True
+    warmup_timeout: float = 10
+    warmup_db_connections: int = 5
 
     class Config:
         env_file = '.env'
@@ -1,17 +1,43 @@
+from typing import Optional
 from redis.asyncio import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.database import AsyncSessionLocal
+from app.http_client import HttpClients, http_clients
 # from app.repositories.user_repository import UserRepository
 # from app.repositories.request_repository import RequestRepository
 
 
 class DependencyFactory:
-    def __init__(self, db: AsyncSession, cache: Redis):
+    def __init__(
+        self,
+        cache: Redis,
+        db: Optional[AsyncSession] = None,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        http: HttpClients = http_clients
+    ):
+        """
+        Initialize the factory.
+
+        Args:
+            cache (Redis): Redis client.
+            db (Optional[AsyncSession]): Session to use. If None, one is
+                opened on first access to `db`.
+            session_factory (async_sessionmaker): Opens the lazy session.
+            http (HttpClients): Shared clients for upstream APIs.
+        """
         self._db = db
+        self._owns_db = False
         self._cache = cache
+        self._session_factory = session_factory
+        self._http = http
 
     @property
     def db(self) -> AsyncSession:
-        """Get the database session."""
+        """Get the database session, opening it on first access."""
+        if self._db is None:
+            self._db = self._session_factory()
+            self._owns_db = True
         return self._db
 
     @property
@@ -19,6 +45,18 @@ class DependencyFactory:
         """Get the Redis client."""
         return self._cache
 
+    @property
+    def http(self) -> HttpClients:
+        """Get the shared upstream HTTP clients."""
+        return self._http
+
+    async def close(self) -> None:
+        """Close the session if this factory opened it."""
+        if self._owns_db:
+            await self._db.close()
+            self._db = None
+            self._owns_db = False
+
     # def get_user_repository(self) -> UserRepository:
     #     """Create and return a UserRepository instance."""
     #     return UserRepository(db=self.db, redis_client=self.redis)
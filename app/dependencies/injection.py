@@ -1,8 +1,8 @@
 import os
 import json
+from typing import AsyncIterator
 from fastapi import status, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
 
 from app.services.email_service import EmailService
@@ -10,7 +10,6 @@ from app.repositories.user_repo import UserRepository
 from app.repositories.token_repository import TokenRepository
 from app.dependencies.factory import DependencyFactory
 from app.schemas.users import UserOut
-from app.db.database import get_db
 from app.redis_client import get_redis_client
 from app.utils.oauth2 import verify_access_token
 
@@ -24,12 +23,20 @@ def get_email_service() -> EmailService:
     return EmailService()
 
 
-def get_factory(
-    db: AsyncSession = Depends(get_db),
+async def get_factory(
     rc: Redis = Depends(get_redis_client),
-) -> DependencyFactory:
-    """Get factory instance."""
-    return DependencyFactory(db=db, cache=rc)
+) -> AsyncIterator[DependencyFactory]:
+    """
+    Get factory instance.
+
+    The database session is opened only if the request uses it, and
+    closed when the request ends.
+    """
+    factory = DependencyFactory(cache=rc)
+    try:
+        yield factory
+    finally:
+        await factory.close()
 
 
 def get_token_service(
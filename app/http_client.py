@@ -0,0 +1,107 @@
+"""Application-scoped HTTP clients for upstream APIs."""
+from typing import Optional
+import httpx
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger()
+
+try:
+    import h2  # noqa: F401  pylint: disable=W0611
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def make_client(
+    name: str,
+    max_connections: int,
+    max_keepalive_connections: int,
+    timeout: float,
+    connect_timeout: float,
+    http2: bool = False
+) -> httpx.AsyncClient:
+    """
+    Create a pooled client for one upstream.
+
+    Args:
+        name (str): Upstream name, used in logs.
+        max_connections (int): Maximum open connections.
+        max_keepalive_connections (int): Idle connections kept alive.
+        timeout (float): Read, write and pool timeout in seconds.
+        connect_timeout (float): Connect timeout in seconds.
+        http2 (bool): Use HTTP/2 if the h2 package is installed.
+
+    Returns:
+        httpx.AsyncClient: The client.
+    """
+    if http2 and not HTTP2_AVAILABLE:
+        logger.warning('HTTP/2 requested for %s but h2 is not installed, using HTTP/1.1', name)
+        http2 = False
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        http2=http2
+    )
+
+
+class HttpClients:
+    """
+    Keep-alive clients shared by all requests of a worker.
+
+    Created in the application lifespan, so connections (and their DNS,
+    TCP and TLS setup) are reused across CDEK and Tinkoff calls.
+    """
+
+    def __init__(self):
+        self._cdek: Optional[httpx.AsyncClient] = None
+        self._tinkoff: Optional[httpx.AsyncClient] = None
+
+    @property
+    def cdek(self) -> httpx.AsyncClient:
+        """Get the CDEK client."""
+        if self._cdek is None:
+            raise RuntimeError('HTTP clients are not started')
+        return self._cdek
+
+    @property
+    def tinkoff(self) -> httpx.AsyncClient:
+        """Get the Tinkoff client."""
+        if self._tinkoff is None:
+            raise RuntimeError('HTTP clients are not started')
+        return self._tinkoff
+
+    def start(self) -> None:
+        """Create the clients."""
+        self._cdek = make_client(
+            'cdek',
+            max_connections=settings.cdek_max_connections,
+            max_keepalive_connections=settings.cdek_max_keepalive_connections,
+            timeout=settings.cdek_timeout,
+            connect_timeout=settings.cdek_connect_timeout,
+            http2=settings.cdek_http2
+        )
+        self._tinkoff = make_client(
+            'tinkoff',
+            max_connections=settings.tinkoff_max_connections,
+            max_keepalive_connections=settings.tinkoff_max_keepalive_connections,
+            timeout=settings.tinkoff_timeout,
+            connect_timeout=settings.tinkoff_connect_timeout,
+            http2=settings.tinkoff_http2
+        )
+
+    async def close(self) -> None:
+        """Close the clients and their connections."""
+        for client in (self._cdek, self._tinkoff):
+            if client is not None:
+                await client.aclose()
+        self._cdek = None
+        self._tinkoff = None
+
+
+http_clients = HttpClients()
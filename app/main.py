@@ -1,5 +1,6 @@
 """Create app."""
 import time
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -14,7 +15,16 @@ from app.routes import payment
 from app.routes import user
 from app.routes import promo_code
 from app.routes import city
-from app.redis_client import redis_client
+from app.routes import cart
+from app.redis_client import redis_client, redis_manager
+from app.http_client import http_clients
+from app.cache.invalidation import listen_for_invalidations
+from app.cache.catalog_listener import listen_for_catalog_changes
+from app.warmup import warm_up
+from app.services.quote_matrix import run_quote_matrix
+from app.services.payment_notifications import run_payment_notifications
+from app.services.payment_reconciliation import run_payment_reconciliation
+from app.core.config import settings
 from app.core.logger import get_logger
 # from app.metrics import request_counter
 # from app.metrics import response_counter
@@ -26,12 +36,36 @@ logger = get_logger()
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """FastApi lifecycle."""
+    await redis_manager.connect(settings.redis_startup_timeout)
+    http_clients.start()
+
+    catalog_ready = asyncio.Event()
+    tasks = [
+        asyncio.create_task(redis_manager.monitor()),
+        asyncio.create_task(listen_for_invalidations(redis_client)),
+        asyncio.create_task(listen_for_catalog_changes(redis_client, catalog_ready)),
+        asyncio.create_task(run_payment_notifications(redis_client)),
+    ]
+
+    if settings.quote_matrix_enabled:
+        tasks.append(asyncio.create_task(run_quote_matrix(redis_client, http_clients.cdek)))
+
+    if settings.payment_reconcile_enabled:
+        tasks.append(asyncio.create_task(run_payment_reconciliation(redis_client, http_clients.tinkoff)))
+
+    if settings.warmup_enabled:
+        await warm_up(redis_client, catalog_ready)
 
     yield
 
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    await http_clients.close()
+
     try:
-        await redis_client.close()
-        await redis_client.connection_pool.disconnect()
+        await redis_manager.close()
     except Exception as e:
         print(f"Error during Redis shutdown: {e}")
 
@@ -63,6 +97,7 @@ app.include_router(root.router)
 app.include_router(user.router)
 app.include_router(promo_code.router)
 app.include_router(city.router)
+app.include_router(cart.router)
 
 
 
@@ -1,4 +1,4 @@
-from aioprometheus import Counter, Histogram
+from aioprometheus import Counter, Gauge, Histogram
 
 
 request_counter = Counter(name="requests_total", doc="Total number of requests received")
@@ -7,4 +7,66 @@ response_histogram = Histogram(
     name="response_time_seconds",
     doc="Histogram for response time of requests",
     buckets=[0.1, 0.5, 1, 1.5, 2]
-)
\ No newline at end of file
+)
+
+cache_regenerations = Counter(
+    name="cache_regenerations_total",
+    doc="Number of times a cached payload was rebuilt, by key family (the key up to its first colon)"
+)
+cache_negative_hits = Counter(
+    name="cache_negative_hits_total",
+    doc="Lookups of unknown ids answered from the negative cache, by entity"
+)
+circuit_breaker_state = Gauge(
+    name="circuit_breaker_state",
+    doc="Circuit breaker state by dependency: 0 closed, 1 half open, 2 open"
+)
+cache_bypasses = Counter(
+    name="cache_bypasses_total",
+    doc="Cache operations that skipped Redis, by reason (open circuit or error)"
+)
+delivery_quote_lookups = Counter(
+    name="delivery_quote_cache_total",
+    doc="Delivery quote lookups by result: hit (no CDEK call), miss or stale"
+)
+cdek_token_refreshes = Counter(
+    name="cdek_token_refreshes_total",
+    doc="CDEK tokens fetched; rate over 1h gives refreshes per hour"
+)
+quote_matrix_refreshes = Counter(
+    name="quote_matrix_refreshes_total",
+    doc="Quotes precomputed by the quote matrix job"
+)
+quote_matrix_hits = Counter(
+    name="quote_matrix_hits_total",
+    doc="Quote requests answered from a precomputed quote (CDEK calls saved)"
+)
+rate_limit_waits = Counter(
+    name="rate_limit_waits_total",
+    doc="Calls that queued for a rate limiter token, by dependency"
+)
+rate_limit_wait_seconds = Histogram(
+    name="rate_limit_wait_seconds",
+    doc="Time queued for a rate limiter token, by dependency",
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5]
+)
+rate_limit_rejections = Counter(
+    name="rate_limit_rejections_total",
+    doc="Calls rejected because no rate limiter token came in time, by dependency"
+)
+idempotent_requests = Counter(
+    name="idempotent_requests_total",
+    doc="Requests with an Idempotency-Key by result: executed, replayed, waited, conflict, in_progress or unprotected"
+)
+payment_notifications = Counter(
+    name="payment_notifications_total",
+    doc="Tinkoff payment notifications by result: queued, rejected (bad signature), applied or ignored (unknown order or outdated status)"
+)
+payment_reconciled_orders = Counter(
+    name="payment_reconciled_orders_total",
+    doc="Orders whose status was corrected by the payment reconciliation job"
+)
+payment_reconcile_duration = Gauge(
+    name="payment_reconcile_duration_seconds",
+    doc="Run time of the last payment reconciliation round"
+)
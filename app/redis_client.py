@@ -1,25 +1,124 @@
-from redis.asyncio import Redis, ConnectionError
-from app.core.config import settings
+import asyncio
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.exceptions import RedisError
+from redis.utils import HIREDIS_AVAILABLE
 from tenacity import retry, wait_fixed, stop_after_delay
 
+from app.utils.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger()
+
+
+# Requests wait at most `redis_pool_timeout` for a free connection and
+# `redis_socket_timeout` for a reply, so a Redis outage fails them fast.
+# redis-py picks the hiredis parser by itself when it is installed.
+redis_pool = BlockingConnectionPool(
+    host=settings.redis_host,
+    port=settings.redis_port,
+    max_connections=settings.redis_max_connections,
+    timeout=settings.redis_pool_timeout,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_socket_connect_timeout,
+    health_check_interval=settings.redis_health_check_interval,
+)
 
 # Initialize the Redis client
-redis_client = Redis(host=settings.redis_host, port=settings.redis_port)
+redis_client = Redis(connection_pool=redis_pool)
+
+# Shared by cache access: after repeated failures Redis is skipped for a
+# while instead of failing every request (see TieredCache).
+redis_breaker = CircuitBreaker(
+    'redis',
+    failure_threshold=settings.redis_breaker_failure_threshold,
+    recovery_timeout=settings.redis_breaker_recovery_timeout,
+    exceptions=(RedisError,)
+)
+
+
+class RedisManager:
+    """
+    Connection lifecycle of the shared Redis client.
+
+    Connectivity is verified once at startup and then by a background
+    health check, never inside a request. While Redis is unreachable
+    `degraded` is set.
+    """
+
+    def __init__(self, client: Redis, check_interval: float):
+        """
+        Initialize the manager.
+
+        Args:
+            client (Redis): Managed client.
+            check_interval (float): Seconds between health checks.
+        """
+        self.client = client
+        self.check_interval = check_interval
+        self.degraded = True
+
+    async def connect(self, timeout: float) -> None:
+        """
+        Wait for Redis at startup.
+
+        Starts in degraded mode instead of failing if Redis is still
+        unreachable after `timeout` seconds.
+
+        Args:
+            timeout (float): Seconds to keep retrying.
+        """
+        @retry(wait=wait_fixed(2), stop=stop_after_delay(timeout), reraise=True)
+        async def ping():
+            await self.client.ping()
+
+        try:
+            await ping()
+            self.degraded = False
+            logger.info('Connected to Redis (hiredis: %s)', HIREDIS_AVAILABLE)
+        except RedisError as exc:
+            self.degraded = True
+            logger.error('Redis unavailable at startup, running degraded: %s', exc)
+
+    async def check(self) -> bool:
+        """
+        Ping Redis once and update `degraded`.
+
+        Returns:
+            bool: True if Redis answered.
+        """
+        try:
+            await self.client.ping()
+        except RedisError as exc:
+            if not self.degraded:
+                logger.error('Redis health check failed, running degraded: %s', exc)
+            self.degraded = True
+            return False
+
+        if self.degraded:
+            logger.info('Redis is reachable again')
+        self.degraded = False
+        return True
+
+    async def monitor(self) -> None:
+        """Run health checks until cancelled."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    async def close(self) -> None:
+        """Close the client and its pool."""
+        await self.client.aclose()
+        await self.client.connection_pool.disconnect()
+
 
+redis_manager = RedisManager(redis_client, settings.redis_health_check_interval)
 
-@retry(wait=wait_fixed(2), stop=stop_after_delay(30), reraise=True)
-async def connect_to_redis():
-    """Ensure the Redis client can connect."""
-    try:
-        await redis_client.ping()  # Asynchronous ping
-        return redis_client
-    except ConnectionError as e:
-        raise RuntimeError(f"Could not connect to Redis: {e}") from e
 
+def get_redis_client() -> Redis:
+    """
+    Get the shared Redis client.
 
-async def get_redis_client():
-    """Get Redis client with a retry mechanism."""
-    try:
-        return await connect_to_redis()
-    except ConnectionError as e:
-        raise RuntimeError(f"Could not connect to Redis: {e}") from e
+    Does not touch Redis: connectivity is tracked by `redis_manager`.
+    """
+    return redis_client
@@ -2,7 +2,7 @@ from typing import Generic, TypeVar, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import DeclarativeMeta
-from sqlalchemy import desc
+from sqlalchemy import desc, update
 
 T = TypeVar("T", bound=DeclarativeMeta)
 
@@ -11,18 +11,25 @@ class BaseRepository(Generic[T]):
     """
     Base class for repository implementations.
     Provides default implementations for common operations.
+
+    By default every write is committed on its own. With
+    `autocommit=False` the repository works as a unit of work: writes are
+    only flushed, in one open transaction, and the caller ends it with
+    `commit()` (or lets the session roll it back on close).
     """
 
-    def __init__(self, session: AsyncSession, model: T):
+    def __init__(self, session: AsyncSession, model: T, autocommit: bool = True):
         """
         Initialize the repository with a database session and model.
 
         Args:
             session (AsyncSession): Database session for asynchronous operations.
             model (T): SQLAlchemy model class associated with this repository.
+            autocommit (bool): Commit after each write.
         """
         self.session = session
         self.model = model
+        self.autocommit = autocommit
 
     async def get_by_id(self, entity_id: int) -> Optional[T]:
         """
@@ -37,6 +44,23 @@ class BaseRepository(Generic[T]):
         result = await self.session.execute(select(self.model).filter_by(id=entity_id))
         return result.scalars().first()
 
+    async def get_by_ids(self, entity_ids: List[int]) -> List[T]:
+        """
+        Retrieve entities by their IDs in a single query.
+
+        Args:
+            entity_ids (List[int]): The IDs of the entities.
+
+        Returns:
+            List[T]: The entities found, in no particular order.
+        """
+        if not entity_ids:
+            return []
+        result = await self.session.execute(
+            select(self.model).where(self.model.id.in_(entity_ids))
+        )
+        return result.scalars().all()
+
     async def get_all(self) -> List[T]:
         """
         Retrieve all entities.
@@ -58,10 +82,16 @@ class BaseRepository(Generic[T]):
         Args:
             entity (T): The entity to add.
 
+        In a unit of work the entity is only flushed: a single INSERT
+        that returns its id.
+
         Returns:
             T: The added entity.
         """
         self.session.add(entity)
+        if not self.autocommit:
+            await self.session.flush()
+            return entity
         await self.session.commit()
         await self.session.refresh(entity)
         return entity
@@ -80,6 +110,34 @@ class BaseRepository(Generic[T]):
         await self.session.commit()
         return entity
 
+    async def update_fields(self, entity_id: int, **values) -> Optional[T]:
+        """
+        Update columns of an entity with a single UPDATE ... RETURNING.
+
+        Unlike `update`, the row is not loaded first.
+
+        Args:
+            entity_id (int): The ID of the entity.
+            **values: New column values.
+
+        Returns:
+            Optional[T]: The updated entity, or None if there is no such row.
+        """
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == entity_id)
+            .values(**values)
+            .returning(self.model)
+        )
+        entity = result.scalars().first()
+        if self.autocommit:
+            await self.session.commit()
+        return entity
+
+    async def commit(self) -> None:
+        """Commit the unit of work."""
+        await self.session.commit()
+
     async def delete(self, entity_id: int) -> None:
         """
         Delete an entity by its ID.
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.engine import Result
 from sqlalchemy.future import select
 from app.models.city import City
@@ -13,15 +13,18 @@ class CityRepository(BaseRepository[City]):
     def __init__(self, session):
         super().__init__(session, City)
 
-    async def get_by_sequence(self) -> List[City]:
+    async def get_by_sequence(self, limit: Optional[int] = None) -> List[City]:
         """
         Retrieve cities by sequence.
 
+        Args:
+            limit (Optional[int]): Return only the first `limit` cities.
+
         Returns:
             List[City]: A list of cities.
         """
         result: Result = await self.session.execute(
-            select(self.model).order_by(self.model.sequence)
+            select(self.model).order_by(self.model.sequence).limit(limit)
         )
 
         return result.scalars().all()
@@ -0,0 +1,53 @@
+import json
+from typing import Optional
+from redis.asyncio import Redis
+from app.cache.keys import lock_key
+from app.cache.tiered import RELEASE_LOCK_SCRIPT
+
+
+class IdempotencyRepository:
+    """
+    Results of idempotent requests, by Idempotency-Key, in Redis.
+
+    While the first request with a key runs it holds the key's lock;
+    once it succeeds its result is stored under the key itself.
+    """
+
+    def __init__(self, cache: Redis, scope: str):
+        self.cache = cache
+        self.scope = scope
+
+    def result_key(self, key: str) -> str:
+        """Key holding the stored result for an Idempotency-Key."""
+        return f'idempotency:{self.scope}:{key}'
+
+    async def get_result(self, key: str) -> Optional[dict]:
+        """
+        Get the stored result.
+
+        Returns:
+            Optional[dict]: `{'fingerprint', 'response'}`, or None if no
+                request with this key has succeeded yet.
+        """
+        stored = await self.cache.get(self.result_key(key))
+        return json.loads(stored) if stored else None
+
+    async def save_result(self, key: str, fingerprint: str, response: dict, ttl: int) -> None:
+        """Store the result of the request that claimed the key."""
+        await self.cache.set(
+            self.result_key(key),
+            json.dumps({'fingerprint': fingerprint, 'response': response}),
+            ex=ttl
+        )
+
+    async def claim(self, key: str, owner: str, timeout: int) -> bool:
+        """Take the lock that lets a single request run for the key."""
+        return bool(await self.cache.set(lock_key(self.result_key(key)), owner, nx=True, ex=timeout))
+
+    async def is_claimed(self, key: str) -> bool:
+        """Check whether a request with the key is still running."""
+        return await self.cache.get(lock_key(self.result_key(key))) is not None
+
+    async def release(self, key: str, owner: str) -> None:
+        """Release the lock if `owner` still holds it."""
+        await self.cache.eval(RELEASE_LOCK_SCRIPT, 1, lock_key(self.result_key(key)), owner)
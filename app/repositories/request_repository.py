@@ -1,29 +1,123 @@
-from typing import List
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import case, update
 from sqlalchemy.future import select
 from app.models.request import Request
 from app.repositories.base import BaseRepository
 from sqlalchemy.engine import Result
 
+# Stages of a Tinkoff payment. A status is only replaced by one of the same
+# or a later stage, so a notification delivered late never undoes a newer
+# one; statuses not listed rank with NEW.
+STATUS_RANKS = {
+    'NEW': 0,
+    'FORM_SHOWED': 1,
+    'AUTHORIZING': 2, '3DS_CHECKING': 2, '3DS_CHECKED': 2,
+    'AUTHORIZED': 3,
+    'CONFIRMING': 4,
+    'CONFIRMED': 5, 'REVERSING': 5, 'PARTIAL_REVERSED': 5,
+    'REFUNDING': 6, 'PARTIAL_REFUNDED': 6,
+    'REFUNDED': 7, 'REVERSED': 7, 'REJECTED': 7, 'AUTH_FAIL': 7, 'CANCELED': 7, 'DEADLINE_EXPIRED': 7,
+}
+# Statuses of this stage are never replaced at all.
+TERMINAL_RANK = 7
+# Settled payments. Only a refund or reversal by the shop changes them, and
+# that arrives as a notification, so Tinkoff is not asked about them again.
+FINAL_STATUSES = frozenset(
+    {'CONFIRMED', 'PARTIAL_REVERSED', 'PARTIAL_REFUNDED'}
+    | {status for status, rank in STATUS_RANKS.items() if rank == TERMINAL_RANK}
+)
+
 
 class RequestRepository(BaseRepository[Request]):
     """
     Repository class for managing Request entities.
     """
 
-    def __init__(self, session):
-        super().__init__(session, Request)
+    def __init__(self, session, autocommit: bool = True):
+        super().__init__(session, Request, autocommit)
 
-    async def get_by_status(self, status: str) -> List[Request]:
+    async def get_by_status(self, status: str, created_before: Optional[datetime] = None) -> List[Request]:
         """
         Retrieve requests by their status.
 
         Args:
             status (str): The status of the requests to retrieve.
+            created_before (Optional[datetime]): Only requests created
+                before this moment.
 
         Returns:
             List[Requests]: A list of requests matching the status.
         """
+        query = select(self.model).filter_by(status=status)
+        if created_before is not None:
+            query = query.where(self.model.created_at < created_before)
+        result: Result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def get_excluding_statuses(
+        self,
+        statuses: Iterable[str],
+        created_before: Optional[datetime] = None,
+        created_after: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Request]:
+        """
+        Retrieve requests in any status but the given ones, oldest first.
+
+        Args:
+            statuses (Iterable[str]): Statuses to leave out.
+            created_before (Optional[datetime]): Only requests created
+                before this moment.
+            created_after (Optional[datetime]): Only requests created
+                after this moment.
+            limit (Optional[int]): Most requests returned.
+
+        Returns:
+            List[Request]: The matching requests.
+        """
+        query = select(self.model).where(self.model.status.notin_(statuses))
+        if created_before is not None:
+            query = query.where(self.model.created_at < created_before)
+        if created_after is not None:
+            query = query.where(self.model.created_at > created_after)
+        query = query.order_by(self.model.created_at).limit(limit)
+        result: Result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def update_statuses(self, statuses: Dict[int, str]) -> List[int]:
+        """
+        Set the status of many requests with a single UPDATE.
+
+        A request keeps its status if it is terminal (TERMINAL_RANK) or of a
+        later stage than the new one (see STATUS_RANKS), so concurrent writers can not
+        move a payment backwards.
+
+        Args:
+            statuses (Dict[int, str]): New status by request ID.
+
+        Returns:
+            List[int]: IDs of the requests that exist and were updated.
+        """
+        if not statuses:
+            return []
+        current_rank = case(STATUS_RANKS, value=self.model.status, else_=0)
+        new_rank = case(
+            {request_id: STATUS_RANKS.get(status, 0) for request_id, status in statuses.items()},
+            value=self.model.id
+        )
         result: Result = await self.session.execute(
-            select(self.model).filter_by(status=status)
+            update(self.model)
+            .where(
+                self.model.id.in_(statuses),
+                current_rank < TERMINAL_RANK,
+                current_rank <= new_rank
+            )
+            .values(status=case(statuses, value=self.model.id))
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
         )
-        return result.scalars().all()
+        updated = list(result.scalars().all())
+        if self.autocommit:
+            await self.session.commit()
+        return updated
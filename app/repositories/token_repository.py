@@ -1,6 +1,8 @@
 import json
 from redis.asyncio import Redis
 from app.core.logger import get_logger
+from app.cache.keys import lock_key
+from app.cache.tiered import RELEASE_LOCK_SCRIPT
 from typing import Optional
 
 logger = get_logger()
@@ -11,6 +13,7 @@ class TokenRepository:
     def __init__(self, cache: Redis):
         self.cache = cache
         self.cache_key = 'cdek_token'
+        self.lock_key = lock_key(self.cache_key)
 
     async def get_token(self) -> Optional[str]:
         """
@@ -24,14 +27,22 @@ class TokenRepository:
 
         return None
 
-    async def save_token(self, token_data: dict) -> None:
-        """Save the token to cache."""
+    async def save_token(self, token_data: dict, ex: Optional[int] = None) -> None:
+        """Save the token to cache, for `ex` seconds (default: its lifetime)."""
         await self.cache.set(
             self.cache_key,
             json.dumps(token_data),
-            ex=token_data['expires_in']
+            ex=ex or token_data['expires_in']
         )
 
+    async def acquire_refresh_lock(self, owner: str, timeout: int) -> bool:
+        """Take the lock that lets a single worker refresh the token."""
+        return bool(await self.cache.set(self.lock_key, owner, nx=True, ex=timeout))
+
+    async def release_refresh_lock(self, owner: str) -> None:
+        """Release the refresh lock if `owner` still holds it."""
+        await self.cache.eval(RELEASE_LOCK_SCRIPT, 1, self.lock_key, owner)
+
 
 # token_data = {"token": None, "expires_at": 0}
 
@@ -0,0 +1,47 @@
+"""Cart router."""
+from fastapi import HTTPException, Depends, APIRouter, status
+
+from app.schemas.cart import CartPriceIn, CartPrice
+from app.dependencies.factory import DependencyFactory
+from app.core.logger import get_logger
+from app.dependencies.injection import get_factory
+from app.cache.tiered import TieredCache
+from app.services.cart_service import CartService, UnknownProducts
+from app.services.pricing_service import PricingService, PricingError
+
+logger = get_logger()
+
+router = APIRouter(
+    prefix='/cart',
+    tags=['Cart']
+)
+
+
+@router.post('/price', response_model=CartPrice)
+async def price_cart(
+    cart: CartPriceIn,
+    factory: DependencyFactory = Depends(get_factory)
+):
+    """
+    Price a cart, with its promo code applied.
+
+    Uses the same pricing as checkout, so the returned lines can be sent
+    as the receipt items and the total as the amount.
+    """
+    try:
+        pricing_service = PricingService(
+            CartService(TieredCache(factory.cache), lambda: factory.db),
+            TieredCache(factory.cache, local=None, fallback=None)
+        )
+        return await pricing_service.price(cart.items, cart.promo_code_id)
+    except (UnknownProducts, PricingError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
+        ) from exc
+    except Exception as exc:
+        logger.error('/cart/price %s', exc)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while processing your request."
+        ) from exc
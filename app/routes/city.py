@@ -3,17 +3,19 @@ import os
 import requests
 import json
 from typing import List
-from fastapi import HTTPException, Depends, APIRouter, status
+from fastapi import HTTPException, Depends, APIRouter, Request, status
 from sqlalchemy.future import select
 
 from app.models.city import City
 from app.schemas.delivery import CityOut
-from app.repositories.city_repository import CityRepository
 from app.dependencies.factory import DependencyFactory
 from app.core.logger import get_logger
 from app.dependencies.injection import get_factory
+from app.cache.tiered import TieredCache
+from app.cache.response import json_response, not_modified_response
+from app.services.catalog_service import CatalogService, CITIES_KEY, CITIES_TTL, STALE_TTL
 
-CACHE_TTL = int(os.getenv("CACHE_TTL", 86400))
+CACHE_CONTROL = f'public, max-age={int(os.getenv("HTTP_CACHE_MAX_AGE", 60))}'
 logger = get_logger()
 
 router = APIRouter(
@@ -24,27 +26,26 @@ router = APIRouter(
 
 @router.get('/', response_model=List[CityOut])
 async def get_cities(
+    request: Request,
     factory: DependencyFactory = Depends(get_factory)
 ):
     """Gey cities."""
     try:
-        cache_key = 'cities_cdek'
+        cache_key = CITIES_KEY
 
-        cached_cities = await factory.cache.get(cache_key)
-        if cached_cities:
-            return json.loads(cached_cities)
-        
-        city_repo = CityRepository(factory.db)
-        cities = await city_repo.get_by_sequence()
-
-        cities_list = [
-            CityOut.model_validate(city).model_dump()
-            for city in cities
-        ]
+        cache = TieredCache(factory.cache)
+        build = dict(
+            loader=lambda session: CatalogService(session).cities(),
+            ttl=CITIES_TTL,
+            stale_ttl=STALE_TTL
+        )
+        not_modified = await not_modified_response(request, cache, cache_key, CACHE_CONTROL, **build)
+        if not_modified is not None:
+            return not_modified
 
-        await factory.cache.set(cache_key, json.dumps(cities_list), ex=CACHE_TTL)
+        payload = await cache.get_or_build(cache_key, **build)
 
-        return cities_list
+        return json_response(payload, CACHE_CONTROL)
     except Exception as exc:
         logger.error('get: /cities %s', exc)
         raise HTTPException(
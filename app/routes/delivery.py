@@ -3,11 +3,17 @@ import time
 import json
 import asyncio
 import httpx
+from typing import AsyncIterator
 from fastapi import Response, status, HTTPException, Depends, APIRouter
+from fastapi.responses import StreamingResponse
 
-from app.schemas.delivery import DeliveryIn
+from app.schemas.delivery import DeliveryIn, CartDeliveryIn, MultiDeliveryIn
 from app.services.token_service import TokenService
 from app.services.cdek_service import CDEKService
+from app.services.quote_service import QuoteService, QuoteUnavailable
+from app.services.cart_service import CartService, UnknownProducts
+from app.cache.tiered import TieredCache
+from app.cache.response import json_response
 from app.repositories.token_repository import TokenRepository
 from app.core.logger import get_logger
 from app.dependencies.injection import DependencyFactory
@@ -27,20 +33,131 @@ async def get_calculation_by_type(
     delivery_data: DeliveryIn,
     factory: DependencyFactory = Depends(get_factory)
 ):
-    """Get token."""
+    """Get delivery quotes for the given packages."""
     try:
-        token_repo = TokenRepository(factory.cache)
-        token_service = TokenService(token_repo)
-        cdek_service = CDEKService(token_service)
+        return await _quote_response(delivery_data, factory)
+    except QuoteUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Delivery quotes are temporarily unavailable"
+        ) from exc
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching token: {exc}"
+        ) from exc
+
 
-        response_data = await cdek_service.get_calculation_by_type(delivery_data)
+@router.post('/cart')
+async def get_calculation_for_cart(
+    cart: CartDeliveryIn,
+    factory: DependencyFactory = Depends(get_factory)
+):
+    """
+    Get delivery quotes for a cart.
 
-        return response_data
+    Parcels are built server-side from the products' stored dimensions,
+    so equal carts share cached quotes and client-sent sizes are not
+    trusted.
+    """
+    try:
+        cart_service = CartService(TieredCache(factory.cache), lambda: factory.db)
+        packages = await cart_service.packages(cart.items)
+    except (UnknownProducts, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
+        ) from exc
     except Exception as exc:
+        logger.error('/delivery/cart %s', exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching token: {exc}"
+            detail="An unexpected error occurred while processing your request."
         ) from exc
+
+    delivery_data = DeliveryIn(
+        city_name=cart.city_name,
+        city_code=cart.city_code,
+        address=cart.address,
+        city_zip=cart.city_zip,
+        packages=packages
+    )
+    return await get_calculation_by_type(delivery_data, factory)
+
+
+@router.post('/calculate/multi')
+async def get_calculation_for_cities(
+    delivery_data: MultiDeliveryIn,
+    factory: DependencyFactory = Depends(get_factory)
+):
+    """
+    Get delivery quotes of one package set for many cities.
+
+    Cities are quoted concurrently (at most `multi_quote_concurrency` at
+    a time) through the quote cache, sharing one token and HTTP client.
+    Results are streamed as NDJSON in completion order, one line per
+    city: `{"city_code", "stale", "quotes"}`, or `{"city_code", "error"}`.
+    """
+    quote_service = _quote_service(factory)
+    deliveries = [
+        DeliveryIn(city_name='', city_code=city_code, address='', city_zip='', packages=delivery_data.packages)
+        for city_code in dict.fromkeys(delivery_data.city_codes)
+    ]
+
+    return StreamingResponse(
+        _stream_quotes(quote_service, deliveries),
+        media_type='application/x-ndjson'
+    )
+
+
+async def _stream_quotes(quote_service: QuoteService, deliveries: list[DeliveryIn]) -> AsyncIterator[bytes]:
+    """Quote every destination concurrently and yield NDJSON lines as they complete."""
+    semaphore = asyncio.Semaphore(settings.multi_quote_concurrency)
+
+    async def quote(delivery: DeliveryIn) -> bytes:
+        prefix = b'{"city_code":%d,' % delivery.city_code
+        try:
+            async with semaphore:
+                quotes = await quote_service.get_quotes(delivery)
+        except QuoteUnavailable:
+            return prefix + b'"error":"unavailable"}\n'
+        except Exception as exc:  # pylint: disable=W0718
+            logger.error('/delivery/calculate/multi %s: %s', delivery.city_code, exc)
+            return prefix + b'"error":"failed"}\n'
+        stale = b'true' if quotes.stale else b'false'
+        return prefix + b'"stale":' + stale + b',"quotes":' + quotes.payload.body + b'}\n'
+
+    tasks = [asyncio.create_task(quote(delivery)) for delivery in deliveries]
+    try:
+        for next_line in asyncio.as_completed(tasks):
+            yield await next_line
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _quote_service(factory: DependencyFactory) -> QuoteService:
+    """Build the quote path on the shared Redis and CDEK clients."""
+    token_repo = TokenRepository(factory.cache)
+    token_service = TokenService(token_repo, factory.http.cdek)
+    cdek_service = CDEKService(token_service, factory.http.cdek)
+    # Redis only: quotes would crowd the catalog out of the per-worker caches.
+    return QuoteService(
+        cdek_service,
+        TieredCache(factory.cache, local=None, session_factory=None, fallback=None)
+    )
+
+
+async def _quote_response(delivery_data: DeliveryIn, factory: DependencyFactory) -> Response:
+    """Quote through the quote cache; stale fallbacks carry X-Quote-Stale."""
+    quote_service = _quote_service(factory)
+
+    quotes = await quote_service.get_quotes(delivery_data)
+
+    response = json_response(quotes.payload)
+    if quotes.stale:
+        response.headers['X-Quote-Stale'] = 'true'
+    return response
     
 
     # from_city = 137  # Санкт-Петербург
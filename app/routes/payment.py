@@ -1,20 +1,30 @@
-from fastapi import status, HTTPException, Depends, APIRouter
+from typing import Optional
+from fastapi import status, HTTPException, Depends, APIRouter, Header, Body
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, PlainTextResponse
+from redis.exceptions import RedisError
 import hashlib
 import httpx
 import json
 
 from app.core.config import settings
-from app.db.database import get_db
 from app.schemas.payment import CheckoutIn
 from app.models.request import Request
 from app.services.payment_service import PaymentService
+from app.services.payment_notifications import enqueue_notification
+from app.services.payment_status_service import PaymentStatusService
+from app.services.pricing_service import PricingService, PricingError
+from app.services.cart_service import CartService, UnknownProducts
+from app.services.idempotency_service import IdempotencyService, IdempotencyConflict, IdempotencyInProgress, fingerprint
 from app.repositories.request_repository import RequestRepository
+from app.repositories.idempotency_repository import IdempotencyRepository
 from app.dependencies.factory import DependencyFactory
 from app.core.logger import get_logger
 from app.dependencies.injection import get_factory
+from app.cache.invalidation import invalidate
+from app.cache.tiered import TieredCache
+from app.cache.response import json_response
+from app.metrics import payment_notifications
 
 router = APIRouter(
     prefix='/payments',
@@ -27,12 +37,61 @@ logger = get_logger()
 @router.post('/')
 async def init_payment(
     data: CheckoutIn,
-    factory: DependencyFactory = Depends(get_factory)
+    factory: DependencyFactory = Depends(get_factory),
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255)
 ):
-    """Init payment."""
+    """
+    Init payment.
+
+    With an Idempotency-Key header the order is created and the payment
+    initiated at most once per key: repeated requests get the first
+    response back, flagged by an Idempotent-Replayed header, without
+    touching the database or Tinkoff.
+    """
+    if idempotency_key is None:
+        return await _init_payment(data, factory)
+
+    idempotency_service = IdempotencyService(IdempotencyRepository(factory.cache, 'payments'))
+    try:
+        outcome = await idempotency_service.run(
+            idempotency_key,
+            fingerprint(data),
+            lambda: _init_payment(data, factory)
+        )
+    except IdempotencyConflict as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='Idempotency-Key was already used for another request'
+        ) from exc
+    except IdempotencyInProgress as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='A request with this Idempotency-Key is still being processed'
+        ) from exc
+
+    if outcome.replayed:
+        return JSONResponse(outcome.response, headers={'Idempotent-Replayed': 'true'})
+    return outcome.response
+
+
+async def _init_payment(data: CheckoutIn, factory: DependencyFactory) -> dict:
+    """
+    Create the order and initiate its payment with Tinkoff.
+
+    The amounts are checked against the server's pricing first.
+    The order is written in one transaction, kept open across the Tinkoff
+    call: the INSERT returns its id, a single UPDATE stores the payment
+    and the commit ends it. If Tinkoff fails no order is left behind.
+    """
     try:
-        request_repo = RequestRepository(factory.db)
-        payment_service = PaymentService()
+        # Reject tampered or outdated amounts before any write or Tinkoff call.
+        await PricingService(
+            CartService(TieredCache(factory.cache), lambda: factory.db),
+            TieredCache(factory.cache, local=None, fallback=None)
+        ).verify_checkout(data)
+
+        request_repo = RequestRepository(factory.db, autocommit=False)
+        payment_service = PaymentService(factory.http.tinkoff)
 
         items = [x.model_dump() for x in data.Receipt.Items]
 
@@ -68,11 +127,18 @@ async def init_payment(
 
         result = response.json()
 
-        request.token = sha256_hash
-        request.payment_id = result['PaymentId']
-        await request_repo.update(request)
+        await request_repo.update_fields(request.id, token=sha256_hash, payment_id=result['PaymentId'])
+        await request_repo.commit()
+
+        # Drop a negative cache entry left by an earlier lookup of this id.
+        await invalidate(factory.cache, f'request:{request.id}')
 
         return result
+    except (UnknownProducts, PricingError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
+        ) from exc
     except Exception as exc:
         raise HTTPException(
             status_code=500,
@@ -80,28 +146,56 @@ async def init_payment(
         ) from exc
 
 
-@router.post('v1/get_payment_status/{order_id}')
-async def get_payment_status(order_id: int, db: Session = Depends(get_db)):
-    """Init payment."""
-    result = None
+@router.post('/notification')
+async def payment_notification(
+    payload: dict = Body(...),
+    factory: DependencyFactory = Depends(get_factory)
+):
+    """
+    Receive a Tinkoff payment notification.
+
+    The signature is checked and the notification queued; the order
+    status is updated by a background worker (see payment_notifications),
+    so the answer does not wait for the database. Tinkoff retries until
+    it gets OK, so a notification that can not be queued is answered 503.
+    """
+    payment_service = PaymentService(factory.http.tinkoff)
+    if not payment_service.verify_notification(payload):
+        payment_notifications.inc({'result': 'rejected'})
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Invalid token')
 
     try:
-        row = db.query(Request).filter(Request.id == order_id).first()
-        if row is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                detail='Did not find')
-
-        # Here you would typically call a payment provider API to get the payment status
-        # response = requests.post(f'{settings.tinkoff_url}/v2/GetState',
-        #                          headers={'Content-Type': 'application/json'},
-        #                          json=init_data)
-
-        # if response.status_code != 200:
-        #     raise HTTPException(
-        #         status_code=response.status_code,
-        #         detail="Что то пошло не так. Попробуйте снова через несколько минут."
-        #     )
+        await enqueue_notification(factory.cache, payload)
+    except RedisError as exc:
+        logger.error('/payments/notification %s', exc)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Could not accept the notification'
+        ) from exc
 
+    return PlainTextResponse('OK')
+
+
+@router.post('/v1/get_payment_status/{order_id}')
+async def get_payment_status(
+    order_id: int,
+    payment_id: str,
+    factory: DependencyFactory = Depends(get_factory)
+):
+    """
+    Get the payment status of an order.
+
+    The caller proves the order is theirs with the PaymentId returned when
+    the payment was created; any other caller gets 404. Served from the
+    cache; a stale status is refreshed from Tinkoff GetState in the
+    background.
+    """
+    try:
+        payment_status_service = PaymentStatusService(
+            PaymentService(factory.http.tinkoff),
+            TieredCache(factory.cache, local=None, fallback=None)
+        )
+        payload = await payment_status_service.get_status(order_id, payment_id)
     except Exception as exc:
         logger.error('/v1/get_payment_status %s', exc)
         raise HTTPException(
@@ -109,4 +203,7 @@ async def get_payment_status(order_id: int, db: Session = Depends(get_db)):
             detail=f"Error: {exc}"
         ) from exc
 
-    return result
+    if payload.is_negative:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail='Did not find')
+    return json_response(payload)
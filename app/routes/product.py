@@ -1,17 +1,23 @@
 import os
-import json
-from typing import List
-from fastapi import HTTPException, Depends, APIRouter
+from typing import List, Optional
+from fastapi import HTTPException, Depends, APIRouter, Query, Request, status
 
-from app.schemas.product import ProductResponse
 from app.schemas.product import ProductResponse
 from app.repositories.product_repository import ProductRepository
 from app.dependencies.factory import DependencyFactory
 from app.core.logger import get_logger
 from app.dependencies.injection import get_factory
+from app.cache.tiered import TieredCache
+from app.cache.response import json_response, make_payload, not_modified_response
+from app.services.catalog_service import CatalogService
+from app.services.catalog_service import PRODUCTS_KEY, TO_DISPLAY_KEY, product_key
+from app.services.catalog_service import PRODUCTS_TTL, STALE_TTL
+from app.metrics import cache_negative_hits
 
 
-CACHE_TTL = int(os.getenv("CACHE_TTL", 3600))
+NEGATIVE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", 60))
+MAX_BATCH_SIZE = 100
+CACHE_CONTROL = f'public, max-age={int(os.getenv("HTTP_CACHE_MAX_AGE", 60))}'
 logger = get_logger()
 
 router = APIRouter(
@@ -22,6 +28,7 @@ router = APIRouter(
 
 @router.get('/', response_model=List[ProductResponse])
 async def get_products(
+    request: Request,
     factory: DependencyFactory = Depends(get_factory)
 ):
     """
@@ -37,23 +44,21 @@ async def get_products(
         HTTPException: If no products are found.
     """
     try:
-        cache_key = 'products'
-
-        cached_products = await factory.cache.get(cache_key)
-        if cached_products:
-            return json.loads(cached_products)
-
-        product_repo = ProductRepository(factory.db)
-        products = await product_repo.get_all_published()
+        cache_key = PRODUCTS_KEY
 
-        product_list = [
-            ProductResponse.model_validate(product).model_dump()
-            for product in products
-        ]
+        cache = TieredCache(factory.cache)
+        build = dict(
+            loader=lambda session: CatalogService(session).published_products(),
+            ttl=PRODUCTS_TTL,
+            stale_ttl=STALE_TTL
+        )
+        not_modified = await not_modified_response(request, cache, cache_key, CACHE_CONTROL, **build)
+        if not_modified is not None:
+            return not_modified
 
-        await factory.cache.set(cache_key, json.dumps(product_list), ex=CACHE_TTL)
+        payload = await cache.get_or_build(cache_key, **build)
 
-        return product_list
+        return json_response(payload, CACHE_CONTROL)
     except Exception as exc:
         logger.error('/v1/get_products %s', exc)
         raise HTTPException(
@@ -64,6 +69,7 @@ async def get_products(
 
 @router.get('/to_display')
 async def get_products_to_display(
+    request: Request,
     factory: DependencyFactory = Depends(get_factory)
 ):
     """
@@ -79,25 +85,103 @@ async def get_products_to_display(
         HTTPException: If no products are found.
     """
     try:
-        cache_key = 'to_display'
+        cache_key = TO_DISPLAY_KEY
 
-        cached_products = await factory.cache.get(cache_key)
-        if cached_products:
-            return json.loads(cached_products)
+        cache = TieredCache(factory.cache)
+        build = dict(
+            loader=lambda session: CatalogService(session).products_to_display(),
+            ttl=PRODUCTS_TTL,
+            stale_ttl=STALE_TTL
+        )
+        not_modified = await not_modified_response(request, cache, cache_key, CACHE_CONTROL, **build)
+        if not_modified is not None:
+            return not_modified
 
-        product_repo = ProductRepository(factory.db)
-        products = await product_repo.get_to_display()
+        payload = await cache.get_or_build(cache_key, **build)
+
+        return json_response(payload, CACHE_CONTROL)
+    except Exception as exc:
+        logger.error('/v1/get_products %s', exc)
+        raise HTTPException(
+            status_code=500,
+            detail=exc
+        ) from exc
+
+
+@router.get('/batch', response_model=List[Optional[ProductResponse]])
+async def get_products_batch(
+    ids: str = Query(..., description='Comma-separated product ids, e.g. 1,2,3'),
+    factory: DependencyFactory = Depends(get_factory)
+):
+    """
+    Fetch several products by id in one request.
 
-        product_list = [
-            ProductResponse.model_validate(product).model_dump()
-            for product in products
-        ]
+    Cached products are read with a single MGET, the misses with a single
+    query, and the cache is back-filled in one pipeline.
+
+    Args:
+        ids (str): Comma-separated product ids.
 
-        await factory.cache.set(cache_key, json.dumps(product_list), ex=CACHE_TTL)
+    Returns:
+        List[Optional[ProductResponse]]: Products in request order, null for
+            unknown ids.
 
-        return product_list
+    Raises:
+        HTTPException: If the ids are malformed or too many.
+    """
+    try:
+        product_ids = [int(product_id) for product_id in ids.split(',') if product_id.strip()]
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='ids must be comma-separated integers'
+        ) from exc
+
+    if len(product_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f'At most {MAX_BATCH_SIZE} ids can be requested at once'
+        )
+
+    try:
+        unique_ids = list(dict.fromkeys(product_ids))
+        keys = {product_id: product_key(product_id) for product_id in unique_ids}
+
+        cache = TieredCache(factory.cache)
+        cached = dict(zip(unique_ids, await cache.get_many(list(keys.values()))))
+
+        negative_hits = sum(1 for payload in cached.values() if payload and payload.is_negative)
+        if negative_hits:
+            cache_negative_hits.add({'entity': 'product'}, negative_hits)
+
+        missing_ids = [product_id for product_id, payload in cached.items() if payload is None]
+        if missing_ids:
+            product_repo = ProductRepository(factory.db)
+            products = await product_repo.get_by_ids(missing_ids)
+
+            payloads = await cache.set_many(
+                {
+                    keys[product.id]: ProductResponse.model_validate(product).model_dump()
+                    for product in products
+                },
+                ex=PRODUCTS_TTL
+            )
+            payloads.update(await cache.set_many(
+                {
+                    keys[product_id]: None
+                    for product_id in missing_ids
+                    if keys[product_id] not in payloads
+                },
+                ex=NEGATIVE_TTL
+            ))
+            for product_id in missing_ids:
+                cached[product_id] = payloads[keys[product_id]]
+
+        body = b'[' + b','.join(cached[product_id].body for product_id in product_ids) + b']'
+
+        return json_response(make_payload(body))
     except Exception as exc:
-        logger.error('/v1/get_products %s', exc)
+        logger.error('/products/batch %s', exc)
         raise HTTPException(
             status_code=500,
             detail=exc
@@ -122,23 +206,27 @@ async def get_product_by_id(
         HTTPException: If no products are found.
     """
     try:
-        cache_key = f'product:{product_id}'
+        cache_key = product_key(product_id)
 
-        cached_products = await factory.cache.get(cache_key)
-        if cached_products:
-            return json.loads(cached_products)
+        cache = TieredCache(factory.cache)
+        cached_products = await cache.get(cache_key)
+        if cached_products is not None:
+            if cached_products.is_negative:
+                cache_negative_hits.inc({'entity': 'product'})
+            return json_response(cached_products)
 
         product_repo = ProductRepository(factory.db)
         product = await product_repo.get_by_id(product_id)
 
         if not product:
-            return None
+            payload = await cache.set(cache_key, None, ex=NEGATIVE_TTL)
+            return json_response(payload)
 
         product_json = ProductResponse.model_validate(product).model_dump()
 
-        await factory.cache.set(cache_key, json.dumps(product_json), ex=CACHE_TTL)
+        payload = await cache.set(cache_key, product_json, ex=PRODUCTS_TTL)
 
-        return product_json
+        return json_response(payload)
     except Exception as exc:
         logger.error('/v1/get_products %s', exc)
         raise HTTPException(
@@ -13,6 +13,8 @@ from app.schemas.promo_code import PromoCodeCreate
 from app.dependencies.injection import get_factory
 from app.dependencies.injection import get_current_user
 from app.core.config import settings
+from app.cache.invalidation import invalidate
+from app.services.pricing_service import promo_key
 
 
 router = APIRouter(
@@ -99,6 +101,8 @@ async def create_promo_code(
             discount_value=promo_code.discount_value,
             valid_until=promo_code.valid_until,
         ))
+        # Drop a negative cache entry left by an earlier lookup of this id.
+        await invalidate(factory.cache, promo_key(new_promo.id))
         return new_promo
     except HTTPException as exc:
         raise exc
@@ -1,4 +1,3 @@
-import json
 import os
 from fastapi import status, HTTPException, Depends, APIRouter
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +8,9 @@ from app.dependencies.factory import DependencyFactory
 from app.core.logger import get_logger
 from app.dependencies.injection import get_current_user
 from app.dependencies.injection import get_factory
+from app.cache.tiered import TieredCache
+from app.cache.response import json_response
+from app.metrics import cache_negative_hits
 
 
 router = APIRouter(
@@ -20,6 +22,7 @@ logger = get_logger()
 
 # Cache TTL (configurable via environment variable)
 CACHE_TTL = int(os.getenv("CACHE_TTL", 300))
+NEGATIVE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", 60))
 
 
 @router.get('/')
@@ -31,9 +34,10 @@ async def get_requests(
     try:
         cache_key = 'request_list'
 
-        cached_products = await factory.cache.get(cache_key)
-        if cached_products:
-            return json.loads(cached_products)
+        cache = TieredCache(factory.cache, local=None, fallback=None)
+        cached_requests = await cache.get(cache_key)
+        if cached_requests is not None:
+            return json_response(cached_requests)
 
         request_repo = RequestRepository(factory.db)
         requests = await request_repo.get_all()
@@ -43,9 +47,9 @@ async def get_requests(
             for request in requests
         ]
 
-        await factory.cache.set(cache_key, json.dumps(request_list), ex=CACHE_TTL)
+        payload = await cache.set(cache_key, request_list, ex=CACHE_TTL)
 
-        return request_list
+        return json_response(payload)
     except Exception as exc:
         logger.error('/requests %s', exc)
         raise HTTPException(
@@ -64,21 +68,25 @@ async def get_request_by_id(
     try:
         cache_key = f'request:{request_id}'
 
-        cached_product = await factory.cache.get(cache_key)
-        if cached_product:
-            return json.loads(cached_product)
+        cache = TieredCache(factory.cache, local=None, fallback=None)
+        cached_request = await cache.get(cache_key)
+        if cached_request is not None:
+            if cached_request.is_negative:
+                cache_negative_hits.inc({'entity': 'request'})
+            return json_response(cached_request)
 
         request_repo = RequestRepository(factory.db)
         request = await request_repo.get_by_id(request_id)
 
         if not request:
-            return None
+            payload = await cache.set(cache_key, None, ex=NEGATIVE_TTL)
+            return json_response(payload)
 
         request_json = RequestsResponse.model_validate(request).model_dump()
-        
-        await factory.cache.set(cache_key, json.dumps(request_json), ex=CACHE_TTL)
 
-        return request
+        payload = await cache.set(cache_key, request_json, ex=CACHE_TTL)
+
+        return json_response(payload)
     except Exception as exc:
         logger.error('/requests/%s %s', request_id, exc)
         raise HTTPException(
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from aioprometheus.asgi.starlette import metrics
 
+from app.redis_client import redis_manager
+
 
 router = APIRouter(tags=['Root'])
 
@@ -12,4 +14,19 @@ async def root():
     return result
 
 
+@router.get("/health")
+async def health():
+    """
+    Report dependency health.
+
+    Always answers 200: without Redis the app still serves from the
+    database and the fallback cache, and a failing check would take every
+    worker out of rotation at once. A degraded Redis is reported in the body.
+    """
+    return {
+        "status": "degraded" if redis_manager.degraded else "ok",
+        "redis": "degraded" if redis_manager.degraded else "ok",
+    }
+
+
 router.add_route("/metrics", metrics)
@@ -0,0 +1,54 @@
+"""Cart schemas."""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.schemas.delivery import CartItem
+
+
+class CartPriceIn(BaseModel):
+    """
+    Schema for pricing a cart
+
+    Attributes:
+        items (List[CartItem]): The cart lines.
+        promo_code_id (Optional[int]): The promo code to apply, if any.
+    """
+
+    items: List[CartItem] = Field(min_length=1, max_length=100)
+    promo_code_id: Optional[int] = None
+
+
+class PricedItem(BaseModel):
+    """
+    Schema for a priced cart line; amounts are in receipt units (kopecks)
+
+    Attributes:
+        product_id (int): The product.
+        name (str): The product name, as shown on the receipt.
+        price (int): The catalog price of a single unit.
+        quantity (int): The number of units.
+        amount (int): Price x Quantity, less the line's share of the discount.
+    """
+
+    product_id: int
+    name: str
+    price: int
+    quantity: int
+    amount: int
+
+
+class CartPrice(BaseModel):
+    """
+    Schema for a priced cart; amounts are in receipt units (kopecks)
+
+    Attributes:
+        items (List[PricedItem]): The priced lines, in cart order.
+        subtotal (int): The total before the discount.
+        discount (int): The promo discount.
+        total (int): The amount to pay, equal to the sum of line amounts.
+    """
+
+    items: List[PricedItem]
+    subtotal: int
+    discount: int
+    total: int
@@ -1,6 +1,6 @@
 """Products schemas."""
 from typing import Optional, List
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CityOut(BaseModel):
@@ -38,3 +38,34 @@ class DeliveryIn(BaseModel):
     address: str
     city_zip: str
     packages: List[Packages]
+
+
+class CartItem(BaseModel):
+    """
+    Schema for a cart line
+    """
+
+    product_id: int = Field(description='Product id (products.id)')
+    quantity: int = Field(ge=1)
+
+
+class CartDeliveryIn(BaseModel):
+    """
+    Schema for getting tarrif of delivery for a cart; packages are built
+    server-side from product dimensions
+    """
+
+    city_name: str
+    city_code: int
+    address: str
+    city_zip: str
+    items: List[CartItem] = Field(min_length=1)
+
+
+class MultiDeliveryIn(BaseModel):
+    """
+    Schema for getting tarrifs of one package set to many cities
+    """
+
+    city_codes: List[int] = Field(min_length=1, max_length=100)
+    packages: List[Packages]
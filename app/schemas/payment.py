@@ -1,5 +1,5 @@
 """Payment schemas."""
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -11,8 +11,11 @@ class CheckoutItems(BaseModel):
         Name (str): The name of the item.
         Price (int): The price of a single unit of the item.
         Quantity (int): The quantity of the item purchased.
-        Amount (int): The total amount for the item (Price x Quantity).
+        Amount (int): The total amount for the item (Price x Quantity,
+            less its share of the promo discount).
         Tax (str): The tax details applied to the item.
+        product_id (int): The product (products.id); used for pricing,
+            not sent to Tinkoff.
     """
 
     Name: str
@@ -20,6 +23,7 @@ class CheckoutItems(BaseModel):
     Quantity: int
     Amount: int
     Tax: str
+    product_id: int
 
 
 class CheckoutData(BaseModel):
@@ -65,6 +69,7 @@ class CheckoutIn(BaseModel):
         last_name (str): The customer's last name.
         phone (str): The customer's phone number.
         email (str): The customer's email address.
+        promo_code_id (Optional[int]): The applied promo code, if any.
     """
     Amount: int
     DATA: CheckoutData
@@ -76,4 +81,4 @@ class CheckoutIn(BaseModel):
     last_name: str
     phone: str
     email: str
-    promo_code_id: int
+    promo_code_id: Optional[int] = None
@@ -8,6 +8,7 @@ class ProductResponse(BaseModel):
     Schema for product response details.
 
     Attributes:
+        id (int): The database id of the product.
         name (str): The name of the product.
         product_id (str): The unique identifier of the product.
         product_type (Optional[str]): The type/category of the product.
@@ -23,6 +24,7 @@ class ProductResponse(BaseModel):
         display_on_main (int): Indicates if the product should be displayed on the main page.
         color (Optional[str]): The color of the product.
     """
+    id: int
     name: str
     product_id: str
     product_type: Optional[str] = None
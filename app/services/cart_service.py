@@ -0,0 +1,122 @@
+"""Delivery parcels for a cart."""
+from typing import Callable, Dict, List
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.tiered import TieredCache
+from app.schemas.delivery import CartItem, Packages
+from app.schemas.product import ProductResponse
+from app.repositories.product_repository import ProductRepository
+from app.services.catalog_service import PRODUCTS_TTL, product_key
+from app.utils.packing import Parcel, make_parcel, pack
+
+# Units per cart; bounds the packing work.
+MAX_CART_UNITS = 100
+
+
+def to_packages(parcels: List[Parcel]) -> List[Packages]:
+    """Convert parcels to quote packages, longest side as length."""
+    return [
+        Packages(weight=parcel.weight, height=parcel.sides[0], length=parcel.sides[2], width=parcel.sides[1])
+        for parcel in parcels
+    ]
+
+
+class UnknownProducts(Exception):
+    """The cart references products that do not exist or are not published."""
+
+    def __init__(self, product_ids: List[int]):
+        super().__init__(f'Unknown products: {product_ids}')
+        self.product_ids = product_ids
+
+
+class CartService:
+    """Builds delivery parcels from cached product dimensions."""
+
+    def __init__(self, cache: TieredCache, get_session: Callable[[], AsyncSession]):
+        """
+        Initialize the service.
+
+        Args:
+            cache (TieredCache): Product cache.
+            get_session (Callable[[], AsyncSession]): Gives the database
+                session, only called on cache misses.
+        """
+        self.cache = cache
+        self.get_session = get_session
+
+    async def get_products(self, product_ids: List[int]) -> Dict[int, dict]:
+        """
+        Get published products by id, from cache where possible.
+
+        The product cache is shared with the product page, which also
+        serves unpublished products, so `published` is checked on every
+        product, cached or loaded.
+
+        Args:
+            product_ids (List[int]): Product ids.
+
+        Returns:
+            Dict[int, dict]: Products by id.
+
+        Raises:
+            UnknownProducts: If some ids do not exist or are not published.
+        """
+        unique_ids = list(dict.fromkeys(product_ids))
+        payloads = await self.cache.get_many([product_key(product_id) for product_id in unique_ids])
+
+        products = {
+            product_id: orjson.loads(payload.body)
+            for product_id, payload in zip(unique_ids, payloads)
+            if payload is not None and not payload.is_negative
+        }
+
+        missing_ids = [product_id for product_id in unique_ids if product_id not in products]
+        if missing_ids:
+            found = await ProductRepository(self.get_session()).get_by_ids(missing_ids)
+            loaded = {
+                product.id: ProductResponse.model_validate(product).model_dump()
+                for product in found
+            }
+            await self.cache.set_many(
+                {product_key(product_id): product for product_id, product in loaded.items()},
+                ex=PRODUCTS_TTL
+            )
+            products.update(loaded)
+
+        unknown = [
+            product_id for product_id in unique_ids
+            if product_id not in products or not products[product_id]['published']
+        ]
+        if unknown:
+            raise UnknownProducts(unknown)
+        return products
+
+    async def packages(self, items: List[CartItem]) -> List[Packages]:
+        """
+        Consolidate the cart into parcels.
+
+        Args:
+            items (List[CartItem]): Cart lines.
+
+        Returns:
+            List[Packages]: Parcels to quote.
+
+        Raises:
+            UnknownProducts: If some products do not exist or are not
+                published.
+            ValueError: If the cart has more than MAX_CART_UNITS units.
+        """
+        if sum(item.quantity for item in items) > MAX_CART_UNITS:
+            raise ValueError(f'At most {MAX_CART_UNITS} units can be quoted at once')
+
+        products = await self.get_products([item.product_id for item in items])
+
+        units = []
+        for item in items:
+            product = products[item.product_id]
+            unit = make_parcel(product['weight'], product['height'], product['length'], product['width'])
+            units.extend([unit] * item.quantity)
+
+        return to_packages(pack(units))
@@ -0,0 +1,45 @@
+import os
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.product import ProductResponse
+from app.schemas.delivery import CityOut
+from app.repositories.product_repository import ProductRepository
+from app.repositories.city_repository import CityRepository
+
+PRODUCTS_KEY = 'products'
+TO_DISPLAY_KEY = 'to_display'
+CITIES_KEY = 'cities_cdek'
+
+# Catalog changes evict these keys (app/cache/catalog_listener.py), so the
+# TTLs only bound staleness if the listener is down.
+PRODUCTS_TTL = int(os.getenv("PRODUCTS_CACHE_TTL", 259200))
+CITIES_TTL = int(os.getenv("CITIES_CACHE_TTL", 604800))
+STALE_TTL = int(os.getenv("CACHE_STALE_TTL", 600))
+
+
+def product_key(product_id: int) -> str:
+    """Cache key of a single product."""
+    return f'product:{product_id}'
+
+
+class CatalogService:
+    """Builds the catalog payloads served from cache."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def published_products(self) -> List[dict]:
+        """Get all published products, ordered by sequence."""
+        products = await ProductRepository(self.session).get_all_published()
+        return [ProductResponse.model_validate(product).model_dump() for product in products]
+
+    async def products_to_display(self) -> List[dict]:
+        """Get products displayed on the main page."""
+        products = await ProductRepository(self.session).get_to_display()
+        return [ProductResponse.model_validate(product).model_dump() for product in products]
+
+    async def cities(self) -> List[dict]:
+        """Get cities, ordered by sequence."""
+        cities = await CityRepository(self.session).get_by_sequence()
+        return [CityOut.model_validate(city).model_dump() for city in cities]
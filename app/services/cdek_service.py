@@ -9,62 +9,140 @@ from fastapi import HTTPException
 from app.schemas.delivery import DeliveryIn
 from app.core.config import settings
 from app.services.token_service import TokenService
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.rate_limiter import RateLimiter, RateLimited
 from app.core.logger import get_logger
 
 
 logger = get_logger()
 
 
+# Санкт-Петербург
+FROM_CITY = 137
+
+# Tariffs offered to customers, in display order.
+TARIFFS = [
+    {'code': 136, 'name': 'Посылка склад-склад'},
+    {'code': 137, 'name': 'Посылка склад-дверь'},
+    {'code': 483, 'name': 'Экспресс склад-склад'},
+    {'code': 482, 'name': 'Экспресс склад-дверь'},
+    {'code': 368, 'name': 'Посылка склад-постамат'},
+]
+
+# Fields of a tarifflist entry that describe the tariff, not the quote.
+TARIFF_LIST_META = ('tariff_code', 'tariff_name', 'tariff_description', 'delivery_mode')
+
+
+# Guards quote requests (see QuoteService).
+cdek_breaker = CircuitBreaker(
+    'cdek',
+    failure_threshold=settings.cdek_breaker_failure_threshold,
+    recovery_timeout=settings.cdek_breaker_recovery_timeout,
+    # Our own throttling says nothing about CDEK's health.
+    ignored=(RateLimited,)
+)
+
+
+class CdekUnavailable(Exception):
+    """CDEK answered no quote request at all."""
+
+
 class CDEKService:
-    def __init__(self, token_service: TokenService):
+    def __init__(
+        self,
+        token_service: TokenService,
+        client: httpx.AsyncClient,
+        limiter: Optional[RateLimiter] = None
+    ):
         self.token_service = token_service
+        self.client = client
+        # Every CDEK call takes a token, the token refresh included.
+        self.limiter = limiter or token_service.limiter
 
-    async def get_calculation_by_type(self, delivery_data: DeliveryIn) -> dict:
-        """Get delivery calculation for the given delivery data."""
-        token = await self.token_service.get_valid_token()  # Get a valid token
+    async def get_calculation_by_type(self, delivery_data: DeliveryIn) -> list:
+        """
+        Get delivery quotes for every offered tariff.
 
-        # Static data for the calculation
-        from_city = 137  # Санкт-Петербург
-        url = f"{settings.cdek_endpoint}/v2/calculator/tariff"
+        Uses a single tarifflist call; falls back to one call per tariff
+        only if it fails.
 
-        tarrif_dict = [
-            {'code': 136, 'name': 'Посылка склад-склад'},
-            {'code': 137, 'name': 'Посылка склад-дверь'},
-            # {'code': 483, 'name': 'Экспресс склад-склад'},
-            # {'code': 482, 'name': 'Экспресс склад-дверь'},
-            # {'code': 368, 'name': 'Посылка склад-постамат'}
-        ]
+        Raises:
+            CdekUnavailable: If the fallback calls failed too.
+            RateLimited: If no CDEK call could be made within the
+                rate limiter's waiting budget.
+
+        Returns:
+            list: `{'name', 'code', 'data'}` per available tariff, in
+                `TARIFFS` order.
+        """
+        token = await self.token_service.get_valid_token()  # Get a valid token
 
         data = {
             'type': '1',  # Example: type for calculation
-            'from_location': {'code': from_city},
+            'from_location': {'code': FROM_CITY},
             'to_location': {'code': delivery_data.city_code},
             'packages': [x.model_dump() for x in delivery_data.packages]
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                tasks = [
-                    self._make_calculation_request(client, url, data, tariff, token)
-                    for tariff in tarrif_dict
-                ]
-                responses = await asyncio.gather(*tasks)
-                return [res for res in responses if res]
+            return await self._calculate_tariff_list(data, token)
+        except (httpx.HTTPError, KeyError, ValueError) as exc:
+            logger.error('tarifflist failed, calculating per tariff: %s', exc)
+            tariff_list_error = exc
+
+        url = f"{settings.cdek_endpoint}/v2/calculator/tariff"
+        try:
+            tasks = [
+                self._make_calculation_request(self.client, url, data, tariff, token)
+                for tariff in TARIFFS
+            ]
+            responses = await asyncio.gather(*tasks)
         except httpx.RequestError as exc:
             raise HTTPException(status_code=500, detail=f"Error during calculation request: {exc}")
 
+        quotes = [res for res in responses if res]
+        if not quotes:
+            raise CdekUnavailable('No tariff could be calculated') from tariff_list_error
+        return quotes
+
+    async def _calculate_tariff_list(self, data: dict, token: str) -> list:
+        """Quote all tariffs with one tarifflist call, keeping the offered ones."""
+        await self.limiter.acquire()
+        response = await self.client.post(
+            f"{settings.cdek_endpoint}/v2/calculator/tarifflist",
+            headers={
+                'content-type': 'application/json',
+                'Authorization': f'Bearer {token}'
+            },
+            data=json.dumps(data)
+        )
+        response.raise_for_status()
+
+        quotes = {}
+        for entry in response.json()['tariff_codes']:
+            quote = {key: value for key, value in entry.items() if key not in TARIFF_LIST_META}
+            # The per-tariff calculator also returns total_sum; without
+            # extra services it equals delivery_sum.
+            quote.setdefault('total_sum', quote.get('delivery_sum'))
+            quotes[entry['tariff_code']] = quote
+
+        return [
+            {'name': tariff['name'], 'code': tariff['code'], 'data': quotes[tariff['code']]}
+            for tariff in TARIFFS
+            if tariff['code'] in quotes
+        ]
+
     async def _make_calculation_request(self, client: httpx.AsyncClient, url: str, data: dict, tariff: dict, token: str) -> Optional[dict]:
         """Make a single calculation request."""
+        await self.limiter.acquire()
         try:
-            data['tariff_code'] = str(tariff['code'])
             response = await client.post(
                 url,
                 headers={
                     'content-type': 'application/json',
                     'Authorization': f'Bearer {token}'
                 },
-                data=json.dumps(data),
-                timeout=30
+                data=json.dumps({**data, 'tariff_code': str(tariff['code'])})
             )
 
             if response.status_code == 200:
@@ -0,0 +1,123 @@
+"""Run a request at most once per Idempotency-Key."""
+import time
+import uuid
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, NamedTuple
+
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.metrics import idempotent_requests
+
+logger = get_logger()
+
+POLL_INTERVAL = 0.1
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request body."""
+
+
+class IdempotencyInProgress(Exception):
+    """A request with the key is still running after the waiting budget."""
+
+
+class Outcome(NamedTuple):
+    """Response of a request and whether it is a replay of an earlier one."""
+
+    response: dict
+    replayed: bool = False
+
+
+def fingerprint(data: BaseModel) -> str:
+    """Hash a request body, so a key can not be reused for another one."""
+    return hashlib.sha256(data.model_dump_json().encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Run a request once per Idempotency-Key and replay its response.
+
+    The first request claims the key. Duplicates arriving while it runs
+    wait for its result; later ones get the stored result straight away.
+    Failed requests store nothing, so the client may retry with the same
+    key. If Redis is unavailable requests run unprotected.
+    """
+
+    def __init__(self, repository: IdempotencyRepository):
+        self.repository = repository
+
+    async def run(
+        self,
+        key: str,
+        body_fingerprint: str,
+        func: Callable[[], Awaitable[dict]]
+    ) -> Outcome:
+        """
+        Run `func` unless a request with `key` already did.
+
+        Args:
+            key (str): The Idempotency-Key header.
+            body_fingerprint (str): Fingerprint of the request body.
+            func (Callable[[], Awaitable[dict]]): Handles the request.
+
+        Returns:
+            Outcome: The response, replayed or fresh.
+
+        Raises:
+            IdempotencyConflict: If the key was used with another body.
+            IdempotencyInProgress: If the first request with the key is
+                still running after `idempotency_wait` seconds.
+        """
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.idempotency_wait
+
+        while True:
+            try:
+                stored = await self.repository.get_result(key)
+                if stored is not None:
+                    return self._replay(stored, body_fingerprint)
+                if await self.repository.claim(key, owner, settings.idempotency_lock_timeout):
+                    break
+                if time.monotonic() >= deadline:
+                    idempotent_requests.inc({'result': 'in_progress'})
+                    raise IdempotencyInProgress()
+                idempotent_requests.inc({'result': 'waited'})
+                await self._wait(key, deadline)
+            except RedisError as exc:
+                logger.error('Idempotency unavailable, running unprotected: %s', exc)
+                idempotent_requests.inc({'result': 'unprotected'})
+                return Outcome(await func())
+
+        try:
+            response = await func()
+            try:
+                await self.repository.save_result(key, body_fingerprint, response, settings.idempotency_ttl)
+            except RedisError as exc:
+                logger.error('Could not store the idempotent response: %s', exc)
+            idempotent_requests.inc({'result': 'executed'})
+            return Outcome(response)
+        finally:
+            try:
+                await self.repository.release(key, owner)
+            except RedisError:
+                pass
+
+    async def _wait(self, key: str, deadline: float) -> None:
+        """Poll until the running request with `key` ends or the deadline passes."""
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            if not await self.repository.is_claimed(key):
+                return
+
+    def _replay(self, stored: dict, body_fingerprint: str) -> Outcome:
+        """Return a stored response if it was for the same body."""
+        if stored['fingerprint'] != body_fingerprint:
+            idempotent_requests.inc({'result': 'conflict'})
+            raise IdempotencyConflict()
+        idempotent_requests.inc({'result': 'replayed'})
+        return Outcome(stored['response'], replayed=True)
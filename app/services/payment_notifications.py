@@ -0,0 +1,193 @@
+"""Queue of Tinkoff payment notifications, applied to orders in batches."""
+import json
+import time
+import uuid
+import asyncio
+from typing import Dict
+from redis.asyncio import Redis
+
+from app.cache.invalidation import invalidate
+from app.db.database import AsyncSessionLocal
+from app.repositories.request_repository import RequestRepository, STATUS_RANKS
+from app.services.payment_status_service import request_keys, payment_status_key
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.metrics import payment_notifications
+
+logger = get_logger()
+
+# Notifications are pushed on the left and popped from the right.
+NOTIFICATIONS_KEY = 'payments:notifications'
+# A worker moves the batch it applies to its own processing list and drops
+# it only once committed, so a worker stopped mid-batch loses nothing: the
+# next worker to start puts the list back once its heartbeat has expired.
+PROCESSING_KEY = f'{NOTIFICATIONS_KEY}:processing'
+WORKER_KEY = f'{NOTIFICATIONS_KEY}:worker'
+WORKER_TTL = 60
+# Polling instead of BRPOP keeps reads within the pool's socket timeout.
+POLL_INTERVAL = 0.5
+RETRY_DELAY = 5
+
+
+async def enqueue_notification(redis: Redis, payload: dict) -> None:
+    """
+    Queue a verified notification for the background worker.
+
+    Args:
+        redis (Redis): Redis client.
+        payload (dict): The notification as sent by Tinkoff.
+    """
+    await redis.lpush(NOTIFICATIONS_KEY, json.dumps(payload))
+    payment_notifications.inc({'result': 'queued'})
+
+
+def latest_statuses(payloads: list[dict]) -> Dict[int, str]:
+    """
+    Reduce a batch of notifications to the furthest status of each order.
+
+    Notifications may arrive out of order, so the status of the latest
+    payment stage wins (see STATUS_RANKS); within a stage, the later
+    notification does.
+
+    Args:
+        payloads (list[dict]): Notifications, oldest first.
+
+    Returns:
+        Dict[int, str]: Status by request ID.
+    """
+    statuses = {}
+    for payload in payloads:
+        try:
+            order_id, status = int(payload['OrderId']), str(payload['Status'])
+        except (KeyError, TypeError, ValueError):
+            logger.error('Malformed payment notification: %s', payload)
+            continue
+        current = statuses.get(order_id)
+        if current is None or STATUS_RANKS.get(status, 0) >= STATUS_RANKS.get(current, 0):
+            statuses[order_id] = status
+    return statuses
+
+
+async def requeue_notifications(redis: Redis, processing_key: str) -> int:
+    """
+    Put the notifications of a processing list back at the head of the queue.
+
+    Args:
+        redis (Redis): Redis client.
+        processing_key (str): The worker's processing list.
+
+    Returns:
+        int: Number of notifications put back.
+    """
+    moved = 0
+    while await redis.lmove(processing_key, NOTIFICATIONS_KEY, 'LEFT', 'RIGHT') is not None:
+        moved += 1
+    return moved
+
+
+async def recover_notifications(redis: Redis) -> int:
+    """
+    Requeue the processing lists of workers that stopped mid-batch.
+
+    Args:
+        redis (Redis): Redis client.
+
+    Returns:
+        int: Number of notifications put back.
+    """
+    moved = 0
+    async for key in redis.scan_iter(match=f'{PROCESSING_KEY}:*'):
+        key = key.decode() if isinstance(key, bytes) else key
+        worker_id = key.rsplit(':', 1)[-1]
+        if await redis.get(f'{WORKER_KEY}:{worker_id}') is None:
+            moved += await requeue_notifications(redis, key)
+    if moved:
+        logger.warning('Requeued %s payment notifications of stopped workers', moved)
+    return moved
+
+
+async def process_notifications(redis: Redis, processing_key: str, batch_size: int) -> int:
+    """
+    Apply one batch of queued notifications.
+
+    The batch is moved to the worker's processing list, its statuses are
+    written with a single UPDATE, and only then is it removed from the
+    list and the cached views and statuses of the orders evicted. If the
+    update fails the batch is put back at the head of the queue.
+
+    Args:
+        redis (Redis): Redis client.
+        processing_key (str): The worker's processing list.
+        batch_size (int): Most notifications applied at once.
+
+    Returns:
+        int: Number of notifications taken from the queue.
+    """
+    pipe = redis.pipeline(transaction=False)
+    for _ in range(batch_size):
+        pipe.lmove(NOTIFICATIONS_KEY, processing_key, 'RIGHT', 'LEFT')
+    raw = [item for item in await pipe.execute() if item is not None]
+    if not raw:
+        return 0
+
+    try:
+        statuses = latest_statuses([json.loads(item) for item in raw])
+        async with AsyncSessionLocal() as session:
+            updated = await RequestRepository(session).update_statuses(statuses)
+    except Exception:
+        await requeue_notifications(redis, processing_key)
+        raise
+    # The batch sits at the left of the list, before anything a failed
+    # requeue left behind.
+    await redis.ltrim(processing_key, len(raw), -1)
+
+    payment_notifications.add({'result': 'applied'}, len(updated))
+    ignored = set(statuses) - set(updated)
+    if ignored:
+        payment_notifications.add({'result': 'ignored'}, len(ignored))
+        logger.warning('Payment notifications for unknown orders or outdated statuses: %s', sorted(ignored))
+
+    if updated:
+        await invalidate(
+            redis,
+            *request_keys(updated),
+            *(payment_status_key(request_id) for request_id in updated)
+        )
+    return len(raw)
+
+
+async def run_payment_notifications(redis: Redis) -> None:
+    """
+    Apply queued notifications until cancelled.
+
+    The worker keeps a heartbeat key alive while it runs. On start, and
+    after an error, it puts back what is left in its own processing list
+    and in those of workers whose heartbeat has expired.
+    """
+    worker_id = uuid.uuid4().hex
+    processing_key = f'{PROCESSING_KEY}:{worker_id}'
+    heartbeat_at = float('-inf')
+    recovered = False
+
+    while True:
+        try:
+            if time.monotonic() - heartbeat_at > WORKER_TTL / 3:
+                await redis.set(f'{WORKER_KEY}:{worker_id}', 1, ex=WORKER_TTL)
+                heartbeat_at = time.monotonic()
+            if not recovered:
+                await requeue_notifications(redis, processing_key)
+                await recover_notifications(redis)
+                recovered = True
+            processed = await process_notifications(
+                redis, processing_key, settings.payment_notifications_batch_size
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # pylint: disable=W0718
+            logger.error('run_payment_notifications: %s', exc)
+            await asyncio.sleep(RETRY_DELAY)
+            recovered = False
+            continue
+
+        if processed < settings.payment_notifications_batch_size:
+            await asyncio.sleep(POLL_INTERVAL)
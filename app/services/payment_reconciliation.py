@@ -0,0 +1,116 @@
+"""Reconcile orders whose payment notification never arrived."""
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+import httpx
+from redis.asyncio import Redis
+
+from app.cache.keys import lock_key
+from app.cache.invalidation import invalidate
+from app.db.database import AsyncSessionLocal
+from app.repositories.request_repository import RequestRepository, FINAL_STATUSES
+from app.services.payment_service import PaymentService
+from app.services.payment_status_service import request_keys, payment_status_key
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.metrics import payment_reconciled_orders, payment_reconcile_duration
+
+logger = get_logger()
+
+# Held by the worker running the current round, for one interval.
+RECONCILE_LOCK_KEY = lock_key('payment_reconciliation')
+
+
+class ReconcileReport(NamedTuple):
+    """Outcome of a reconciliation round."""
+
+    checked: int
+    reconciled: int
+    duration: float
+
+
+async def reconcile_payments(redis: Redis, client: httpx.AsyncClient) -> Optional[ReconcileReport]:
+    """
+    Run one reconciliation round.
+
+    Orders not in a final status `payment_reconcile_age_minutes` after
+    creation, and at most `payment_reconcile_max_age_hours` old, are
+    checked with GetState: up to `payment_reconcile_batch_size` of them,
+    oldest first, at most `payment_reconcile_concurrency` at a time.
+    Older orders are left alone, as their payment forms have expired. Changed statuses are saved
+    with a single UPDATE, which never moves an order back (see
+    RequestRepository.update_statuses), and the cached views of the
+    updated orders evicted. Only one worker runs a round.
+
+    Args:
+        redis (Redis): Redis client.
+        client (httpx.AsyncClient): Tinkoff client.
+
+    Returns:
+        Optional[ReconcileReport]: The round's outcome, or None if another
+            worker runs it.
+    """
+    if not await redis.set(RECONCILE_LOCK_KEY, 1, nx=True, ex=settings.payment_reconcile_interval):
+        return None
+
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        requests = await RequestRepository(session).get_excluding_statuses(
+            FINAL_STATUSES,
+            created_before=now - timedelta(minutes=settings.payment_reconcile_age_minutes),
+            created_after=now - timedelta(hours=settings.payment_reconcile_max_age_hours),
+            limit=settings.payment_reconcile_batch_size
+        )
+    requests = [request for request in requests if request.payment_id]
+
+    payment_service = PaymentService(client)
+    semaphore = asyncio.Semaphore(settings.payment_reconcile_concurrency)
+
+    async def check(request) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await payment_service.get_state(request.payment_id)
+            except Exception as exc:  # pylint: disable=W0718
+                logger.error('Payment reconciliation: order %s failed: %s', request.id, exc)
+                return None
+
+    states = await asyncio.gather(*(check(request) for request in requests))
+    statuses = {
+        request.id: state
+        for request, state in zip(requests, states)
+        if state is not None and state != request.status
+    }
+
+    updated = []
+    if statuses:
+        async with AsyncSessionLocal() as session:
+            updated = await RequestRepository(session).update_statuses(statuses)
+        await invalidate(
+            redis,
+            *request_keys(updated),
+            *(payment_status_key(request_id) for request_id in updated)
+        )
+
+    duration = time.perf_counter() - start
+    payment_reconciled_orders.add({}, len(updated))
+    payment_reconcile_duration.set({}, duration)
+    logger.info(
+        'Payment reconciliation: %s of %s orders reconciled in %.3fs',
+        len(updated), len(requests), duration
+    )
+    return ReconcileReport(len(requests), len(updated), duration)
+
+
+async def run_payment_reconciliation(redis: Redis, client: httpx.AsyncClient) -> None:
+    """Reconcile payments every `payment_reconcile_interval` seconds until cancelled."""
+    while True:
+        try:
+            await reconcile_payments(redis, client)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # pylint: disable=W0718
+            logger.error('run_payment_reconciliation: %s', exc)
+
+        await asyncio.sleep(settings.payment_reconcile_interval)
@@ -1,3 +1,4 @@
+import hmac
 import hashlib
 import json
 import httpx
@@ -9,6 +10,8 @@ from fastapi import HTTPException, status
 
 
 class PaymentService:
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
 
     def generate_token(self, data, request_id):
         """Generate SHA-256 token for the payment."""
@@ -29,6 +32,32 @@ class PaymentService:
                 detail=f"Failed to generate token: {exc}"
             ) from exc
 
+    def sign(self, payload: dict) -> str:
+        """
+        Compute the token of a Tinkoff request or notification.
+
+        Root-level scalar fields other than Token, plus the terminal
+        password, are sorted by name and their values concatenated and
+        hashed with SHA-256. Nested objects are not signed.
+        """
+        values = {
+            key: value for key, value in payload.items()
+            if key != 'Token' and not isinstance(value, (dict, list))
+        }
+        values['Password'] = settings.terminal_pwd
+        data_string = ''.join(
+            ('true' if value else 'false') if isinstance(value, bool) else str(value)
+            for _, value in sorted(values.items())
+        )
+        return hashlib.sha256(data_string.encode('utf-8')).hexdigest()
+
+    def verify_notification(self, payload: dict) -> bool:
+        """Check that a notification comes from Tinkoff, for our terminal."""
+        token = payload.get('Token')
+        if not isinstance(token, str) or payload.get('TerminalKey') != settings.terminal_key:
+            return False
+        return hmac.compare_digest(token, self.sign(payload))
+
     async def call_tinkoff_api(
             self,
             data: CheckoutIn,
@@ -44,26 +73,64 @@ class PaymentService:
             'Description': settings.terminal_desc,
             'Token': sha256_hash,
             'DATA': data.DATA.model_dump(),
-            'Receipt': data.Receipt.model_dump()
+            'Receipt': data.Receipt.model_dump(exclude={'Items': {'__all__': {'product_id'}}})
+        }
+
+        try:
+            response = await self.client.post(
+                f'{settings.tinkoff_url}/v2/Init',
+                headers={'Content-Type': 'application/json'},
+                json=init_data
+            )
+            response.raise_for_status()
+        except httpx.RequestError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to connect to payment provider: {exc}"
+            ) from exc
+        except httpx.HTTPStatusError as exc:
+            raise HTTPException(
+                status_code=exc.response.status_code,
+                detail=f"Payment provider returned an error: {exc}"
+            ) from exc
+        return response
+
+    async def get_state(self, payment_id: str) -> str:
+        """
+        Ask Tinkoff for the current status of a payment.
+
+        Args:
+            payment_id (str): Tinkoff PaymentId.
+
+        Returns:
+            str: The payment status, e.g. CONFIRMED.
+
+        Raises:
+            HTTPException: If Tinkoff could not be reached or reported an error.
+        """
+        state_data = {
+            'TerminalKey': settings.terminal_key,
+            'PaymentId': str(payment_id),
         }
+        state_data['Token'] = self.sign(state_data)
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f'{settings.tinkoff_url}/v2/Init',
-                    headers={'Content-Type': 'application/json'},
-                    json=init_data,
-                    timeout=30
-                )
-                response.raise_for_status()
-            except httpx.RequestError as exc:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to connect to payment provider: {exc}"
-                ) from exc
-            except httpx.HTTPStatusError as exc:
-                raise HTTPException(
-                    status_code=exc.response.status_code,
-                    detail=f"Payment provider returned an error: {exc}"
-                ) from exc
-            return response
+        try:
+            response = await self.client.post(
+                f'{settings.tinkoff_url}/v2/GetState',
+                headers={'Content-Type': 'application/json'},
+                json=state_data
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Failed to get the payment state: {exc}"
+            ) from exc
+
+        result = response.json()
+        if not result.get('Success'):
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Payment provider returned an error: {result.get('Message')}"
+            )
+        return result['Status']
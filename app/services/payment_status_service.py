@@ -0,0 +1,113 @@
+"""Cached payment status of orders, checked with Tinkoff GetState."""
+import hmac
+from typing import Iterable, Optional
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.tiered import TieredCache
+from app.cache.response import CachedPayload, NEGATIVE_BODY, make_payload
+from app.cache.invalidation import invalidate
+from app.repositories.request_repository import RequestRepository, FINAL_STATUSES
+from app.services.payment_service import PaymentService
+from app.core.config import settings
+
+
+def payment_status_key(order_id: int) -> str:
+    """Cache key of an order's payment status."""
+    return f'payment_status:{order_id}'
+
+
+def request_keys(order_ids: Iterable[int]) -> list[str]:
+    """Cached views of orders, to evict when their status changes."""
+    return ['request_list', *(f'request:{order_id}' for order_id in order_ids)]
+
+
+def owns(status: dict, payment_id: str) -> bool:
+    """Whether a caller's PaymentId is that of the order."""
+    known = status.get('payment_id')
+    return bool(known) and hmac.compare_digest(str(known).encode(), payment_id.encode())
+
+
+class PaymentStatusService:
+    """
+    Payment status of orders.
+
+    A status is served from the cache; once it is older than
+    `payment_status_ttl` it is still returned while a single background
+    task asks Tinkoff again (see TieredCache.get_or_build). Orders in a
+    final status are answered from the database alone.
+
+    A status is only given to a caller that knows the order's Tinkoff
+    PaymentId, and Tinkoff is only asked on behalf of such a caller.
+    """
+
+    def __init__(self, payment_service: PaymentService, cache: TieredCache):
+        """
+        Initialize the service.
+
+        Args:
+            payment_service (PaymentService): Calls GetState.
+            cache (TieredCache): Status cache.
+        """
+        self.payment_service = payment_service
+        self.cache = cache
+
+    async def get_status(self, order_id: int, payment_id: str) -> CachedPayload:
+        """
+        Get the encoded `{'order_id', 'payment_id', 'status'}` of an order.
+
+        Args:
+            order_id (int): Request ID.
+            payment_id (str): The order's Tinkoff PaymentId, as given to
+                the caller when the payment was created.
+
+        Returns:
+            CachedPayload: The status, or a negative payload if there is
+                no such order or it has another PaymentId.
+        """
+        payload = await self.cache.get_or_build(
+            payment_status_key(order_id),
+            lambda session: self.check(session, order_id, payment_id),
+            ttl=settings.payment_status_ttl,
+            stale_ttl=settings.payment_status_stale_ttl
+        )
+        if payload.is_negative or not owns(orjson.loads(payload.body), payment_id):
+            return make_payload(NEGATIVE_BODY)
+        return payload
+
+    async def check(self, session: AsyncSession, order_id: int, payment_id: str) -> Optional[dict]:
+        """
+        Read an order's status, asking Tinkoff unless it is final.
+
+        Tinkoff is not asked for a caller with another PaymentId. A
+        changed status is saved unless a newer one was saved meanwhile,
+        and the cached views of the order evicted.
+
+        Args:
+            session (AsyncSession): Database session.
+            order_id (int): Request ID.
+            payment_id (str): PaymentId given by the caller.
+
+        Returns:
+            Optional[dict]: `{'order_id', 'payment_id', 'status'}`, or None
+                if there is no such order.
+        """
+        request_repo = RequestRepository(session)
+        request = await request_repo.get_by_id(order_id)
+        if request is None:
+            return None
+
+        result = {'order_id': order_id, 'payment_id': request.payment_id, 'status': request.status}
+        if request.status in FINAL_STATUSES or not owns(result, payment_id):
+            return result
+
+        state = await self.payment_service.get_state(request.payment_id)
+        if state != request.status:
+            if await request_repo.update_statuses({order_id: state}):
+                await invalidate(self.cache.redis, *request_keys([order_id]))
+            else:
+                # A notification saved a later status first.
+                await session.refresh(request, ['status'])
+                state = request.status
+            result['status'] = state
+        return result
@@ -0,0 +1,227 @@
+"""Server-side pricing of carts and checkouts from the cached catalog."""
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.tiered import TieredCache
+from app.schemas.cart import CartPrice, PricedItem
+from app.schemas.delivery import CartItem
+from app.schemas.payment import CheckoutIn
+from app.schemas.promo_code import DiscountType
+from app.repositories.promo_code_repo import PromoCodeRepository
+from app.services.cart_service import CartService
+from app.core.config import settings
+
+PROMO_TTL = 60
+
+
+def promo_key(promo_code_id: int) -> str:
+    """Cache key of a promo code's discount."""
+    return f'promo:{promo_code_id}'
+
+
+class PricingError(Exception):
+    """The order can not be priced as sent."""
+
+
+class InvalidPromoCode(PricingError):
+    """The promo code does not exist or has expired."""
+
+
+class PriceMismatch(PricingError):
+    """The client's amounts differ from the server's."""
+
+
+def discount_for(subtotal: int, promo: Optional[dict]) -> int:
+    """
+    Compute the promo discount of a subtotal.
+
+    Args:
+        subtotal (int): Total before the discount, in receipt units.
+        promo (Optional[dict]): `discount_type` and `discount_value`.
+
+    Returns:
+        int: The discount, never more than the subtotal.
+
+    Raises:
+        InvalidPromoCode: If the discount type is unknown.
+    """
+    if promo is None:
+        return 0
+    if promo['discount_type'] == DiscountType.PERCENTAGE:
+        discount = subtotal * promo['discount_value'] // 100
+    elif promo['discount_type'] == DiscountType.FIXED_AMOUNT:
+        discount = promo['discount_value'] * settings.receipt_price_multiplier
+    else:
+        raise InvalidPromoCode(f"Unknown discount type {promo['discount_type']}")
+    return max(0, min(discount, subtotal))
+
+
+def distribute(amounts: List[int], discount: int) -> List[int]:
+    """
+    Spread a discount over line amounts, in proportion to them.
+
+    Shares are rounded down and the remainder goes to the lines with the
+    largest rounding loss, earliest first, so the lines add up exactly.
+
+    Args:
+        amounts (List[int]): Line amounts before the discount.
+        discount (int): Discount to spread, at most their sum.
+
+    Returns:
+        List[int]: Line amounts after the discount.
+    """
+    subtotal = sum(amounts)
+    if not discount or not subtotal:
+        return list(amounts)
+
+    shares = [discount * amount // subtotal for amount in amounts]
+    losses = [discount * amount % subtotal for amount in amounts]
+    for index in sorted(range(len(amounts)), key=lambda i: -losses[i])[:discount - sum(shares)]:
+        shares[index] += 1
+    return [amount - share for amount, share in zip(amounts, shares)]
+
+
+class PricingService:
+    """
+    Prices carts from cached products and promo codes.
+
+    Products come from the catalog cache, with a single query for any
+    misses (see CartService.get_products), and promo codes from their own
+    short-lived cache, so pricing does not query per item. The promo cache
+    is meant to be Redis only: promos then stay out of the per-worker
+    caches, and their rebuilds are not published as invalidations.
+    """
+
+    def __init__(self, cart_service: CartService, cache: TieredCache):
+        """
+        Initialize the service.
+
+        Args:
+            cart_service (CartService): Gives cached products.
+            cache (TieredCache): Promo code cache, without local tiers.
+        """
+        self.cart_service = cart_service
+        self.cache = cache
+
+    async def get_promo(self, promo_code_id: Optional[int]) -> Optional[dict]:
+        """
+        Get a valid promo code's discount.
+
+        Args:
+            promo_code_id (Optional[int]): Promo code ID, None for no promo.
+
+        Returns:
+            Optional[dict]: `discount_type`, `discount_value` and
+                `valid_until`, or None without a promo code.
+
+        Raises:
+            InvalidPromoCode: If the promo code does not exist or has expired.
+        """
+        if promo_code_id is None:
+            return None
+
+        payload = await self.cache.get_or_build(
+            promo_key(promo_code_id),
+            lambda session: self._load_promo(session, promo_code_id),
+            ttl=PROMO_TTL
+        )
+        if payload.is_negative:
+            raise InvalidPromoCode(f'Unknown promo code {promo_code_id}')
+
+        promo = orjson.loads(payload.body)
+        if datetime.fromisoformat(promo['valid_until']) < datetime.now():
+            raise InvalidPromoCode(f'Promo code {promo_code_id} has expired')
+        return promo
+
+    async def price(self, items: List[CartItem], promo_code_id: Optional[int] = None) -> CartPrice:
+        """
+        Price a cart.
+
+        Args:
+            items (List[CartItem]): Cart lines.
+            promo_code_id (Optional[int]): Promo code to apply.
+
+        Returns:
+            CartPrice: Lines, subtotal, discount and total, in receipt units.
+
+        Raises:
+            UnknownProducts: If some products do not exist or are not
+                published.
+            InvalidPromoCode: If the promo code can not be applied.
+        """
+        products, promo = await asyncio.gather(
+            self.cart_service.get_products([item.product_id for item in items]),
+            self.get_promo(promo_code_id)
+        )
+
+        prices = [products[item.product_id]['price'] * settings.receipt_price_multiplier for item in items]
+        amounts = [price * item.quantity for price, item in zip(prices, items)]
+        subtotal = sum(amounts)
+        discount = discount_for(subtotal, promo)
+
+        return CartPrice(
+            items=[
+                PricedItem(
+                    product_id=item.product_id,
+                    name=products[item.product_id]['name'],
+                    price=price,
+                    quantity=item.quantity,
+                    amount=amount
+                )
+                for item, price, amount in zip(items, prices, distribute(amounts, discount))
+            ],
+            subtotal=subtotal,
+            discount=discount,
+            total=subtotal - discount
+        )
+
+    async def verify_checkout(self, data: CheckoutIn) -> CartPrice:
+        """
+        Check a checkout's amounts against the server's pricing.
+
+        Args:
+            data (CheckoutIn): The checkout as sent by the client.
+
+        Returns:
+            CartPrice: The server's pricing.
+
+        Raises:
+            PricingError: If the receipt has no items or a bad quantity.
+            PriceMismatch: If a line or the total differs.
+            UnknownProducts: If some products do not exist or are not
+                published.
+            InvalidPromoCode: If the promo code can not be applied.
+        """
+        receipt_items = data.Receipt.Items
+        if not receipt_items or any(item.Quantity < 1 for item in receipt_items):
+            raise PricingError('The receipt must have items, each with a positive quantity')
+
+        pricing = await self.price(
+            [CartItem(product_id=item.product_id, quantity=item.Quantity) for item in receipt_items],
+            data.promo_code_id
+        )
+
+        for item, priced in zip(receipt_items, pricing.items):
+            if item.Price != priced.price or item.Amount != priced.amount:
+                raise PriceMismatch(
+                    f'Product {priced.product_id}: expected price {priced.price} '
+                    f'and amount {priced.amount}, got {item.Price} and {item.Amount}'
+                )
+        if data.Amount != pricing.total:
+            raise PriceMismatch(f'Expected total {pricing.total}, got {data.Amount}')
+        return pricing
+
+    async def _load_promo(self, session: AsyncSession, promo_code_id: int) -> Optional[dict]:
+        """Load a promo code's discount from the database."""
+        promo = await PromoCodeRepository(session).get_by_id(promo_code_id)
+        if promo is None:
+            return None
+        return {
+            'discount_type': promo.discount_type,
+            'discount_value': promo.discount_value,
+            'valid_until': promo.valid_until,
+        }
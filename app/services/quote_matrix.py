@@ -0,0 +1,126 @@
+"""Precomputed delivery quotes for the top cities and product parcels."""
+import asyncio
+from typing import List
+import httpx
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.keys import lock_key
+from app.cache.tiered import TieredCache
+from app.db.database import AsyncSessionLocal
+from app.schemas.delivery import DeliveryIn
+from app.repositories.city_repository import CityRepository
+from app.repositories.product_repository import ProductRepository
+from app.repositories.token_repository import TokenRepository
+from app.services.cdek_service import CDEKService
+from app.services.token_service import TokenService
+from app.services.quote_service import QuoteService, bucket_packages, quote_key, matrix_keys
+from app.services.cart_service import to_packages
+from app.utils.packing import make_parcel, pack
+from app.utils.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.metrics import quote_matrix_refreshes
+
+logger = get_logger()
+
+# Held by the worker running the current round, for one interval.
+MATRIX_LOCK_KEY = lock_key('quote_matrix')
+
+
+async def matrix_deliveries(session: AsyncSession) -> List[DeliveryIn]:
+    """
+    Build the destination and parcel combinations to precompute.
+
+    Destinations are the first `quote_matrix_top_cities` cities of the
+    city picker; parcels are single published products, packed as the
+    cart endpoint packs them and deduplicated by their bucketed profile.
+
+    Args:
+        session (AsyncSession): Database session.
+
+    Returns:
+        List[DeliveryIn]: One entry per city and parcel.
+    """
+    cities = await CityRepository(session).get_by_sequence(settings.quote_matrix_top_cities)
+    products = await ProductRepository(session).get_all_published()
+
+    profiles = {}
+    for product in products:
+        if min(product.weight, product.height, product.length, product.width) <= 0:
+            continue
+        parcel = make_parcel(product.weight, product.height, product.length, product.width)
+        bucketed = bucket_packages(to_packages(pack([parcel])))
+        profiles[bucketed[0].model_dump_json()] = bucketed
+
+    return [
+        DeliveryIn(city_name=city.name, city_code=city.code, address='', city_zip='', packages=packages)
+        for city in cities
+        for packages in profiles.values()
+    ]
+
+
+async def refresh_quote_matrix(redis: Redis, client: httpx.AsyncClient) -> int:
+    """
+    Run one round of the matrix: quote every combination and cache it.
+
+    Every worker records the matrix keys, so hits on them are counted,
+    but only the worker holding the round's lock calls CDEK. Calls are
+    spaced to stay within `quote_matrix_qps`.
+
+    Args:
+        redis (Redis): Redis client.
+        client (httpx.AsyncClient): CDEK client.
+
+    Returns:
+        int: Number of quotes refreshed by this worker.
+    """
+    async with AsyncSessionLocal() as session:
+        deliveries = await matrix_deliveries(session)
+
+    keys = {
+        quote_key(delivery.city_code, bucket_packages(delivery.packages))
+        for delivery in deliveries
+    }
+    matrix_keys.clear()
+    matrix_keys.update(keys)
+
+    if not await redis.set(MATRIX_LOCK_KEY, 1, nx=True, ex=settings.quote_matrix_interval):
+        return 0
+
+    quote_service = QuoteService(
+        CDEKService(TokenService(TokenRepository(redis), client), client),
+        # Redis only: a round writes far more quotes than the per-worker
+        # caches hold and would evict the catalog from them.
+        TieredCache(redis, local=None, session_factory=None, fallback=None)
+    )
+
+    refreshed = 0
+    for delivery in deliveries:
+        try:
+            await quote_service.refresh_quotes(delivery)
+            refreshed += 1
+            quote_matrix_refreshes.inc({})
+        except CircuitOpenError:
+            logger.error('Quote matrix: CDEK circuit is open, stopping this round')
+            break
+        except Exception as exc:  # pylint: disable=W0718
+            logger.error('Quote matrix: city %s failed: %r', delivery.city_code, exc)
+        await asyncio.sleep(1 / settings.quote_matrix_qps)
+
+    return refreshed
+
+
+async def run_quote_matrix(redis: Redis, client: httpx.AsyncClient) -> None:
+    """Refresh the quote matrix every `quote_matrix_interval` seconds until cancelled."""
+    while True:
+        try:
+            refreshed = await refresh_quote_matrix(redis, client)
+            if refreshed:
+                logger.info('Quote matrix: refreshed %s quotes', refreshed)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # pylint: disable=W0718
+            logger.error('run_quote_matrix: %s', exc)
+
+        await asyncio.sleep(settings.quote_matrix_interval)
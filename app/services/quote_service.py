@@ -0,0 +1,193 @@
+"""Cached delivery quotes."""
+import math
+import asyncio
+import hashlib
+from typing import List, NamedTuple
+
+from app.cache.tiered import TieredCache
+from app.cache.response import CachedPayload, dumps, make_payload
+from app.schemas.delivery import DeliveryIn, Packages
+from app.services.cdek_service import CDEKService, FROM_CITY, cdek_breaker
+from app.utils.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.metrics import delivery_quote_lookups, quote_matrix_hits
+
+logger = get_logger()
+
+# Keys kept warm by the quote matrix job (see quote_matrix).
+matrix_keys: set[str] = set()
+
+
+class NoQuotes(Exception):
+    """CDEK offered no tariff; not worth caching."""
+
+
+class QuoteUnavailable(Exception):
+    """CDEK failed and no earlier quote is known."""
+
+
+class Quotes(NamedTuple):
+    """Encoded quote list and whether it is a stale fallback."""
+
+    payload: CachedPayload
+    stale: bool = False
+
+
+def bucket_packages(packages: List[Packages]) -> List[Packages]:
+    """
+    Round package weights and dimensions up to their buckets, in a
+    canonical order.
+
+    Quotes are requested for the bucketed packages, so a cached quote is
+    exact for every package set in the same buckets, and never too low.
+
+    Args:
+        packages (List[Packages]): Packages as sent by the client.
+
+    Returns:
+        List[Packages]: Bucketed packages, sorted.
+    """
+    def round_up(value: int, bucket: int) -> int:
+        return math.ceil(value / bucket) * bucket
+
+    bucketed = [
+        Packages(
+            weight=round_up(package.weight, settings.quote_weight_bucket),
+            height=round_up(package.height, settings.quote_size_bucket),
+            length=round_up(package.length, settings.quote_size_bucket),
+            width=round_up(package.width, settings.quote_size_bucket),
+        )
+        for package in packages
+    ]
+    return sorted(bucketed, key=lambda package: (package.weight, package.height, package.length, package.width))
+
+
+def quote_key(city_code: int, packages: List[Packages]) -> str:
+    """
+    Build the cache key of a quote.
+
+    Args:
+        city_code (int): Destination city code.
+        packages (List[Packages]): Bucketed, sorted packages.
+
+    Returns:
+        str: Key hashing origin, destination and package profile.
+    """
+    profile = dumps({
+        'from': FROM_CITY,
+        'to': city_code,
+        'packages': [package.model_dump() for package in packages],
+    })
+    return f'quote:{hashlib.blake2b(profile, digest_size=16).hexdigest()}'
+
+
+def last_good_key(key: str) -> str:
+    """Key of the last successful quote, kept after `key` expires."""
+    return f'{key}:last_good'
+
+
+class QuoteService:
+    """
+    Delivery quotes cached by destination and package profile.
+
+    Identical quotes requested concurrently share one CDEK call, in this
+    worker and across workers (see TieredCache.get_or_build).
+
+    CDEK calls go through a circuit breaker and must finish within
+    `cdek_quote_budget` seconds. Otherwise the last successful quote for
+    the same profile is returned, flagged as stale.
+    """
+
+    def __init__(
+        self,
+        cdek_service: CDEKService,
+        cache: TieredCache,
+        breaker: CircuitBreaker = cdek_breaker
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            cdek_service (CDEKService): Quotes on a cache miss.
+            cache (TieredCache): Quote cache; its loaders get no session.
+            breaker (CircuitBreaker): Guards the CDEK calls.
+        """
+        self.cdek_service = cdek_service
+        self.cache = cache
+        self.breaker = breaker
+
+    async def get_quotes(self, delivery_data: DeliveryIn) -> Quotes:
+        """
+        Get the encoded quotes of every offered tariff.
+
+        Args:
+            delivery_data (DeliveryIn): Destination and packages.
+
+        Returns:
+            Quotes: The quote list, as CDEKService returns it.
+
+        Raises:
+            QuoteUnavailable: If CDEK failed and no earlier quote is known.
+        """
+        packages = bucket_packages(delivery_data.packages)
+        bucketed = delivery_data.model_copy(update={'packages': packages})
+        key = quote_key(delivery_data.city_code, packages)
+        called = False
+
+        async def load(_):
+            nonlocal called
+            called = True
+            return await self._fetch(bucketed, key)
+
+        try:
+            payload = await self.cache.get_or_build(key, load, ttl=settings.quote_cache_ttl)
+        except NoQuotes:
+            payload = make_payload(b'[]')
+        except Exception as exc:
+            logger.error('Delivery quote failed: %r', exc)
+            payload = await self.cache.get(last_good_key(key))
+            if payload is None:
+                raise QuoteUnavailable() from exc
+            delivery_quote_lookups.inc({'result': 'stale'})
+            return Quotes(payload, stale=True)
+
+        delivery_quote_lookups.inc({'result': 'miss' if called else 'hit'})
+        if not called and key in matrix_keys:
+            quote_matrix_hits.inc({})
+        return Quotes(payload)
+
+    async def refresh_quotes(self, delivery_data: DeliveryIn) -> str:
+        """
+        Quote a destination and package set and cache the result, even if
+        a cached quote exists.
+
+        Args:
+            delivery_data (DeliveryIn): Destination and packages.
+
+        Returns:
+            str: The cache key of the quote.
+        """
+        packages = bucket_packages(delivery_data.packages)
+        bucketed = delivery_data.model_copy(update={'packages': packages})
+        key = quote_key(delivery_data.city_code, packages)
+
+        try:
+            quotes = await self._fetch(bucketed, key)
+        except NoQuotes:
+            return key
+        await self.cache.set(key, quotes, ex=settings.quote_cache_ttl)
+        return key
+
+    async def _fetch(self, bucketed: DeliveryIn, key: str) -> list:
+        """Quote bucketed packages through the breaker and remember the result."""
+        quotes = await self.breaker.call(
+            lambda: asyncio.wait_for(
+                self.cdek_service.get_calculation_by_type(bucketed),
+                settings.cdek_quote_budget
+            )
+        )
+        if not quotes:
+            raise NoQuotes()
+        await self.cache.set(last_good_key(key), quotes, ex=settings.quote_last_good_ttl)
+        return quotes
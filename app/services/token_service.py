@@ -1,42 +1,175 @@
 # services/token_service.py
 import time
+import uuid
+import asyncio
+from typing import Optional
 import httpx
 from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from app.repositories.token_repository import TokenRepository
+from app.utils.rate_limiter import RateLimiter
 from app.core.config import settings
+from app.core.logger import get_logger
+from app.metrics import cdek_token_refreshes
+
+logger = get_logger()
+
+REFRESH_LOCK_TIMEOUT = 30
+REFRESH_POLL_INTERVAL = 0.1
+
+# Token cached in this worker, so most calls do not touch Redis.
+_memo: Optional[dict] = None
+# Refresh running in this worker, shared by concurrent callers.
+_refresh: Optional[asyncio.Task] = None
+
+
+def cdek_limiter(redis: Redis) -> RateLimiter:
+    """Rate limiter shared by every call to CDEK."""
+    return RateLimiter(
+        redis,
+        'cdek',
+        rate=settings.cdek_rate_limit,
+        burst=settings.cdek_rate_limit_burst,
+        max_wait=settings.cdek_rate_limit_max_wait
+    )
 
 
 class TokenService:
-    def __init__(self, token_repository: TokenRepository):
+    def __init__(
+        self,
+        token_repository: TokenRepository,
+        client: httpx.AsyncClient,
+        limiter: Optional[RateLimiter] = None
+    ):
         self.token_repository = token_repository
+        self.client = client
+        self.limiter = limiter or cdek_limiter(token_repository.cache)
 
     async def get_valid_token(self) -> str:
-        """Get a valid token, refreshing if expired."""
-        token = await self.token_repository.get_token()
+        """
+        Get a valid token, refreshing it if expired.
 
-        if not token or self._is_token_expired(token):
-            token = await self._fetch_new_token()
-            await self.token_repository.save_token(token)
+        The token is kept in process and re-read from Redis only once a
+        refresh is due. Past `cdek_token_refresh_fraction` of its lifetime
+        it is refreshed in the background, and it counts as expired
+        `cdek_token_expiry_margin` seconds early, so callers never get a
+        token that dies mid-request. Only one worker refreshes at a time.
+        """
+        global _memo
+
+        token = _memo
+        if token is None or self._is_refresh_due(token):
+            cached = await self._get_cached_token()
+            if cached is not None and (token is None or cached["expires_at"] > token["expires_at"]):
+                token = _memo = cached
+
+        if token is None or self._is_token_expired(token):
+            token = await asyncio.shield(self._start_refresh(wait=True))
+            if token is None:
+                # Joined a background refresh that yielded to another worker.
+                token = await self._refresh_token(wait=True)
+        elif self._is_refresh_due(token):
+            self._start_refresh(wait=False)
 
         return token["access_token"]
 
     def _is_token_expired(self, token: dict) -> bool:
-        """Check if the token has expired."""
-        return token["expires_at"] <= time.time()
+        """Check if the token has expired, or will within the safety margin."""
+        return token["expires_at"] - settings.cdek_token_expiry_margin <= time.time()
+
+    def _is_refresh_due(self, token: dict) -> bool:
+        """Check if the token is old enough to be refreshed in the background."""
+        issued_at = token["expires_at"] - token["expires_in"]
+        return issued_at + token["expires_in"] * settings.cdek_token_refresh_fraction <= time.time()
+
+    async def _get_cached_token(self) -> Optional[dict]:
+        """Read the shared token; None if missing or Redis is unavailable."""
+        try:
+            return await self.token_repository.get_token()
+        except RedisError as exc:
+            logger.error('Could not read the CDEK token from Redis: %s', exc)
+            return None
+
+    def _start_refresh(self, wait: bool) -> asyncio.Task:
+        """Start a refresh, or join the one already running here."""
+        global _refresh
+
+        if _refresh is None or _refresh.done():
+            _refresh = asyncio.create_task(self._refresh_token(wait))
+        return _refresh
+
+    async def _refresh_token(self, wait: bool) -> Optional[dict]:
+        """
+        Fetch and share a new token under a Redis lock.
+
+        If another worker holds the lock, a caller that needs the token
+        waits for it to appear in Redis (or fetches it itself once the lock
+        times out); a background refresh just gives up.
+        """
+        global _memo
+
+        owner = uuid.uuid4().hex
+        try:
+            acquired = await self.token_repository.acquire_refresh_lock(owner, REFRESH_LOCK_TIMEOUT)
+        except RedisError as exc:
+            logger.error('Refreshing the CDEK token without a lock: %s', exc)
+            acquired = None
+
+        try:
+            if acquired is False:
+                if not wait:
+                    return None
+                token = await self._wait_for_refresh()
+                if token is not None:
+                    _memo = token
+                    return token
+
+            token = await self._fetch_new_token()
+            _memo = token
+            cdek_token_refreshes.inc({})
+            try:
+                await self.token_repository.save_token(
+                    token,
+                    ex=max(1, int(token["expires_in"] - settings.cdek_token_expiry_margin))
+                )
+            except RedisError as exc:
+                logger.error('Could not share the CDEK token: %s', exc)
+            return token
+        except Exception as exc:
+            if wait:
+                raise
+            logger.error('Background refresh of the CDEK token failed: %s', exc)
+            return None
+        finally:
+            if acquired:
+                try:
+                    await self.token_repository.release_refresh_lock(owner)
+                except RedisError:
+                    pass
+
+    async def _wait_for_refresh(self) -> Optional[dict]:
+        """Poll Redis for the token being refreshed by another worker."""
+        deadline = time.monotonic() + REFRESH_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(REFRESH_POLL_INTERVAL)
+            token = await self._get_cached_token()
+            if token is not None and not self._is_refresh_due(token):
+                return token
+        return None
 
     async def _fetch_new_token(self) -> dict:
         """Fetch a new token from the external service (e.g., CDEK)."""
+        await self.limiter.acquire()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{settings.cdek_endpoint}/v2/oauth/token",
-                    data=self._get_token_request_data(),
-                    timeout=30
-                )
-                response.raise_for_status()
-                token_info = response.json()
-                token_info["expires_at"] = time.time() + token_info["expires_in"]
-                return token_info
+            response = await self.client.post(
+                f"{settings.cdek_endpoint}/v2/oauth/token",
+                data=self._get_token_request_data()
+            )
+            response.raise_for_status()
+            token_info = response.json()
+            token_info["expires_at"] = time.time() + token_info["expires_in"]
+            return token_info
         except httpx.RequestError as exc:
             raise HTTPException(status_code=500, detail=f"Error fetching new token: {exc}")
 
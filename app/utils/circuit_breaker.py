@@ -0,0 +1,150 @@
+"""Circuit breaker for calls to an unreliable dependency."""
+import time
+from typing import Awaitable, Callable, Tuple, Type, TypeVar
+
+from app.core.logger import get_logger
+from app.metrics import circuit_breaker_state
+
+logger = get_logger()
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Values of the circuit_breaker_state gauge.
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Stop calling a dependency after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected for `recovery_timeout` seconds. Then it is half
+    open: a single call is let through as a probe, closing the circuit if
+    it succeeds and opening it again if it fails.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        ignored: Tuple[Type[BaseException], ...] = ()
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name (str): Dependency name, used in logs and metrics.
+            failure_threshold (int): Consecutive failures that open the circuit.
+            recovery_timeout (float): Seconds to wait before probing.
+            exceptions (Tuple[Type[BaseException], ...]): Exceptions that
+                count as failures; others pass through untouched.
+            ignored (Tuple[Type[BaseException], ...]): Exceptions that never
+                count as failures, even if listed in `exceptions`.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.exceptions = exceptions
+        self.ignored = ignored
+        self.failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        circuit_breaker_state.set({'name': name}, STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        if self._state == OPEN and time.monotonic() >= self._opened_at + self.recovery_timeout:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go through now.
+
+        Returns:
+            bool: False while open, or while half open and a probe is
+                already running.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        self._probing = False
+        if self._state != CLOSED:
+            logger.info('Circuit %s closed', self.name)
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit if needed."""
+        self.failures += 1
+        self._probing = False
+        if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != OPEN:
+                logger.error(
+                    'Circuit %s opened after %s failures', self.name, self.failures
+                )
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures."""
+        self.failures = 0
+        self._probing = False
+        self._opened_at = 0.0
+        self._set_state(CLOSED)
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call through the breaker.
+
+        Args:
+            func (Callable[[], Awaitable[T]]): Makes the call.
+
+        Returns:
+            T: The call's result.
+
+        Raises:
+            CircuitOpenError: If the circuit does not allow the call.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f'Circuit {self.name} is open')
+
+        try:
+            result = await func()
+        except self.ignored:
+            self._probing = False
+            raise
+        except self.exceptions:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or unrelated error: free the probe slot.
+            self._probing = False
+            raise
+
+        self.record_success()
+        return result
+
+    def _set_state(self, state: str) -> None:
+        """Change state and publish it."""
+        self._state = state
+        circuit_breaker_state.set({'name': self.name}, STATE_VALUES[state])
@@ -0,0 +1,94 @@
+"""Consolidate cart items into parcels for delivery quotes."""
+from typing import List, NamedTuple, Tuple
+
+# CDEK volumetric divisor: cm³ per kg.
+VOLUMETRIC_DIVISOR = 5000
+# Parcel limits of the offered tariffs.
+MAX_PARCEL_WEIGHT = 30000
+MAX_PARCEL_SIDE = 150
+
+
+class Parcel(NamedTuple):
+    """Parcel weight in grams and sides in cm, shortest side first."""
+
+    weight: int
+    sides: Tuple[int, int, int]
+
+    @property
+    def chargeable_weight(self) -> float:
+        """Billed weight in kg: the larger of actual and volumetric weight."""
+        length, width, height = self.sides
+        return max(self.weight / 1000, length * width * height / VOLUMETRIC_DIVISOR)
+
+
+def make_parcel(weight: int, height: int, length: int, width: int) -> Parcel:
+    """Create a parcel for a single item."""
+    return Parcel(weight, tuple(sorted((height, length, width))))
+
+
+def stack(parcel: Parcel, item: Parcel) -> Parcel:
+    """
+    Put `item` into `parcel`, stacked along whichever side gives the
+    smallest box.
+
+    Args:
+        parcel (Parcel): Parcel to extend.
+        item (Parcel): Item to add.
+
+    Returns:
+        Parcel: The combined parcel.
+    """
+    candidates = []
+    for axis in range(3):
+        sides = [
+            parcel.sides[i] + item.sides[i] if i == axis else max(parcel.sides[i], item.sides[i])
+            for i in range(3)
+        ]
+        candidates.append(Parcel(parcel.weight + item.weight, tuple(sorted(sides))))
+    return min(candidates, key=lambda candidate: candidate.sides[0] * candidate.sides[1] * candidate.sides[2])
+
+
+def fits(parcel: Parcel, max_weight: int, max_side: int) -> bool:
+    """Check a parcel against the tariff limits."""
+    return parcel.weight <= max_weight and parcel.sides[2] <= max_side
+
+
+def pack(
+    items: List[Parcel],
+    max_weight: int = MAX_PARCEL_WEIGHT,
+    max_side: int = MAX_PARCEL_SIDE
+) -> List[Parcel]:
+    """
+    Consolidate items into parcels, minimizing the total billed weight.
+
+    Greedy: items are taken largest first and each goes wherever it adds
+    the least chargeable weight, either stacked into an existing parcel
+    (within the limits) or into a new one. Ties favour fewer parcels.
+
+    Args:
+        items (List[Parcel]): One entry per unit in the cart.
+        max_weight (int): Parcel weight limit in grams.
+        max_side (int): Parcel side limit in cm.
+
+    Returns:
+        List[Parcel]: The parcels, in a canonical order.
+    """
+    parcels: List[Parcel] = []
+    for item in sorted(items, key=lambda item: (item.sides[0] * item.sides[1] * item.sides[2], item.weight), reverse=True):
+        best_index, best_parcel = None, item
+        best_cost = item.chargeable_weight
+
+        for index, parcel in enumerate(parcels):
+            merged = stack(parcel, item)
+            if not fits(merged, max_weight, max_side):
+                continue
+            cost = merged.chargeable_weight - parcel.chargeable_weight
+            if cost <= best_cost:
+                best_index, best_parcel, best_cost = index, merged, cost
+
+        if best_index is None:
+            parcels.append(best_parcel)
+        else:
+            parcels[best_index] = best_parcel
+
+    return sorted(parcels)
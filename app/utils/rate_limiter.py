@@ -0,0 +1,106 @@
+"""Token bucket rate limiter shared across workers through Redis."""
+import asyncio
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.logger import get_logger
+from app.metrics import rate_limit_waits, rate_limit_wait_seconds, rate_limit_rejections
+
+logger = get_logger()
+
+# Takes a token from the bucket in KEYS[1], refilled at ARGV[1] tokens per
+# second up to ARGV[2]. If the bucket is empty the token is reserved ahead,
+# so callers are served in order, unless the wait would exceed ARGV[3] ms.
+# Returns the wait in ms before the token may be used, or minus the wait
+# if it was not reserved. Uses the Redis clock, so hosts need not agree.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if tokens < 1 then
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+if wait > max_wait then
+    return -wait
+end
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) * 1000 / rate) + 1000)
+return wait
+"""
+
+
+class RateLimited(Exception):
+    """No token could be had within the caller's waiting budget."""
+
+
+class RateLimiter:
+    """
+    Limit calls to a dependency across every worker and host.
+
+    Tokens refill at `rate` per second up to `burst`. A caller finding the
+    bucket empty queues for its token for at most `max_wait` seconds;
+    with `max_wait=0` it fails fast instead.
+    """
+
+    def __init__(self, redis: Redis, name: str, rate: float, burst: int, max_wait: float):
+        """
+        Initialize the limiter.
+
+        Args:
+            redis (Redis): Redis client holding the bucket.
+            name (str): Dependency name, used in the key and metrics.
+            rate (float): Tokens added per second.
+            burst (int): Bucket size.
+            max_wait (float): Default seconds a caller may queue.
+        """
+        self.redis = redis
+        self.name = name
+        self.key = f'rate_limit:{name}'
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """
+        Take a token, waiting for it if needed.
+
+        If Redis is unavailable the call is let through: an outage of the
+        limiter must not stop the dependency.
+
+        Args:
+            max_wait (Optional[float]): Seconds the caller may queue,
+                overriding the default.
+
+        Raises:
+            RateLimited: If the token would come later than `max_wait`.
+        """
+        if max_wait is None:
+            max_wait = self.max_wait
+
+        try:
+            wait = int(await self.redis.eval(
+                TOKEN_BUCKET_SCRIPT, 1, self.key,
+                self.rate, self.burst, int(max_wait * 1000)
+            ))
+        except RedisError as exc:
+            logger.error('Rate limiter %s unavailable, not limiting: %s', self.name, exc)
+            return
+
+        if wait < 0:
+            rate_limit_rejections.inc({'name': self.name})
+            raise RateLimited(f'{self.name}: next call allowed in {-wait} ms')
+
+        if wait:
+            rate_limit_waits.inc({'name': self.name})
+            rate_limit_wait_seconds.observe({'name': self.name}, wait / 1000)
+            await asyncio.sleep(wait / 1000)
@@ -0,0 +1,153 @@
+"""Warm caches and connections at application startup."""
+import time
+import asyncio
+from typing import Awaitable, Optional
+from redis.asyncio import Redis
+from sqlalchemy import text
+
+from app.cache.tiered import TieredCache
+from app.db.database import engine, AsyncSessionLocal
+from app.schemas.product import ProductResponse
+from app.repositories.product_repository import ProductRepository
+from app.repositories.token_repository import TokenRepository
+from app.services.token_service import TokenService
+from app.http_client import http_clients
+from app.services.catalog_service import CatalogService, product_key
+from app.services.catalog_service import PRODUCTS_KEY, TO_DISPLAY_KEY, CITIES_KEY
+from app.services.catalog_service import PRODUCTS_TTL, CITIES_TTL, STALE_TTL
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger()
+
+
+async def warm_db_pool(connections: int) -> None:
+    """
+    Open pool connections up front.
+
+    The connections are held at the same time, so the pool really creates
+    that many, and are then returned to it.
+
+    Args:
+        connections (int): Number of connections to open.
+    """
+    async def open_connection():
+        connection = await engine.connect()
+        await connection.execute(text('SELECT 1'))
+        return connection
+
+    results = await asyncio.gather(
+        *(open_connection() for _ in range(connections)),
+        return_exceptions=True
+    )
+    for result in results:
+        if not isinstance(result, BaseException):
+            await result.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def warm_catalog(redis: Redis, ready: Optional[asyncio.Event] = None) -> None:
+    """
+    Populate the catalog cache keys that are missing.
+
+    Args:
+        redis (Redis): Redis client.
+        ready (Optional[asyncio.Event]): Awaited first, so a full catalog
+            eviction by the change listener can not undo the warm-up.
+    """
+    if ready is not None:
+        await ready.wait()
+
+    cache = TieredCache(redis)
+    await asyncio.gather(
+        cache.get_or_build(
+            PRODUCTS_KEY,
+            lambda session: CatalogService(session).published_products(),
+            ttl=PRODUCTS_TTL,
+            stale_ttl=STALE_TTL
+        ),
+        cache.get_or_build(
+            TO_DISPLAY_KEY,
+            lambda session: CatalogService(session).products_to_display(),
+            ttl=PRODUCTS_TTL,
+            stale_ttl=STALE_TTL
+        ),
+        cache.get_or_build(
+            CITIES_KEY,
+            lambda session: CatalogService(session).cities(),
+            ttl=CITIES_TTL,
+            stale_ttl=STALE_TTL
+        ),
+    )
+
+    async with AsyncSessionLocal() as session:
+        products = await ProductRepository(session).get_all_published()
+
+    keys = {product_key(product.id): product for product in products}
+    cached = await cache.get_many(list(keys))
+    await cache.set_many(
+        {
+            key: ProductResponse.model_validate(product).model_dump()
+            for (key, product), payload in zip(keys.items(), cached)
+            if payload is None
+        },
+        ex=PRODUCTS_TTL
+    )
+
+
+async def warm_cdek_token(redis: Redis) -> None:
+    """
+    Make sure a valid CDEK token is cached.
+
+    Args:
+        redis (Redis): Redis client.
+    """
+    await TokenService(TokenRepository(redis), http_clients.cdek).get_valid_token()
+
+
+async def warm_up(redis: Redis, catalog_ready: Optional[asyncio.Event] = None) -> None:
+    """
+    Run all warm-up steps concurrently, bounded by `settings.warmup_timeout`.
+
+    A failing or slow step is logged and never blocks startup past the
+    deadline.
+
+    Args:
+        redis (Redis): Redis client.
+        catalog_ready (Optional[asyncio.Event]): Set by the catalog change
+            listener once it is listening.
+    """
+    steps = {
+        'db_pool': warm_db_pool(settings.warmup_db_connections),
+        'catalog': warm_catalog(redis, catalog_ready),
+        'cdek_token': warm_cdek_token(redis),
+    }
+
+    start = time.perf_counter()
+    tasks = {
+        asyncio.create_task(_timed(name, step)): name
+        for name, step in steps.items()
+    }
+    _, pending = await asyncio.wait(tasks, timeout=settings.warmup_timeout)
+
+    for task in pending:
+        task.cancel()
+        logger.warning(
+            'Warm-up: %s did not finish within %ss', tasks[task], settings.warmup_timeout
+        )
+
+    logger.info('Warm-up finished in %.3fs', time.perf_counter() - start)
+
+
+async def _timed(name: str, step: Awaitable) -> None:
+    """Run a warm-up step and log how long it took."""
+    start = time.perf_counter()
+    try:
+        await step
+        logger.info('Warm-up: %s done in %.3fs', name, time.perf_counter() - start)
+    except Exception as exc:  # pylint: disable=W0718
+        logger.error(
+            'Warm-up: %s failed after %.3fs: %s', name, time.perf_counter() - start, exc
+        )
@@ -0,0 +1,97 @@
+"""
+Benchmark the cache-hit path of a catalog route.
+
+Compares the old path (json.loads of the cached value, then FastAPI
+validating and serializing it against List[ProductResponse]) with
+returning the cached orjson bytes as a raw response.
+
+Run from the repository root:
+    python -m benchmarks.bench_cached_response
+"""
+import json
+import time
+import asyncio
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+from app.cache.response import dumps, json_response, make_payload
+from app.schemas.product import ProductResponse
+
+PRODUCTS = 300
+REQUESTS = 2000
+
+
+def make_catalog(size: int) -> list[dict]:
+    """Build a catalog of `size` products."""
+    return [
+        ProductResponse(
+            id=i,
+            name=f'Product {i}',
+            product_id=f'product-{i}',
+            product_type='block',
+            description='Description ' * 20,
+            image=f'https://cdn.leeblock.ru/{i}.png',
+            images=','.join(f'https://cdn.leeblock.ru/{i}-{j}.png' for j in range(5)),
+            catalog_img=f'https://cdn.leeblock.ru/{i}-catalog.png',
+            catalog_hover_img=f'https://cdn.leeblock.ru/{i}-hover.png',
+            price=1000 + i,
+            supply=10,
+            sequence=i,
+            published=1,
+            color='black',
+            weight=500,
+            height=10,
+            length=20,
+            width=15,
+        ).model_dump()
+        for i in range(size)
+    ]
+
+
+def make_app(catalog: list[dict]) -> FastAPI:
+    """Build an app serving the same catalog both ways."""
+    app = FastAPI()
+    legacy_value = json.dumps(catalog)
+    payload = make_payload(dumps(catalog))
+
+    @app.get('/legacy', response_model=List[ProductResponse])
+    async def legacy():
+        return json.loads(legacy_value)
+
+    @app.get('/raw', response_model=List[ProductResponse])
+    async def raw():
+        return json_response(payload)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str) -> float:
+    """Return mean seconds per request."""
+    for _ in range(50):
+        await client.get(path)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = await client.get(path)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    return elapsed / REQUESTS
+
+
+async def main():
+    """Run the benchmark."""
+    app = make_app(make_catalog(PRODUCTS))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        legacy = await measure(client, '/legacy')
+        raw = await measure(client, '/raw')
+
+    print(f'{PRODUCTS} products, {REQUESTS} requests')
+    print(f'json.loads + response_model: {legacy * 1000:.3f} ms/request')
+    print(f'pre-serialized bytes:        {raw * 1000:.3f} ms/request')
+    print(f'saving:                      {(legacy - raw) * 1000:.3f} ms/request ({legacy / raw:.1f}x)')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,159 @@
+"""
+Benchmark the CDEK calls behind /delivery/calculate against a local stub.
+
+Compares a fresh httpx.AsyncClient per quote (the old behaviour, paying
+connection setup every time) with the shared keep-alive client the app
+now creates in its lifespan. The stub runs on 127.0.0.1 over plain HTTP,
+so only TCP setup is saved here; against the real API the TLS handshake
+makes the difference larger.
+
+Run from the repository root:
+    python -m benchmarks.bench_http_clients
+"""
+import time
+import socket
+import asyncio
+from typing import Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.http_client import make_client
+from app.schemas.delivery import DeliveryIn
+from app.services.cdek_service import CDEKService
+from app.services.token_service import TokenService
+
+REQUESTS = 500
+
+
+def make_stub() -> FastAPI:
+    """Build a stub of the CDEK endpoints used by the calculator."""
+    stub = FastAPI()
+
+    @stub.post('/v2/oauth/token')
+    async def token():
+        return {'access_token': 'token', 'expires_in': 3600}
+
+    @stub.post('/v2/calculator/tarifflist')
+    async def tariff_list():
+        return {'tariff_codes': [
+            {'tariff_code': code, 'delivery_sum': 350, 'period_min': 2, 'period_max': 4}
+            for code in (136, 137, 483, 482, 368)
+        ]}
+
+    return stub
+
+
+class MemoryTokenRepository:
+    """Keeps the token and its refresh lock in memory, so Redis is not needed."""
+
+    def __init__(self):
+        self.token = None
+        self.lock_owner = None
+
+    async def get_token(self):
+        return self.token
+
+    async def save_token(self, token_data: dict, ex: Optional[int] = None) -> None:
+        self.token = token_data
+
+    async def acquire_refresh_lock(self, owner: str, timeout: int) -> bool:
+        if self.lock_owner is not None:
+            return False
+        self.lock_owner = owner
+        return True
+
+    async def release_refresh_lock(self, owner: str) -> None:
+        if self.lock_owner == owner:
+            self.lock_owner = None
+
+
+class NoLimit:
+    """Rate limiter that never waits, so Redis is not needed."""
+
+    async def acquire(self, max_wait=None) -> None:
+        return None
+
+
+def free_port() -> int:
+    """Find a free local port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def measure(get_client, delivery: DeliveryIn) -> float:
+    """Return mean seconds per quote."""
+    tokens = MemoryTokenRepository()
+
+    async def quote():
+        async with get_client() as client:
+            service = CDEKService(TokenService(tokens, client, limiter=NoLimit()), client)
+            assert await service.get_calculation_by_type(delivery)
+
+    for _ in range(20):
+        await quote()
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await quote()
+    return (time.perf_counter() - start) / REQUESTS
+
+
+class Shared:
+    """Hands out one client without closing it per quote."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self.client
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+async def main():
+    """Run the benchmark."""
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(make_stub(), port=port, log_level='warning'))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    settings.cdek_endpoint = f'http://127.0.0.1:{port}'
+    delivery = DeliveryIn(
+        city_name='Москва',
+        city_code=44,
+        address='ул. Тверская, 1',
+        city_zip='125009',
+        packages=[{'weight': 500, 'height': 10, 'length': 20, 'width': 15}]
+    )
+
+    try:
+        per_call = await measure(httpx.AsyncClient, delivery)
+        client = make_client(
+            'cdek',
+            max_connections=settings.cdek_max_connections,
+            max_keepalive_connections=settings.cdek_max_keepalive_connections,
+            timeout=settings.cdek_timeout,
+            connect_timeout=settings.cdek_connect_timeout
+        )
+        async with client:
+            shared = await measure(Shared(client), delivery)
+    finally:
+        server.should_exit = True
+        await serving
+
+    print(f'{REQUESTS} quotes')
+    print(f'client per quote: {per_call * 1000:.3f} ms/quote')
+    print(f'shared client:    {shared * 1000:.3f} ms/quote')
+    print(f'saving:           {(per_call - shared) * 1000:.3f} ms/quote ({per_call / shared:.2f}x)')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
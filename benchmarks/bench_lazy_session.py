@@ -0,0 +1,83 @@
+"""
+Benchmark the cache-hit path with an eager and a lazy database session.
+
+The eager dependency mirrors the old `get_factory`, which depended on
+`get_db` and so opened and closed an AsyncSession on every request. The
+lazy one is the current `get_factory`. Both routes return the same
+pre-serialized payload and never touch SQL, as on a cache hit. No
+database is needed: an unused AsyncSession never connects.
+
+Run from the repository root:
+    python -m benchmarks.bench_lazy_session
+"""
+import time
+import asyncio
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.response import dumps, json_response, make_payload
+from app.db.database import get_db
+from app.dependencies.factory import DependencyFactory
+
+REQUESTS = 5000
+
+
+async def get_eager_factory(db: AsyncSession = Depends(get_db)) -> DependencyFactory:
+    """Old behaviour: a session for every request."""
+    return DependencyFactory(cache=None, db=db)
+
+
+async def get_lazy_factory():
+    """New behaviour: a session only on first access."""
+    factory = DependencyFactory(cache=None)
+    try:
+        yield factory
+    finally:
+        await factory.close()
+
+
+def make_app() -> FastAPI:
+    """Build an app serving a cache hit through both factories."""
+    app = FastAPI()
+    payload = make_payload(dumps([{'id': i, 'name': f'Product {i}'} for i in range(20)]))
+
+    @app.get('/eager')
+    async def eager(factory: DependencyFactory = Depends(get_eager_factory)):
+        return json_response(payload)
+
+    @app.get('/lazy')
+    async def lazy(factory: DependencyFactory = Depends(get_lazy_factory)):
+        return json_response(payload)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str) -> float:
+    """Return mean seconds per request."""
+    for _ in range(100):
+        await client.get(path)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = await client.get(path)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    return elapsed / REQUESTS
+
+
+async def main():
+    """Run the benchmark."""
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        eager = await measure(client, '/eager')
+        lazy = await measure(client, '/lazy')
+
+    print(f'{REQUESTS} cache-hit requests')
+    print(f'eager session: {eager * 1000:.3f} ms/request')
+    print(f'lazy session:  {lazy * 1000:.3f} ms/request')
+    print(f'saving:        {(eager - lazy) * 1000:.3f} ms/request ({eager / lazy:.2f}x)')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,24 @@
+import pytest
+
+from app.cache.catalog_listener import all_catalog_keys, keys_for_change
+
+
+def test_product_change_evicts_lists_and_rows():
+    assert keys_for_change('products', [1, 2]) == {'products', 'to_display', 'product:1', 'product:2'}
+
+
+def test_city_change_evicts_city_list():
+    assert keys_for_change('cities', [5]) == {'cities_cdek'}
+
+
+def test_truncate_evicts_whole_table():
+    assert keys_for_change('products', None) is None
+
+
+@pytest.mark.asyncio
+async def test_all_catalog_keys_skips_companion_keys(fake_redis):
+    fake_redis.data.update({'product:1': b'{}', 'product:1:etag': b'"x"', 'request:1': b'{}'})
+
+    keys = await all_catalog_keys(fake_redis)
+
+    assert sorted(keys) == ['cities_cdek', 'product:1', 'products', 'to_display']
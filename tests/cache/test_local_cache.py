@@ -0,0 +1,60 @@
+from unittest.mock import patch
+import pytest
+
+from app.cache.local import LocalCache
+
+
+@pytest.fixture
+def cache():
+    local = LocalCache(maxsize=2, ttl=60)
+    local.enabled = True
+    return local
+
+
+def test_get_returns_stored_value(cache):
+    cache.set('products', [{'name': 'Test Product'}])
+
+    assert cache.get('products') == [{'name': 'Test Product'}]
+
+
+def test_disabled_cache_is_bypassed(cache):
+    cache.set('products', [])
+    cache.enabled = False
+
+    assert cache.get('products') is None
+
+
+def test_entries_expire(cache):
+    with patch('app.cache.local.time.monotonic', return_value=0):
+        cache.set('products', [])
+    with patch('app.cache.local.time.monotonic', return_value=61):
+        assert cache.get('products') is None
+
+
+def test_entry_ttl_is_capped_at_the_cache_ttl(cache):
+    with patch('app.cache.local.time.monotonic', return_value=0):
+        cache.set('product:1', None, ttl=10)
+        cache.set('product:2', {}, ttl=600)
+    with patch('app.cache.local.time.monotonic', return_value=11):
+        assert cache.get('product:1') is None
+        assert cache.get('product:2') == {}
+    with patch('app.cache.local.time.monotonic', return_value=61):
+        assert cache.get('product:2') is None
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.set('product:1', {})
+    cache.set('product:2', {})
+    cache.get('product:1')
+    cache.set('product:3', {})
+
+    assert cache.get('product:1') == {}
+    assert cache.get('product:2') is None
+
+
+def test_fill_started_before_invalidation_is_dropped(cache):
+    version = cache.version
+    cache.invalidate('products')
+    cache.set('products', [{'name': 'Stale'}], version)
+
+    assert cache.get('products') is None
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from fastapi import Request
+
+from app.cache.response import etag_matches, json_response, make_payload, not_modified_response
+from app.cache.tiered import TieredCache
+
+
+def make_request(if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b'if-none-match', if_none_match.encode()))
+    return Request({'type': 'http', 'method': 'GET', 'headers': headers})
+
+
+def test_etag_changes_with_content():
+    assert make_payload(b'[1]').etag != make_payload(b'[2]').etag
+
+
+@pytest.mark.parametrize('header', ['"abc"', 'W/"abc"', '"xyz", "abc"', '*'])
+def test_etag_matches(header):
+    assert etag_matches(make_request(header), '"abc"')
+
+
+def test_etag_does_not_match_other_version():
+    assert not etag_matches(make_request('"xyz"'), '"abc"')
+
+
+def test_json_response_carries_cache_headers():
+    payload = make_payload(b'[]')
+
+    response = json_response(payload, 'public, max-age=60')
+
+    assert response.body == b'[]'
+    assert response.headers['etag'] == payload.etag
+    assert response.headers['cache-control'] == 'public, max-age=60'
+
+
+@pytest.mark.asyncio
+async def test_not_modified_reads_only_the_etag(fake_redis):
+    fake_redis.data['products:etag'] = b'"abc"'
+    cache = TieredCache(fake_redis, local=None)
+
+    response = await not_modified_response(make_request('"abc"'), cache, 'products')
+
+    assert response.status_code == 304
+    assert response.headers['etag'] == '"abc"'
+
+
+@pytest.mark.asyncio
+async def test_not_modified_without_header(fake_redis):
+    cache = TieredCache(fake_redis, local=None)
+
+    assert await not_modified_response(make_request(), cache, 'products') is None
+
+
+@pytest.mark.asyncio
+async def test_not_modified_refreshes_a_stale_value_in_the_background(fake_redis):
+    fake_redis.data['products'] = b'["stale"]'
+    fake_redis.data['products:etag'] = b'"abc"'
+
+    async def loader(_):
+        return ['fresh']
+
+    cache = TieredCache(fake_redis, local=None, session_factory=None)
+    response = await not_modified_response(
+        make_request('"abc"'), cache, 'products', loader=loader, ttl=60, stale_ttl=60
+    )
+    await asyncio.sleep(0)
+
+    assert response.status_code == 304
+    assert fake_redis.data['products'] == b'["fresh"]'
+    assert fake_redis.data['products:fresh'] == b'1'
@@ -0,0 +1,241 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+
+from redis.exceptions import ConnectionError
+
+from app.cache.local import LocalCache
+from app.cache.tiered import TieredCache
+from app.cache.invalidation import invalidate
+from app.cache.response import make_payload
+from app.utils.circuit_breaker import CircuitBreaker, OPEN
+
+
+@pytest.fixture
+def local():
+    local_cache = LocalCache(maxsize=10, ttl=60)
+    local_cache.enabled = True
+    return local_cache
+
+
+@pytest.mark.asyncio
+async def test_set_stores_encoded_bytes_and_etag(fake_redis, local):
+    cache = TieredCache(fake_redis, local)
+
+    payload = await cache.set('products', [{'name': 'Test Product'}], ex=60)
+
+    assert payload.body == b'[{"name":"Test Product"}]'
+    assert fake_redis.data['products'] == payload.body
+    assert fake_redis.data['products:etag'] == payload.etag.encode()
+    assert local.get('products') == payload
+
+
+@pytest.mark.asyncio
+async def test_local_hit_skips_redis(local):
+    redis = MagicMock()
+    local.set('products', make_payload(b'[]'))
+
+    payload = await TieredCache(redis, local).get('products')
+
+    assert payload.body == b'[]'
+    redis.mget.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_fills_local(fake_redis, local):
+    fake_redis.data['products'] = b'[]'
+
+    payload = await TieredCache(fake_redis, local).get('products')
+
+    assert payload == make_payload(b'[]')
+    assert local.get('products') == payload
+
+
+@pytest.mark.asyncio
+async def test_negative_entry_keeps_its_short_ttl_locally(fake_redis, local):
+    cache = TieredCache(fake_redis, local)
+    with patch('app.cache.local.time.monotonic', return_value=0):
+        await cache.set('product:9', None, ex=10)
+    with patch('app.cache.local.time.monotonic', return_value=11):
+        assert local.get('product:9') is None
+
+
+@pytest.mark.asyncio
+async def test_negative_entry_read_from_redis_is_not_kept_locally(fake_redis, local):
+    fake_redis.data['product:9'] = b'null'
+
+    payload = await TieredCache(fake_redis, local).get('product:9')
+
+    assert payload.is_negative
+    assert local.get('product:9') is None
+
+
+@pytest.mark.asyncio
+async def test_etag_is_read_without_payload(fake_redis):
+    fake_redis.data['products:etag'] = b'"abc"'
+
+    assert await TieredCache(fake_redis, local=None).get_etag('products') == '"abc"'
+
+
+@pytest.mark.asyncio
+async def test_redis_only_mode(fake_redis):
+    fake_redis.data['request_list'] = b'[]'
+
+    payload = await TieredCache(fake_redis, local=None).get('request_list')
+
+    assert payload.body == b'[]'
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_rebuild_once(fake_redis):
+    calls = 0
+
+    async def loader(_):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [{'name': 'Test Product'}]
+
+    caches = [TieredCache(fake_redis, local=None, session_factory=FakeSession) for _ in range(20)]
+    payloads = await asyncio.gather(*(cache.get_or_build('products', loader, ttl=60) for cache in caches))
+
+    assert calls == 1
+    assert {payload.body for payload in payloads} == {b'[{"name":"Test Product"}]'}
+    assert 'lock:products' not in fake_redis.data
+
+
+@pytest.mark.asyncio
+async def test_stale_value_is_served_while_refreshing(fake_redis):
+    fake_redis.data['products'] = b'["stale"]'
+
+    async def loader(_):
+        return ['fresh']
+
+    cache = TieredCache(fake_redis, local=None, session_factory=FakeSession)
+    payload = await cache.get_or_build('products', loader, ttl=60, stale_ttl=60)
+    await asyncio.sleep(0)
+
+    assert payload.body == b'["stale"]'
+    assert fake_redis.data['products'] == b'["fresh"]'
+    assert fake_redis.data['products:fresh'] == b'1'
+
+
+@pytest.mark.asyncio
+async def test_only_rebuilds_of_locally_cached_keys_are_published(fake_redis, local):
+    async def loader(_):
+        return []
+
+    await TieredCache(fake_redis, local, session_factory=FakeSession).get_or_build('products', loader, ttl=60)
+    await TieredCache(fake_redis, local=None, session_factory=None, fallback=None).get_or_build(
+        'quote:abc', loader, ttl=60
+    )
+
+    assert fake_redis.data['quote:abc'] == b'[]'
+    assert fake_redis.published == [('cache:invalidate', '["products"]')]
+
+
+@pytest.mark.asyncio
+async def test_regenerations_are_counted_by_key_family(fake_redis, mocker):
+    counter = mocker.patch('app.cache.tiered.cache_regenerations')
+
+    async def loader(_):
+        return []
+
+    await TieredCache(fake_redis, local=None, session_factory=None).get_or_build('promo:42', loader, ttl=60)
+
+    counter.inc.assert_called_once_with({'key': 'promo'})
+
+
+@pytest.mark.asyncio
+async def test_rebuild_overlapping_an_invalidation_is_not_stored(fake_redis):
+    async def loader(_):
+        # The catalog changes after the rows were read.
+        await invalidate(fake_redis, 'products')
+        return ['old']
+
+    cache = TieredCache(fake_redis, local=None, session_factory=FakeSession)
+    payload = await cache.get_or_build('products', loader, ttl=60)
+
+    assert payload.body == b'["old"]'
+    assert 'products' not in fake_redis.data
+
+
+@pytest.mark.asyncio
+async def test_waits_for_rebuild_in_another_worker(fake_redis):
+    fake_redis.data['lock:products'] = b'other-worker'
+    loader = AsyncMock()
+
+    async def other_worker():
+        await asyncio.sleep(0.1)
+        fake_redis.data['products'] = b'[]'
+
+    cache = TieredCache(fake_redis, local=None, session_factory=FakeSession)
+    payload, _ = await asyncio.gather(cache.get_or_build('products', loader, ttl=60), other_worker())
+
+    assert payload.body == b'[]'
+    loader.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_many_uses_one_mget_for_local_misses(fake_redis, local):
+    local.set('product:1', make_payload(b'{"id":1}'))
+    fake_redis.data['product:2'] = b'{"id":2}'
+
+    payloads = await TieredCache(fake_redis, local).get_many(['product:1', 'product:2', 'product:3'])
+
+    assert [payload and payload.body for payload in payloads] == [b'{"id":1}', b'{"id":2}', None]
+
+
+@pytest.mark.asyncio
+async def test_set_many_backfills_both_tiers(fake_redis, local):
+    payloads = await TieredCache(fake_redis, local).set_many({'product:1': {'id': 1}}, ex=60)
+
+    assert fake_redis.data['product:1'] == b'{"id":1}'
+    assert local.get('product:1') == payloads['product:1']
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker('test-redis', failure_threshold=2, recovery_timeout=60, exceptions=(ConnectionError,))
+
+
+def down_redis():
+    redis = MagicMock()
+    redis.mget = AsyncMock(side_effect=ConnectionError('down'))
+    redis.set = AsyncMock(side_effect=ConnectionError('down'))
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_serves_fallback_then_stops_calling_redis(breaker):
+    fallback = LocalCache(maxsize=10, ttl=60)
+    fallback.enabled = True
+    fallback.set('products', make_payload(b'["cached"]'))
+    redis = down_redis()
+    cache = TieredCache(redis, local=None, fallback=fallback, breaker=breaker)
+
+    for _ in range(3):
+        assert (await cache.get('products')).body == b'["cached"]'
+
+    assert breaker.state == OPEN
+    assert redis.mget.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_builds_from_database(breaker):
+    async def loader(_):
+        return ['fresh']
+
+    cache = TieredCache(down_redis(), local=None, session_factory=FakeSession, fallback=None, breaker=breaker)
+
+    payload = await cache.get_or_build('products', loader, ttl=60)
+
+    assert payload.body == b'["fresh"]'
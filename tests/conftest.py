@@ -0,0 +1,186 @@
+import json
+import asyncio
+import fnmatch
+import httpx
+import pytest
+from app.utils.rate_limiter import TOKEN_BUCKET_SCRIPT
+from app.cache.tiered import WRITE_REBUILT_SCRIPT
+from app.cache.local import local_cache, fallback_cache
+from app.redis_client import redis_breaker
+from app.services.cdek_service import cdek_breaker
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """Give every test closed breakers and empty in-process caches."""
+    for breaker in (redis_breaker, cdek_breaker):
+        breaker.reset()
+    local_cache.clear()
+    local_cache.enabled = False
+    fallback_cache.clear()
+    yield
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio commands used by the cache."""
+
+    def __init__(self):
+        self.data = {}
+        self.lists = {}
+        self.published = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def delete(self, *keys):
+        return sum(
+            (self.data.pop(key, None) or self.lists.pop(key, None)) is not None
+            for key in keys
+        )
+
+    async def scan_iter(self, match='*'):
+        for key in [*self.data, *(key for key, items in self.lists.items() if items)]:
+            if fnmatch.fnmatchcase(key, match):
+                yield key.encode()
+
+    async def lpush(self, key, *values):
+        items = self.lists.setdefault(key, [])
+        for value in values:
+            items.insert(0, value.encode() if isinstance(value, str) else value)
+        return len(items)
+
+    async def rpush(self, key, *values):
+        items = self.lists.setdefault(key, [])
+        items.extend(value.encode() if isinstance(value, str) else value for value in values)
+        return len(items)
+
+    async def rpop(self, key, count=None):
+        items = self.lists.get(key, [])
+        popped = [items.pop() for _ in range(min(count or 1, len(items)))]
+        if count is None:
+            return popped[0] if popped else None
+        return popped or None
+
+    async def lmove(self, source, destination, src='LEFT', dest='RIGHT'):
+        items = self.lists.get(source, [])
+        if not items:
+            return None
+        value = items.pop(0 if src == 'LEFT' else -1)
+        target = self.lists.setdefault(destination, [])
+        if dest == 'LEFT':
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+    async def ltrim(self, key, start, end):
+        items = self.lists.get(key, [])
+        items[:] = items[start:] if end == -1 else items[start:end + 1]
+        return True
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == TOKEN_BUCKET_SCRIPT:
+            # Rate limiter: always grant.
+            return 0
+        if self.data.get(keys[0]) != args[0].encode():
+            return 0
+        if script == WRITE_REBUILT_SCRIPT:
+            lock, key, etag, fresh = keys
+            _, body, etag_value, ex, fresh_ex, channel, message = args
+            await self.set(key, body, ex=ex)
+            await self.set(etag, etag_value, ex=ex)
+            if fresh_ex:
+                await self.set(fresh, 1, ex=fresh_ex)
+            if channel:
+                await self.publish(channel, message)
+            return 1
+        # Lock release.
+        return 1 if self.data.pop(keys[0], None) is not None else 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+class FakeCdek:
+    """
+    Fault-injecting stand-in for the CDEK API, mounted as an httpx transport.
+
+    `mode` selects the behaviour of quote requests: 'ok', 'slow' (answers
+    after `delay` seconds), 'error' (HTTP 500) or 'timeout' (raises
+    httpx.ReadTimeout). Token requests always succeed.
+    """
+
+    def __init__(self):
+        self.mode = 'ok'
+        self.delay = 1.0
+        self.quote_requests = 0
+
+    async def handler(self, request):
+        if request.url.path == '/v2/oauth/token':
+            return httpx.Response(200, json={'access_token': 'token', 'expires_in': 3600})
+
+        self.quote_requests += 1
+        if self.mode == 'slow':
+            await asyncio.sleep(self.delay)
+        elif self.mode == 'error':
+            return httpx.Response(500)
+        elif self.mode == 'timeout':
+            raise httpx.ReadTimeout('timed out', request=request)
+
+        if request.url.path == '/v2/calculator/tarifflist':
+            return httpx.Response(200, json={'tariff_codes': [
+                {'tariff_code': 136, 'tariff_name': 'x', 'delivery_sum': 300},
+            ]})
+        return httpx.Response(200, json={'delivery_sum': 300 + int(json.loads(request.content)['tariff_code'])})
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler), base_url='http://cdek')
+
+
+@pytest.fixture
+def fake_cdek():
+    return FakeCdek()
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.orm import Session
+
+import app.models.user  # noqa: F401  (maps PromoCode for Request.promo_code)
+from app.models.request import Request
+from app.repositories.request_repository import RequestRepository
+
+
+class SyncSession:
+    """Runs the repository's queries on a synchronous SQLite session."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+    async def commit(self):
+        self.session.commit()
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    # A copy without the PostgreSQL-only now() default and the promo code key.
+    table = Request.__table__.to_metadata(MetaData())
+    table.c.created_at.server_default = None
+    table.constraints.difference_update(table.foreign_key_constraints)
+    table.create(engine)
+    with Session(engine) as session:
+        for request_id, status in ((1, 'NEW'), (2, 'CONFIRMED'), (3, 'REJECTED'), (4, 'AUTHORIZED')):
+            session.add(Request(
+                id=request_id, amount=100, bug='[]', city='Moscow', address='x',
+                email='a@b.c', status=status, created_at=datetime.now(timezone.utc)
+            ))
+        session.commit()
+        yield session
+
+
+def statuses(session):
+    return dict(session.query(Request.id, Request.status).order_by(Request.id).all())
+
+
+@pytest.mark.asyncio
+async def test_statuses_only_move_forward(session):
+    updated = await RequestRepository(SyncSession(session)).update_statuses({
+        1: 'AUTHORIZED',
+        2: 'REFUNDED',
+        4: 'CONFIRMED',
+        5: 'CONFIRMED',
+    })
+
+    assert sorted(updated) == [1, 2, 4]
+    assert statuses(session) == {1: 'AUTHORIZED', 2: 'REFUNDED', 3: 'REJECTED', 4: 'CONFIRMED'}
+
+
+@pytest.mark.asyncio
+async def test_older_notification_after_a_final_one_is_ignored(session):
+    updated = await RequestRepository(SyncSession(session)).update_statuses({
+        2: 'AUTHORIZED',
+        3: 'NEW',
+        4: 'FORM_SHOWED',
+    })
+
+    assert updated == []
+    assert statuses(session) == {1: 'NEW', 2: 'CONFIRMED', 3: 'REJECTED', 4: 'AUTHORIZED'}
+
+
+@pytest.mark.asyncio
+async def test_requests_outside_the_given_statuses(session):
+    requests = await RequestRepository(SyncSession(session)).get_excluding_statuses({'CONFIRMED', 'REJECTED'})
+
+    assert sorted(request.id for request in requests) == [1, 4]
+
+
+@pytest.mark.asyncio
+async def test_requests_outside_the_given_statuses_within_a_window(session):
+    now = datetime.now(timezone.utc)
+    session.get(Request, 1).created_at = now - timedelta(days=3)
+    session.commit()
+    repository = RequestRepository(SyncSession(session))
+
+    recent = await repository.get_excluding_statuses({'CONFIRMED'}, created_after=now - timedelta(days=2))
+    oldest = await repository.get_excluding_statuses({'CONFIRMED'}, limit=1)
+
+    assert sorted(request.id for request in recent) == [3, 4]
+    assert [request.id for request in oldest] == [1]
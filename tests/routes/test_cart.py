@@ -0,0 +1,31 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.cache.tiered import TieredCache
+from app.dependencies.factory import DependencyFactory
+from app.dependencies.injection import get_factory
+from app.services.catalog_service import product_key
+
+client = TestClient(app)
+
+
+def test_cart_is_priced_from_the_product_cache(fake_redis):
+    asyncio.run(TieredCache(fake_redis, local=None).set_many(
+        {product_key(1): {'id': 1, 'name': 'Block', 'price': 1000, 'published': 1}}, ex=60
+    ))
+    db = MagicMock()
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(db=db, cache=fake_redis)
+
+    response = client.post('/cart/price', json={'items': [{'product_id': 1, 'quantity': 3}]})
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'items': [{'product_id': 1, 'name': 'Block', 'price': 100000, 'quantity': 3, 'amount': 300000}],
+        'subtotal': 300000,
+        'discount': 0,
+        'total': 300000,
+    }
+    db.execute.assert_not_called()
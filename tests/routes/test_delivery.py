@@ -0,0 +1,42 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.dependencies.factory import DependencyFactory
+from app.dependencies.injection import get_factory
+
+client = TestClient(app)
+
+PACKAGES = [{'weight': 500, 'height': 10, 'length': 20, 'width': 15}]
+
+
+@pytest.fixture
+def cdek_factory(fake_redis, fake_cdek, mocker):
+    mocker.patch('app.services.cdek_service.settings.cdek_endpoint', 'http://cdek')
+    mocker.patch('app.services.token_service._memo', None)
+    mocker.patch('app.services.token_service._refresh', None)
+    http = SimpleNamespace(cdek=fake_cdek.client())
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(cache=fake_redis, http=http)
+    yield
+    app.dependency_overrides.clear()
+
+
+def test_multi_destination_quotes_are_streamed_per_city(cdek_factory, fake_cdek):
+    response = client.post('/delivery/calculate/multi', json={'city_codes': [44, 137, 44], 'packages': PACKAGES})
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line['city_code'] for line in lines) == [44, 137]
+    assert all(line['quotes'][0]['code'] == 136 and not line['stale'] for line in lines)
+    assert fake_cdek.quote_requests == 2
+
+
+def test_multi_destination_reports_unavailable_cities(cdek_factory, fake_cdek):
+    fake_cdek.mode = 'error'
+
+    response = client.post('/delivery/calculate/multi', json={'city_codes': [44], 'packages': PACKAGES})
+
+    assert json.loads(response.text) == {'city_code': 44, 'error': 'unavailable'}
@@ -0,0 +1,157 @@
+import json
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.main import app
+from app.dependencies.factory import DependencyFactory
+from app.dependencies.injection import get_factory
+from app.services.payment_service import PaymentService
+from app.services.payment_notifications import NOTIFICATIONS_KEY
+from app.core.config import settings
+from app.cache.tiered import TieredCache
+from app.services.catalog_service import product_key
+
+client = TestClient(app)
+
+CHECKOUT = {
+    'Amount': 100000,
+    'DATA': {'Phone': '+79990000000', 'Email': 'a@b.c'},
+    'Receipt': {
+        'Email': 'a@b.c',
+        'Phone': '+79990000000',
+        'Taxation': 'osn',
+        'Items': [{'Name': 'Item', 'Price': 100000, 'Quantity': 1, 'Amount': 100000, 'Tax': 'none', 'product_id': 1}],
+    },
+    'city': 'Москва',
+    'zip': '125009',
+    'address': 'ул. Тверская, 1',
+    'first_name': 'Иван',
+    'last_name': 'Иванов',
+    'phone': '+79990000000',
+    'email': 'a@b.c',
+}
+
+
+class StatementRecorder:
+    """AsyncSession stand-in recording every database round-trip."""
+
+    def __init__(self):
+        self.statements = []
+        self.entities = []
+
+    def add(self, entity):
+        self.entities.append(entity)
+
+    async def flush(self):
+        for entity in self.entities:
+            self.statements.append(f'INSERT INTO {entity.__tablename__}')
+            entity.id = 1
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())).replace('\n', ' '))
+        return MagicMock(scalars=lambda: MagicMock(first=lambda: self.entities[0]))
+
+    async def commit(self):
+        self.statements.append('COMMIT')
+
+    async def refresh(self, entity):
+        self.statements.append('SELECT (refresh)')
+
+    async def merge(self, entity):
+        self.statements.append('SELECT (merge)')
+
+
+@pytest.fixture
+def checkout(fake_redis):
+    asyncio.run(TieredCache(fake_redis, local=None).set_many(
+        {product_key(1): {'id': 1, 'name': 'Item', 'price': 1000, 'published': 1}}, ex=60
+    ))
+    session = StatementRecorder()
+    tinkoff = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json={'Success': True, 'PaymentId': '42', 'PaymentURL': 'http://pay'})
+    ))
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(
+        db=session, cache=fake_redis, http=SimpleNamespace(tinkoff=tinkoff)
+    )
+    yield session
+    app.dependency_overrides.clear()
+
+
+def test_checkout_takes_one_insert_one_update_and_one_commit(checkout):
+    response = client.post('/payments/', json=CHECKOUT)
+
+    assert response.status_code == 200
+    assert response.json()['PaymentId'] == '42'
+    insert, update, commit = checkout.statements
+    assert insert == 'INSERT INTO requests'
+    assert update.startswith('UPDATE requests SET payment_id=%(payment_id)s, token=%(token)s WHERE requests.id')
+    assert 'RETURNING' in update
+    assert commit == 'COMMIT'
+
+
+def test_checkout_with_a_tampered_amount_is_rejected_before_any_write(checkout):
+    tampered = {**CHECKOUT, 'Amount': 100}
+
+    response = client.post('/payments/', json=tampered)
+
+    assert response.status_code == 422
+    assert checkout.statements == []
+
+
+def test_checkout_with_an_unpublished_product_is_rejected_before_any_write(checkout, fake_redis):
+    asyncio.run(TieredCache(fake_redis, local=None).set_many(
+        {product_key(1): {'id': 1, 'name': 'Item', 'price': 1000, 'published': 0}}, ex=60
+    ))
+
+    response = client.post('/payments/', json=CHECKOUT)
+
+    assert response.status_code == 422
+    assert 'Unknown products: [1]' in response.json()['detail']
+    assert checkout.statements == []
+
+
+def test_replayed_checkout_does_not_touch_the_database(checkout):
+    headers = {'Idempotency-Key': 'order-1'}
+    client.post('/payments/', json=CHECKOUT, headers=headers)
+
+    response = client.post('/payments/', json=CHECKOUT, headers=headers)
+
+    assert response.headers['Idempotent-Replayed'] == 'true'
+    assert response.json()['PaymentId'] == '42'
+    assert checkout.statements.count('COMMIT') == 1
+
+
+def signed(notification):
+    notification = {'TerminalKey': settings.terminal_key, **notification}
+    notification['Token'] = PaymentService(None).sign(notification)
+    return notification
+
+
+def test_signed_notification_is_queued(fake_redis):
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(db=MagicMock(), cache=fake_redis, http=MagicMock())
+    notification = signed({'OrderId': '7', 'Success': True, 'Status': 'CONFIRMED', 'PaymentId': 42, 'Amount': 100000})
+
+    response = client.post('/payments/notification', json=notification)
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.text == 'OK'
+    assert [json.loads(item) for item in fake_redis.lists[NOTIFICATIONS_KEY]] == [notification]
+
+
+def test_notification_with_a_bad_token_is_rejected(fake_redis):
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(db=MagicMock(), cache=fake_redis, http=MagicMock())
+    notification = signed({'OrderId': '7', 'Success': True, 'Status': 'CONFIRMED', 'PaymentId': 42, 'Amount': 100000})
+    notification['Status'] = 'REFUNDED'
+
+    response = client.post('/payments/notification', json=notification)
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 403
+    assert NOTIFICATIONS_KEY not in fake_redis.lists
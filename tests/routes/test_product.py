@@ -3,6 +3,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, MagicMock
 from app.main import app  # Adjust import path to your app
 from app.dependencies.factory import DependencyFactory
+from app.dependencies.injection import get_factory
 
 client = TestClient(app)
 
@@ -92,3 +93,59 @@ async def test_cache(mock_factory, mocker):
     assert response.status_code == 200
     assert len(response.json()) == 1
     assert response.json()[0]['name'] == "Cached Product"
+
+
+# Test: GET /products/batch
+def test_get_products_batch(fake_redis, mocker):
+    fake_redis.data['product:1'] = b'{"name":"Cached Product"}'
+    product = MagicMock(id=2)
+    get_by_ids = mocker.patch(
+        "app.routes.product.ProductRepository.get_by_ids",
+        AsyncMock(return_value=[product])
+    )
+    mocker.patch(
+        "app.routes.product.ProductResponse.model_validate",
+        return_value=MagicMock(model_dump=lambda: {"name": "Fresh Product"})
+    )
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(db=MagicMock(), cache=fake_redis)
+
+    try:
+        response = client.get("/products/batch?ids=2,1,3")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == [{"name": "Fresh Product"}, {"name": "Cached Product"}, None]
+    get_by_ids.assert_awaited_once_with([2, 3])
+    assert fake_redis.data['product:2'] == b'{"name":"Fresh Product"}'
+    assert fake_redis.data['product:3'] == b'null'
+
+
+# Test: unknown ids are served from the negative cache
+def test_get_product_by_id_negative_cache(fake_redis, mocker):
+    get_by_id = mocker.patch(
+        "app.routes.product.ProductRepository.get_by_id",
+        AsyncMock(return_value=None)
+    )
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(db=MagicMock(), cache=fake_redis)
+
+    try:
+        first = client.get("/products/404")
+        second = client.get("/products/404")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.json() is None
+    assert second.json() is None
+    get_by_id.assert_awaited_once_with(404)
+
+
+def test_get_products_batch_rejects_malformed_ids(fake_redis):
+    app.dependency_overrides[get_factory] = lambda: DependencyFactory(db=MagicMock(), cache=fake_redis)
+
+    try:
+        response = client.get("/products/batch?ids=1,abc")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 422
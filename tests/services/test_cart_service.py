@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.cache.tiered import TieredCache
+from app.schemas.delivery import CartItem
+from app.services import cart_service
+from app.services.cart_service import CartService, UnknownProducts
+from app.services.catalog_service import product_key
+
+
+def product(product_id, weight=400, height=2, length=30, width=20, published=1):
+    return SimpleNamespace(
+        id=product_id, name='Block', product_id=f'block-{product_id}', product_type=None,
+        description='-', image=None, images=None, catalog_img=None, catalog_hover_img=None,
+        price=1000, supply=1, waiting=0, sequence=1, published=published, display_on_main=0, color=None,
+        weight=weight, height=height, length=length, width=width
+    )
+
+
+@pytest.fixture
+def repository(mocker):
+    repo = MagicMock(get_by_ids=AsyncMock(return_value=[product(2)]))
+    mocker.patch.object(cart_service, 'ProductRepository', return_value=repo)
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_cart_is_packed_from_cached_and_loaded_products(fake_redis, repository):
+    cache = TieredCache(fake_redis, local=None, fallback=None)
+    await cache.set(product_key(1), {'weight': 400, 'height': 2, 'length': 30, 'width': 20, 'published': 1}, ex=60)
+    service = CartService(cache, MagicMock)
+
+    packages = await service.packages([CartItem(product_id=1, quantity=2), CartItem(product_id=2, quantity=1)])
+
+    repository.get_by_ids.assert_awaited_once_with([2])
+    assert product_key(2) in fake_redis.data
+    assert [package.model_dump() for package in packages] == [{'weight': 1200, 'height': 6, 'length': 30, 'width': 20}]
+
+
+@pytest.mark.asyncio
+async def test_unknown_products_are_rejected(fake_redis, repository):
+    service = CartService(TieredCache(fake_redis, local=None, fallback=None), MagicMock)
+
+    with pytest.raises(UnknownProducts) as error:
+        await service.packages([CartItem(product_id=2, quantity=1), CartItem(product_id=3, quantity=1)])
+
+    assert error.value.product_ids == [3]
+
+
+@pytest.mark.asyncio
+async def test_unpublished_products_are_rejected_cached_or_not(fake_redis, repository):
+    repository.get_by_ids.return_value = [product(2, published=0)]
+    cache = TieredCache(fake_redis, local=None, fallback=None)
+    await cache.set(product_key(1), {'weight': 400, 'height': 2, 'length': 30, 'width': 20, 'published': 0}, ex=60)
+    service = CartService(cache, MagicMock)
+
+    with pytest.raises(UnknownProducts) as error:
+        await service.packages([CartItem(product_id=1, quantity=1), CartItem(product_id=2, quantity=1)])
+
+    assert error.value.product_ids == [1, 2]
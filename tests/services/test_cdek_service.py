@@ -1,5 +1,9 @@
-from unittest.mock import MagicMock, patch
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+import httpx
 import pytest
+from app.schemas.delivery import DeliveryIn
+from app.services.cdek_service import CDEKService
 from app.services.email_service import EmailService
 
 
@@ -26,3 +30,54 @@ def test_send_email_success():
         # mock_smtp_instance.sendmail.assert_called_once()
         # mock_smtp_instance.login.assert_called_once()
         # mock_smtp_instance.starttls.assert_called_once()
+
+
+def make_cdek_service(handler):
+    token_service = MagicMock(get_valid_token=AsyncMock(return_value='token'))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return CDEKService(token_service, client, limiter=MagicMock(acquire=AsyncMock()))
+
+
+DELIVERY = DeliveryIn(
+    city_name='Москва',
+    city_code=44,
+    address='ул. Тверская, 1',
+    city_zip='125009',
+    packages=[{'weight': 500, 'height': 10, 'length': 20, 'width': 15}]
+)
+
+
+@pytest.mark.asyncio
+async def test_tariffs_are_quoted_with_one_tarifflist_call():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={'tariff_codes': [
+            {'tariff_code': 137, 'tariff_name': 'x', 'delivery_mode': 2, 'delivery_sum': 400, 'period_min': 2},
+            {'tariff_code': 1, 'tariff_name': 'y', 'delivery_mode': 1, 'delivery_sum': 900, 'period_min': 1},
+            {'tariff_code': 136, 'tariff_name': 'z', 'delivery_mode': 4, 'delivery_sum': 300, 'period_min': 3},
+        ]})
+
+    quotes = await make_cdek_service(handler).get_calculation_by_type(DELIVERY)
+
+    assert [request.url.path for request in requests] == ['/v2/calculator/tarifflist']
+    assert quotes == [
+        {'name': 'Посылка склад-склад', 'code': 136, 'data': {'delivery_sum': 300, 'period_min': 3, 'total_sum': 300}},
+        {'name': 'Посылка склад-дверь', 'code': 137, 'data': {'delivery_sum': 400, 'period_min': 2, 'total_sum': 400}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_per_tariff_calls():
+    def handler(request):
+        if request.url.path.endswith('tarifflist'):
+            return httpx.Response(502)
+        tariff_code = json.loads(request.content)['tariff_code']
+        if tariff_code == '136':
+            return httpx.Response(200, json={'delivery_sum': 300})
+        return httpx.Response(400, json={'errors': []})
+
+    quotes = await make_cdek_service(handler).get_calculation_by_type(DELIVERY)
+
+    assert quotes == [{'name': 'Посылка склад-склад', 'code': 136, 'data': {'delivery_sum': 300}}]
@@ -0,0 +1,87 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.services.idempotency_service import IdempotencyService, IdempotencyConflict, IdempotencyInProgress
+
+
+def make_service(fake_redis):
+    return IdempotencyService(IdempotencyRepository(fake_redis, 'payments'))
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_stored_response_without_running(fake_redis):
+    service = make_service(fake_redis)
+    func = AsyncMock(return_value={'PaymentId': 1})
+
+    first = await service.run('key', 'body', func)
+    second = await service.run('key', 'body', func)
+
+    assert first.response == second.response == {'PaymentId': 1}
+    assert not first.replayed and second.replayed
+    func.assert_awaited_once()
+    assert 'lock:idempotency:payments:key' not in fake_redis.data
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_body_is_rejected(fake_redis):
+    service = make_service(fake_redis)
+    await service.run('key', 'body', AsyncMock(return_value={}))
+
+    with pytest.raises(IdempotencyConflict):
+        await service.run('key', 'other body', AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_the_first_request(fake_redis, mocker):
+    mocker.patch('app.services.idempotency_service.POLL_INTERVAL', 0.01)
+    service = make_service(fake_redis)
+    calls = 0
+
+    async def init():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {'PaymentId': calls}
+
+    outcomes = await asyncio.gather(*(service.run('key', 'body', init) for _ in range(5)))
+
+    assert calls == 1
+    assert [outcome.response for outcome in outcomes] == [{'PaymentId': 1}] * 5
+    assert sum(not outcome.replayed for outcome in outcomes) == 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_gives_up_while_first_request_runs(fake_redis, mocker):
+    mocker.patch('app.services.idempotency_service.settings.idempotency_wait', 0.05)
+    mocker.patch('app.services.idempotency_service.POLL_INTERVAL', 0.01)
+    service = make_service(fake_redis)
+    await IdempotencyRepository(fake_redis, 'payments').claim('key', 'other', 60)
+
+    with pytest.raises(IdempotencyInProgress):
+        await service.run('key', 'body', AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_failed_request_can_be_retried_with_the_same_key(fake_redis):
+    service = make_service(fake_redis)
+
+    with pytest.raises(RuntimeError):
+        await service.run('key', 'body', AsyncMock(side_effect=RuntimeError('tinkoff')))
+    outcome = await service.run('key', 'body', AsyncMock(return_value={'PaymentId': 2}))
+
+    assert outcome == ({'PaymentId': 2}, False)
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_runs_unprotected():
+    redis = MagicMock(get=AsyncMock(side_effect=RedisConnectionError('down')))
+    func = AsyncMock(return_value={'PaymentId': 3})
+
+    outcome = await IdempotencyService(IdempotencyRepository(redis, 'payments')).run('key', 'body', func)
+
+    assert outcome.response == {'PaymentId': 3}
+    func.assert_awaited_once()
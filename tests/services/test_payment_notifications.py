@@ -0,0 +1,92 @@
+import json
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.payment_notifications import (
+    NOTIFICATIONS_KEY, PROCESSING_KEY, WORKER_KEY, process_notifications, recover_notifications
+)
+
+PROCESSING = f'{PROCESSING_KEY}:worker-1'
+
+
+@pytest.fixture
+def update_statuses(mocker):
+    mocker.patch('app.services.payment_notifications.AsyncSessionLocal', MagicMock())
+    update = AsyncMock(side_effect=lambda statuses: [order_id for order_id in statuses if order_id != 9])
+    mocker.patch('app.services.payment_notifications.RequestRepository', return_value=MagicMock(update_statuses=update))
+    return update
+
+
+async def queue(fake_redis, *notifications):
+    await fake_redis.lpush(NOTIFICATIONS_KEY, *(json.dumps(notification) for notification in notifications))
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_the_furthest_status_of_each_order(fake_redis, update_statuses):
+    fake_redis.data['request:7'] = b'{}'
+    fake_redis.data['request_list'] = b'[]'
+    await queue(
+        fake_redis,
+        {'OrderId': '7', 'Status': 'CONFIRMED'},
+        {'OrderId': '8', 'Status': 'REJECTED'},
+        {'OrderId': '7', 'Status': 'AUTHORIZED'},
+        {'OrderId': '10', 'Status': '3DS_CHECKING'},
+        {'OrderId': '10', 'Status': '3DS_CHECKED'},
+        {'OrderId': '9', 'Status': 'CONFIRMED'},
+    )
+
+    assert await process_notifications(fake_redis, PROCESSING, batch_size=10) == 6
+
+    update_statuses.assert_awaited_once_with({7: 'CONFIRMED', 8: 'REJECTED', 10: '3DS_CHECKED', 9: 'CONFIRMED'})
+    assert 'request:7' not in fake_redis.data and 'request_list' not in fake_redis.data
+    assert fake_redis.lists[NOTIFICATIONS_KEY] == []
+    assert fake_redis.lists[PROCESSING] == []
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_put_back_in_order(fake_redis, update_statuses):
+    update_statuses.side_effect = RuntimeError('db down')
+    await queue(fake_redis, {'OrderId': '1', 'Status': 'AUTHORIZED'}, {'OrderId': '1', 'Status': 'CONFIRMED'})
+    before = list(fake_redis.lists[NOTIFICATIONS_KEY])
+
+    with pytest.raises(RuntimeError):
+        await process_notifications(fake_redis, PROCESSING, batch_size=10)
+
+    assert fake_redis.lists[NOTIFICATIONS_KEY] == before
+    assert fake_redis.lists[PROCESSING] == []
+
+
+@pytest.mark.asyncio
+async def test_batch_stays_in_the_processing_list_until_committed(fake_redis, update_statuses):
+    await queue(fake_redis, {'OrderId': '1', 'Status': 'AUTHORIZED'}, {'OrderId': '2', 'Status': 'CONFIRMED'})
+    before = list(fake_redis.lists[NOTIFICATIONS_KEY])
+
+    async def crash(statuses):
+        assert len(fake_redis.lists[PROCESSING]) == 2
+        raise asyncio.CancelledError()
+
+    update_statuses.side_effect = crash
+    with pytest.raises(asyncio.CancelledError):
+        await process_notifications(fake_redis, PROCESSING, batch_size=10)
+    assert fake_redis.lists[NOTIFICATIONS_KEY] == []
+
+    assert await recover_notifications(fake_redis) == 2
+    assert fake_redis.lists[NOTIFICATIONS_KEY] == before
+    assert fake_redis.lists[PROCESSING] == []
+
+
+@pytest.mark.asyncio
+async def test_processing_list_of_a_live_worker_is_left_alone(fake_redis):
+    fake_redis.data[f'{WORKER_KEY}:worker-1'] = b'1'
+    await fake_redis.lpush(PROCESSING, json.dumps({'OrderId': '1', 'Status': 'CONFIRMED'}))
+
+    assert await recover_notifications(fake_redis) == 0
+    assert len(fake_redis.lists[PROCESSING]) == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_queue_does_not_touch_the_database(fake_redis, update_statuses):
+    assert await process_notifications(fake_redis, PROCESSING, batch_size=10) == 0
+    update_statuses.assert_not_awaited()
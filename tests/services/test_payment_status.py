@@ -0,0 +1,136 @@
+import json
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from app.cache.tiered import TieredCache
+from app.services.payment_service import PaymentService
+from app.repositories.request_repository import FINAL_STATUSES
+from app.services.payment_status_service import PaymentStatusService
+from app.services.payment_reconciliation import reconcile_payments
+
+
+def tinkoff_client(states, delay=0.0):
+    """Tinkoff stand-in answering GetState from `states` by PaymentId."""
+    running = {'now': 0, 'max': 0}
+
+    async def handler(request):
+        running['now'] += 1
+        running['max'] = max(running['max'], running['now'])
+        await asyncio.sleep(delay)
+        running['now'] -= 1
+        payment_id = json.loads(request.content)['PaymentId']
+        return httpx.Response(200, json={'Success': True, 'PaymentId': payment_id, 'Status': states[payment_id]})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), running
+
+
+@pytest.fixture
+def repository(mocker):
+    repo = MagicMock(update_statuses=AsyncMock(side_effect=lambda statuses: list(statuses)))
+    mocker.patch('app.services.payment_status_service.RequestRepository', return_value=repo)
+    mocker.patch('app.services.payment_reconciliation.RequestRepository', return_value=repo)
+    mocker.patch('app.services.payment_reconciliation.AsyncSessionLocal', MagicMock())
+    return repo
+
+
+def order(order_id, status='NEW', payment_id='p1'):
+    return SimpleNamespace(id=order_id, status=status, payment_id=payment_id)
+
+
+@pytest.mark.asyncio
+async def test_pending_order_is_checked_with_tinkoff_and_saved(fake_redis, repository):
+    fake_redis.data['request:7'] = b'{}'
+    repository.get_by_id = AsyncMock(return_value=order(7))
+    client, _ = tinkoff_client({'p1': 'CONFIRMED'})
+    service = PaymentStatusService(PaymentService(client), TieredCache(fake_redis, local=None, fallback=None))
+
+    assert await service.check(None, 7, 'p1') == {'order_id': 7, 'payment_id': 'p1', 'status': 'CONFIRMED'}
+
+    repository.update_statuses.assert_awaited_once_with({7: 'CONFIRMED'})
+    assert 'request:7' not in fake_redis.data
+
+
+@pytest.mark.asyncio
+async def test_status_saved_meanwhile_by_a_notification_wins(repository):
+    request = order(7)
+    repository.get_by_id = AsyncMock(return_value=request)
+    repository.update_statuses = AsyncMock(return_value=[])
+    session = MagicMock(refresh=AsyncMock(side_effect=lambda request, attrs: setattr(request, 'status', 'CONFIRMED')))
+    client, _ = tinkoff_client({'p1': 'AUTHORIZED'})
+    service = PaymentStatusService(PaymentService(client), MagicMock())
+
+    assert (await service.check(session, 7, 'p1'))['status'] == 'CONFIRMED'
+    session.refresh.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_other_callers_get_not_found_without_a_tinkoff_call(fake_redis, repository):
+    repository.get_by_id = AsyncMock(return_value=order(7))
+    payment_service = MagicMock(get_state=AsyncMock())
+    cache = TieredCache(fake_redis, local=None, fallback=None, session_factory=None)
+
+    payload = await PaymentStatusService(payment_service, cache).get_status(7, 'someone-else')
+
+    assert payload.is_negative
+    payment_service.get_state.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('final', ['CONFIRMED', 'AUTH_FAIL'])
+async def test_final_status_needs_no_tinkoff_call(repository, final):
+    repository.get_by_id = AsyncMock(return_value=order(7, status=final))
+    payment_service = MagicMock(get_state=AsyncMock())
+    service = PaymentStatusService(payment_service, MagicMock())
+
+    assert await service.check(None, 7, 'p1') == {'order_id': 7, 'payment_id': 'p1', 'status': final}
+    payment_service.get_state.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_status_is_served_from_cache(fake_redis, repository):
+    repository.get_by_id = AsyncMock(return_value=order(7))
+    client, _ = tinkoff_client({'p1': 'AUTHORIZED'})
+    cache = TieredCache(fake_redis, local=None, fallback=None, session_factory=None)
+    service = PaymentStatusService(PaymentService(client), cache)
+
+    first = await service.get_status(7, 'p1')
+    second = await service.get_status(7, 'p1')
+
+    assert json.loads(second.body) == json.loads(first.body) == {'order_id': 7, 'payment_id': 'p1', 'status': 'AUTHORIZED'}
+    repository.get_by_id.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_missing_order_gives_a_negative_payload(fake_redis, repository):
+    repository.get_by_id = AsyncMock(return_value=None)
+    cache = TieredCache(fake_redis, local=None, fallback=None, session_factory=None)
+
+    payload = await PaymentStatusService(MagicMock(), cache).get_status(7, 'p1')
+
+    assert payload.is_negative
+
+
+@pytest.mark.asyncio
+async def test_reconciliation_checks_stale_orders_with_bounded_concurrency(fake_redis, repository, mocker):
+    mocker.patch('app.services.payment_reconciliation.settings.payment_reconcile_concurrency', 2)
+    repository.get_excluding_statuses = AsyncMock(return_value=[
+        order(1, payment_id='p1'), order(2, payment_id='p2'), order(3, payment_id='p3'),
+        order(4, status='AUTHORIZED', payment_id='p4'), order(5, payment_id=None),
+    ])
+    client, running = tinkoff_client({'p1': 'CONFIRMED', 'p2': 'NEW', 'p3': 'REJECTED', 'p4': 'CONFIRMED'}, delay=0.01)
+
+    report = await reconcile_payments(fake_redis, client)
+
+    assert (report.checked, report.reconciled) == (4, 3)
+    assert running['max'] == 2
+    query = repository.get_excluding_statuses.await_args
+    assert query.args[0] == FINAL_STATUSES
+    assert query.kwargs['created_before'] - query.kwargs['created_after'] == timedelta(hours=48, minutes=-30)
+    assert query.kwargs['limit'] == 200
+    repository.update_statuses.assert_awaited_once_with({1: 'CONFIRMED', 3: 'REJECTED', 4: 'CONFIRMED'})
+    assert await reconcile_payments(fake_redis, client) is None
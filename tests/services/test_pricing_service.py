@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.cache.tiered import TieredCache
+from app.schemas.delivery import CartItem
+from app.schemas.payment import CheckoutIn
+from app.services import pricing_service
+from app.services.pricing_service import PricingService, InvalidPromoCode, PriceMismatch, distribute
+
+
+@pytest.fixture
+def service(fake_redis):
+    cart_service = MagicMock(get_products=AsyncMock(return_value={
+        1: {'id': 1, 'name': 'Block', 'price': 1000},
+        2: {'id': 2, 'name': 'Plate', 'price': 333},
+    }))
+    return PricingService(cart_service, TieredCache(fake_redis, local=None, fallback=None, session_factory=None))
+
+
+@pytest.fixture
+def promo(mocker):
+    promo = SimpleNamespace(discount_type='percentage', discount_value=10, valid_until=datetime.now() + timedelta(days=1))
+    mocker.patch.object(pricing_service, 'PromoCodeRepository', return_value=MagicMock(get_by_id=AsyncMock(return_value=promo)))
+    return promo
+
+
+@pytest.mark.parametrize('amounts, discount', [([100, 200, 300], 0), ([99900, 100000], 19990), ([1, 1, 1], 2), ([33300] * 3, 9990)])
+def test_distributed_discount_adds_up(amounts, discount):
+    discounted = distribute(amounts, discount)
+
+    assert sum(discounted) == sum(amounts) - discount
+    assert all(0 <= after <= before for before, after in zip(amounts, discounted))
+
+
+@pytest.mark.asyncio
+async def test_cart_is_priced_from_cached_products_with_percentage_promo(service, promo):
+    pricing = await service.price([CartItem(product_id=1, quantity=2), CartItem(product_id=2, quantity=3)], promo_code_id=5)
+
+    assert (pricing.subtotal, pricing.discount, pricing.total) == (299900, 29990, 269910)
+    assert [(item.price, item.amount) for item in pricing.items] == [(100000, 180000), (33300, 89910)]
+    assert sum(item.amount for item in pricing.items) == pricing.total
+
+
+@pytest.mark.asyncio
+async def test_promo_is_cached_in_redis_without_an_invalidation(service, promo, fake_redis):
+    await service.get_promo(5)
+
+    assert 'promo:5' in fake_redis.data
+    assert fake_redis.published == []
+
+
+@pytest.mark.asyncio
+async def test_fixed_discount_never_exceeds_the_subtotal(service, promo):
+    promo.discount_type, promo.discount_value = 'fixed_amount', 5000
+
+    pricing = await service.price([CartItem(product_id=2, quantity=1)], promo_code_id=5)
+
+    assert (pricing.discount, pricing.total) == (33300, 0)
+
+
+@pytest.mark.asyncio
+async def test_expired_promo_is_rejected(service, promo):
+    promo.valid_until = datetime.now() - timedelta(days=1)
+
+    with pytest.raises(InvalidPromoCode):
+        await service.price([CartItem(product_id=1, quantity=1)], promo_code_id=5)
+
+
+@pytest.mark.asyncio
+async def test_checkout_with_client_side_prices_is_rejected(service):
+    checkout = CheckoutIn(
+        Amount=1000,
+        DATA={'Phone': '-', 'Email': '-'},
+        Receipt={'Email': '-', 'Phone': '-', 'Taxation': 'osn', 'Items': [
+            {'Name': 'Block', 'Price': 1000, 'Quantity': 1, 'Amount': 1000, 'Tax': 'none', 'product_id': 1},
+        ]},
+        city='-', zip='-', address='-', first_name='-', last_name='-', phone='-', email='-'
+    )
+
+    with pytest.raises(PriceMismatch):
+        await service.verify_checkout(checkout)
+
+    checkout.Amount = checkout.Receipt.Items[0].Price = checkout.Receipt.Items[0].Amount = 100000
+    assert (await service.verify_checkout(checkout)).total == 100000
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import quote_matrix
+from app.services.quote_service import matrix_keys
+
+
+def product(weight, height=10, length=20, width=15):
+    return SimpleNamespace(weight=weight, height=height, length=length, width=width)
+
+
+@pytest.fixture
+def catalog(mocker):
+    mocker.patch.object(quote_matrix, 'CityRepository', return_value=MagicMock(
+        get_by_sequence=AsyncMock(return_value=[SimpleNamespace(code=44, name='Москва'), SimpleNamespace(code=137, name='СПб')])
+    ))
+    mocker.patch.object(quote_matrix, 'ProductRepository', return_value=MagicMock(
+        get_all_published=AsyncMock(return_value=[product(430), product(480), product(900), product(0)])
+    ))
+    mocker.patch.object(quote_matrix, 'AsyncSessionLocal', MagicMock())
+    mocker.patch.object(quote_matrix.settings, 'quote_matrix_qps', 1000)
+
+
+@pytest.mark.asyncio
+async def test_matrix_dedupes_parcels_and_skips_missing_dimensions(catalog):
+    deliveries = await quote_matrix.matrix_deliveries(MagicMock())
+
+    assert [(d.city_code, d.packages[0].weight) for d in deliveries] == [(44, 500), (44, 900), (137, 500), (137, 900)]
+
+
+@pytest.mark.asyncio
+async def test_one_worker_refreshes_each_round(catalog, mocker, fake_redis):
+    refresh = mocker.patch.object(quote_matrix.QuoteService, 'refresh_quotes', AsyncMock())
+
+    assert await quote_matrix.refresh_quote_matrix(fake_redis, MagicMock()) == 4
+    assert await quote_matrix.refresh_quote_matrix(fake_redis, MagicMock()) == 0
+
+    assert refresh.await_count == 4
+    assert len(matrix_keys) == 4
@@ -0,0 +1,106 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.cache.tiered import TieredCache
+from app.schemas.delivery import DeliveryIn, Packages
+from app.services.cdek_service import CDEKService
+from app.services.quote_service import QuoteService, QuoteUnavailable, bucket_packages, quote_key
+from app.services.token_service import TokenService
+from app.repositories.token_repository import TokenRepository
+from app.utils.circuit_breaker import CircuitBreaker, OPEN
+
+QUOTES = [{'name': 'Посылка склад-склад', 'code': 136, 'data': {'delivery_sum': 300}}]
+
+
+def delivery(*packages):
+    return DeliveryIn(city_name='Москва', city_code=44, address='-', city_zip='125009', packages=list(packages))
+
+
+def test_equivalent_package_sets_share_a_key():
+    first = [Packages(weight=430, height=10, length=20, width=15), Packages(weight=90, height=1, length=2, width=3)]
+    second = [Packages(weight=100, height=1, length=2, width=3), Packages(weight=500, height=10, length=20, width=15)]
+
+    assert bucket_packages(first) == bucket_packages(second)
+    assert quote_key(44, bucket_packages(first)) == quote_key(44, bucket_packages(second))
+    assert quote_key(44, bucket_packages(first)) != quote_key(137, bucket_packages(first))
+
+
+@pytest.mark.asyncio
+async def test_identical_quotes_call_cdek_once(fake_redis):
+    cdek_service = MagicMock(get_calculation_by_type=AsyncMock(return_value=QUOTES))
+    package = Packages(weight=430, height=10, length=20, width=15)
+
+    payloads = await asyncio.gather(*(
+        QuoteService(cdek_service, TieredCache(fake_redis, local=None, session_factory=None)).get_quotes(delivery(package))
+        for _ in range(5)
+    ))
+
+    cdek_service.get_calculation_by_type.assert_awaited_once()
+    requested = cdek_service.get_calculation_by_type.await_args.args[0]
+    assert requested.packages[0].weight == 500
+    assert {quotes.payload.body for quotes in payloads} == {'[{"name":"Посылка склад-склад","code":136,"data":{"delivery_sum":300}}]'.encode()}
+
+
+@pytest.mark.asyncio
+async def test_empty_quotes_are_not_cached(fake_redis):
+    cdek_service = MagicMock(get_calculation_by_type=AsyncMock(return_value=[]))
+    service = QuoteService(cdek_service, TieredCache(fake_redis, local=None, session_factory=None))
+    package = Packages(weight=430, height=10, length=20, width=15)
+
+    assert (await service.get_quotes(delivery(package))).payload.body == b'[]'
+    await service.get_quotes(delivery(package))
+
+    assert cdek_service.get_calculation_by_type.await_count == 2
+
+
+@pytest.fixture
+def cdek_quotes(mocker, fake_redis, fake_cdek):
+    mocker.patch('app.services.cdek_service.settings.cdek_endpoint', 'http://cdek')
+    mocker.patch('app.services.quote_service.settings.cdek_quote_budget', 0.1)
+    mocker.patch('app.services.token_service._memo', None)
+    mocker.patch('app.services.token_service._refresh', None)
+    client = fake_cdek.client()
+    breaker = CircuitBreaker('test-cdek', failure_threshold=2, recovery_timeout=60)
+    cdek_service = CDEKService(TokenService(TokenRepository(fake_redis), client), client)
+    return QuoteService(cdek_service, TieredCache(fake_redis, local=None, session_factory=None, fallback=None), breaker)
+
+
+PACKAGE = Packages(weight=430, height=10, length=20, width=15)
+
+
+@pytest.mark.asyncio
+async def test_slow_cdek_serves_last_good_quote_as_stale(cdek_quotes, fake_redis, fake_cdek):
+    fresh = await cdek_quotes.get_quotes(delivery(PACKAGE))
+    fake_redis.data.pop(quote_key(44, bucket_packages([PACKAGE])))
+    fake_cdek.mode = 'slow'
+
+    quotes = await cdek_quotes.get_quotes(delivery(PACKAGE))
+
+    assert quotes.stale
+    assert quotes.payload.body == fresh.payload.body
+
+
+@pytest.mark.asyncio
+async def test_failing_cdek_opens_the_breaker(cdek_quotes, fake_cdek):
+    fake_cdek.mode = 'error'
+
+    for _ in range(2):
+        with pytest.raises(QuoteUnavailable):
+            await cdek_quotes.get_quotes(delivery(PACKAGE))
+    requests = fake_cdek.quote_requests
+
+    with pytest.raises(QuoteUnavailable):
+        await cdek_quotes.get_quotes(delivery(PACKAGE))
+
+    assert cdek_quotes.breaker.state == OPEN
+    assert fake_cdek.quote_requests == requests
+
+
+@pytest.mark.asyncio
+async def test_timing_out_cdek_without_last_good_quote(cdek_quotes, fake_cdek):
+    fake_cdek.mode = 'timeout'
+
+    with pytest.raises(QuoteUnavailable):
+        await cdek_quotes.get_quotes(delivery(PACKAGE))
@@ -0,0 +1,59 @@
+import time
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.repositories.token_repository import TokenRepository
+from app.services import token_service
+from app.services.token_service import TokenService
+
+
+@pytest.fixture(autouse=True)
+def reset_memo(mocker):
+    mocker.patch.object(token_service, '_memo', None)
+    mocker.patch.object(token_service, '_refresh', None)
+
+
+def token(access_token, expires_in=3600, age=0):
+    return {'access_token': access_token, 'expires_in': expires_in, 'expires_at': time.time() - age + expires_in}
+
+
+def make_service(fake_redis, fetched):
+    service = TokenService(TokenRepository(fake_redis), client=MagicMock())
+    service._fetch_new_token = AsyncMock(side_effect=fetched)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_fetch_once_and_memoize(fake_redis):
+    service = make_service(fake_redis, [token('new')])
+
+    tokens = await asyncio.gather(*(service.get_valid_token() for _ in range(10)))
+
+    assert tokens == ['new'] * 10
+    service._fetch_new_token.assert_awaited_once()
+    assert 'lock:cdek_token' not in fake_redis.data
+
+    fake_redis.data.clear()
+    assert await service.get_valid_token() == 'new'
+
+
+@pytest.mark.asyncio
+async def test_token_inside_safety_margin_is_replaced(fake_redis):
+    await TokenRepository(fake_redis).save_token(token('old', age=3590))
+    service = make_service(fake_redis, [token('new')])
+
+    assert await service.get_valid_token() == 'new'
+
+
+@pytest.mark.asyncio
+async def test_aging_token_is_refreshed_in_background(fake_redis):
+    await TokenRepository(fake_redis).save_token(token('old', age=3000))
+    service = make_service(fake_redis, [token('new')])
+
+    assert await service.get_valid_token() == 'old'
+    await token_service._refresh
+
+    assert await service.get_valid_token() == 'new'
+    assert b'"new"' in fake_redis.data['cdek_token']
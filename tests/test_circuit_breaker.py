@@ -0,0 +1,46 @@
+import pytest
+
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+
+
+async def fail():
+    raise ValueError('down')
+
+
+async def succeed():
+    return 'ok'
+
+
+@pytest.mark.asyncio
+async def test_opens_after_threshold_and_rejects_calls():
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60, exceptions=(ValueError,))
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await breaker.call(fail)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeed)
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=0, exceptions=(ValueError,))
+
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+
+    assert await breaker.call(succeed) == 'ok'
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
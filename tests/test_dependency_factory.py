@@ -0,0 +1,38 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.dependencies.factory import DependencyFactory
+
+
+@pytest.mark.asyncio
+async def test_session_is_not_opened_unless_used():
+    session_factory = MagicMock()
+    factory = DependencyFactory(cache=MagicMock(), session_factory=session_factory)
+
+    await factory.close()
+
+    session_factory.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_is_opened_once_and_closed():
+    session = MagicMock(close=AsyncMock())
+    session_factory = MagicMock(return_value=session)
+    factory = DependencyFactory(cache=MagicMock(), session_factory=session_factory)
+
+    assert factory.db is factory.db
+    await factory.close()
+
+    session_factory.assert_called_once()
+    session.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_given_session_is_not_closed():
+    session = MagicMock(close=AsyncMock())
+    factory = DependencyFactory(cache=MagicMock(), db=session)
+
+    await factory.close()
+
+    session.close.assert_not_awaited()
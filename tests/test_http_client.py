@@ -0,0 +1,27 @@
+import pytest
+
+from app import http_client
+from app.http_client import HttpClients, make_client
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_until_closed():
+    clients = HttpClients()
+    with pytest.raises(RuntimeError):
+        clients.cdek
+
+    clients.start()
+    assert clients.cdek is clients.cdek
+    assert clients.cdek is not clients.tinkoff
+
+    await clients.close()
+    with pytest.raises(RuntimeError):
+        clients.tinkoff
+
+
+@pytest.mark.asyncio
+async def test_http2_falls_back_without_h2(mocker):
+    mocker.patch.object(http_client, 'HTTP2_AVAILABLE', False)
+
+    async with make_client('cdek', 10, 5, timeout=30, connect_timeout=5, http2=True) as client:
+        assert client.timeout.connect == 5
@@ -0,0 +1,29 @@
+from app.utils.packing import make_parcel, pack
+
+
+def test_flat_items_are_stacked_into_one_parcel():
+    book = make_parcel(weight=400, height=2, length=30, width=20)
+
+    parcels = pack([book] * 3)
+
+    assert parcels == [make_parcel(weight=1200, height=6, length=30, width=20)]
+
+
+def test_stacking_never_costs_more_than_separate_parcels():
+    items = [make_parcel(1000, 10, 20, 15), make_parcel(300, 5, 5, 5), make_parcel(5000, 40, 40, 40)]
+
+    parcels = pack(items)
+
+    assert sum(parcel.chargeable_weight for parcel in parcels) <= sum(item.chargeable_weight for item in items)
+
+
+def test_parcels_respect_weight_limit():
+    heavy = make_parcel(weight=20000, height=10, length=10, width=10)
+
+    assert len(pack([heavy, heavy], max_weight=30000)) == 2
+
+
+def test_packing_is_order_independent():
+    items = [make_parcel(1000, 10, 20, 15), make_parcel(300, 5, 5, 5), make_parcel(500, 3, 30, 20)]
+
+    assert pack(items) == pack(list(reversed(items)))
@@ -0,0 +1,65 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils.circuit_breaker import CircuitBreaker, CLOSED
+from app.utils.rate_limiter import RateLimiter, RateLimited
+
+
+def make_limiter(eval_result):
+    redis = MagicMock(eval=AsyncMock(side_effect=eval_result))
+    return RateLimiter(redis, 'test', rate=5, burst=10, max_wait=1), redis
+
+
+@pytest.mark.asyncio
+async def test_granted_token_returns_without_waiting(mocker):
+    sleep = mocker.patch('app.utils.rate_limiter.asyncio.sleep', AsyncMock())
+    limiter, redis = make_limiter([0])
+
+    await limiter.acquire()
+
+    sleep.assert_not_awaited()
+    assert redis.eval.await_args.args[1:] == (1, 'rate_limit:test', 5, 10, 1000)
+
+
+@pytest.mark.asyncio
+async def test_reserved_token_is_waited_for(mocker):
+    sleep = mocker.patch('app.utils.rate_limiter.asyncio.sleep', AsyncMock())
+    limiter, _ = make_limiter([250])
+
+    await limiter.acquire()
+
+    sleep.assert_awaited_once_with(0.25)
+
+
+@pytest.mark.asyncio
+async def test_token_beyond_the_budget_fails_fast(mocker):
+    sleep = mocker.patch('app.utils.rate_limiter.asyncio.sleep', AsyncMock())
+    limiter, redis = make_limiter([-400])
+
+    with pytest.raises(RateLimited):
+        await limiter.acquire(max_wait=0)
+
+    assert redis.eval.await_args.args[-1] == 0
+    sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_does_not_block_calls():
+    limiter, _ = make_limiter(RedisConnectionError('down'))
+
+    await limiter.acquire()
+
+
+@pytest.mark.asyncio
+async def test_rejections_do_not_open_the_breaker():
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=60, ignored=(RateLimited,))
+
+    async def throttled():
+        raise RateLimited()
+
+    with pytest.raises(RateLimited):
+        await breaker.call(throttled)
+
+    assert breaker.state == CLOSED
@@ -0,0 +1,44 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError
+
+from app.main import app
+from app.redis_client import RedisManager, redis_manager
+
+
+@pytest.mark.asyncio
+async def test_startup_failure_runs_degraded():
+    client = AsyncMock()
+    client.ping.side_effect = ConnectionError('down')
+    manager = RedisManager(client, check_interval=1)
+
+    await manager.connect(timeout=0)
+
+    assert manager.degraded
+
+
+@pytest.mark.asyncio
+async def test_health_check_toggles_degraded():
+    client = AsyncMock()
+    manager = RedisManager(client, check_interval=1)
+    await manager.connect(timeout=0)
+    assert not manager.degraded
+
+    client.ping.side_effect = ConnectionError('down')
+    assert not await manager.check()
+    assert manager.degraded
+
+    client.ping.side_effect = None
+    assert await manager.check()
+    assert not manager.degraded
+
+
+def test_health_reports_degraded_redis_without_failing(mocker):
+    mocker.patch.object(redis_manager, 'degraded', True)
+
+    response = TestClient(app).get('/health')
+
+    assert response.status_code == 200
+    assert response.json() == {'status': 'degraded', 'redis': 'degraded'}
@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+import pytest
+
+from app import warmup
+
+
+@pytest.mark.asyncio
+async def test_warm_up_is_bounded_by_deadline(mocker, fake_redis):
+    async def slow(*_args):
+        await asyncio.sleep(10)
+
+    async def failing(*_args):
+        raise RuntimeError('down')
+
+    mocker.patch.object(warmup.settings, 'warmup_timeout', 0.1)
+    mocker.patch.object(warmup, 'warm_db_pool', failing)
+    mocker.patch.object(warmup, 'warm_catalog', slow)
+    token = mocker.patch.object(warmup, 'warm_cdek_token', mocker.AsyncMock())
+
+    start = time.perf_counter()
+    await warmup.warm_up(fake_redis)
+
+    assert time.perf_counter() - start < 1
+    token.assert_awaited_once_with(fake_redis)
+